@@ -0,0 +1,96 @@
+"""PATE aggregation: per-sample loop against the vectorized aggregators.
+
+Draws random teacher predictions, labels them with the former per-sample
+implementation of noisy_max and aggregation_most_frequent and with the
+vectorized ones from syft.dp.pate, checks that the clean votes agree and
+reports the time taken by each.
+
+Usage:
+
+    python benchmarks/pate_aggregation.py --teachers 250 --samples 10000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from syft.dp import pate
+
+
+def noisy_max_loop(logits, nb_labels, lap_scale):
+    """The former implementation: one histogram and nb_labels noise draws per
+    sample."""
+    labels = pate.labels_from_probs(logits)
+    result = np.zeros(labels.shape[1])
+    clean_votes = np.zeros((labels.shape[1], nb_labels))
+
+    for i in range(labels.shape[1]):
+        label_counts = np.bincount(labels[:, i], minlength=nb_labels)
+        clean_votes[i] = label_counts
+        label_counts = np.asarray(label_counts, dtype=np.float32)
+        for item in range(nb_labels):
+            label_counts[item] += np.random.laplace(loc=0.0, scale=float(lap_scale))
+        result[i] = np.argmax(label_counts)
+
+    return np.asarray(result, dtype=np.int32), clean_votes
+
+
+def aggregation_most_frequent_loop(logits, nb_labels):
+    labels = pate.labels_from_probs(logits)
+    result = np.zeros(labels.shape[1])
+
+    for i in range(labels.shape[1]):
+        label_counts = np.bincount(labels[:, i], minlength=nb_labels)
+        result[i] = np.argmax(label_counts)
+
+    return np.asarray(result, dtype=np.int32)
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--teachers", type=int, default=250)
+    parser.add_argument("--samples", type=int, default=10000)
+    parser.add_argument("--labels", type=int, default=10)
+    parser.add_argument("--lap-scale", type=float, default=10.0)
+    args = parser.parse_args()
+
+    logits = np.random.rand(args.teachers, args.samples, args.labels).astype(
+        np.float32
+    )
+
+    (_, loop_votes), loop_time = timed(
+        noisy_max_loop, logits, args.labels, args.lap_scale
+    )
+    (_, votes, _), vectorized_time = timed(
+        pate.noisy_max, logits, args.labels, args.lap_scale, True
+    )
+    assert np.array_equal(loop_votes, votes)
+
+    loop_labels, loop_mf_time = timed(
+        aggregation_most_frequent_loop, logits, args.labels
+    )
+    labels, vectorized_mf_time = timed(
+        pate.aggregation_most_frequent, logits, args.labels
+    )
+    assert np.array_equal(loop_labels, labels)
+
+    print("{:>28} {:>12} {:>12} {:>10}".format("", "loop (s)", "vector (s)", "speedup"))
+    for name, before, after in [
+        ("noisy_max", loop_time, vectorized_time),
+        ("aggregation_most_frequent", loop_mf_time, vectorized_mf_time),
+    ]:
+        print(
+            "{:>28} {:>12.3f} {:>12.3f} {:>9.1f}x".format(
+                name, before, after, before / after
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Loopback throughput of the SocketWorker message framing.
+
+Starts an echo server on localhost which speaks the same length-prefixed
+framing as SocketWorker, sends messages of increasing size and reports the
+round trip throughput.
+
+Usage:
+
+    python benchmarks/socket_throughput.py --port 8765 --repeat 20
+"""
+import argparse
+import socket
+import threading
+import time
+
+from syft.core.workers import SocketWorker
+
+
+def echo_server(serversocket):
+    connection, _ = serversocket.accept()
+    try:
+        while True:
+            message = SocketWorker._process_buffer(connection)
+            if message is None:
+                break
+            SocketWorker._send_frame(connection, message)
+    finally:
+        connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--hostname", default="localhost")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    serversocket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    serversocket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    serversocket.bind((args.hostname, args.port))
+    serversocket.listen(1)
+    server = threading.Thread(target=echo_server, args=(serversocket,), daemon=True)
+    server.start()
+
+    clientsocket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    clientsocket.connect((args.hostname, args.port))
+
+    print("{:>12} {:>12} {:>12}".format("size (B)", "rtt (ms)", "MB/s"))
+    try:
+        for exponent in range(10, 28, 2):
+            payload = b"\x01" * (1 << exponent)
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                SocketWorker._send_frame(clientsocket, payload)
+                response = SocketWorker._process_buffer(clientsocket)
+                assert len(response) == len(payload)
+            elapsed = (time.perf_counter() - start) / args.repeat
+            throughput = 2 * len(payload) / elapsed / 1e6
+            print(
+                "{:>12} {:>12.3f} {:>12.1f}".format(
+                    len(payload), elapsed * 1e3, throughput
+                )
+            )
+    finally:
+        clientsocket.close()
+        serversocket.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Per-operation latency of remote tensor operations over WebSocketWorker.
+
+Starts a WebSocketWorker server in a separate process, sends two small
+tensors to it and times thousands of remote additions issued from a client
+pointer worker.
+
+Usage:
+
+    python benchmarks/websocket_latency.py --port 8766 --ops 2000
+"""
+import argparse
+import multiprocessing
+import time
+
+import numpy as np
+
+
+def serve(port):
+    import syft as sy
+
+    hook = sy.TorchHook(verbose=False)
+    sy.WebSocketWorker(
+        hook=hook, id="server", port=port, is_client_worker=False, verbose=False
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--pool-size", type=int, default=4)
+    args = parser.parse_args()
+
+    server = multiprocessing.Process(target=serve, args=(args.port,), daemon=True)
+    server.start()
+    time.sleep(2)
+
+    import syft as sy
+
+    hook = sy.TorchHook(verbose=False)
+    remote = sy.WebSocketWorker(
+        hook=hook,
+        id="server",
+        port=args.port,
+        is_pointer=True,
+        verbose=False,
+        pool_size=args.pool_size,
+    )
+    hook.local_worker.add_worker(remote)
+
+    try:
+        x = sy.FloatTensor([1, 2, 3, 4]).send(remote)
+        y = sy.FloatTensor([4, 3, 2, 1]).send(remote)
+
+        latencies = np.empty(args.ops)
+        for i in range(args.ops):
+            start = time.perf_counter()
+            x + y
+            latencies[i] = time.perf_counter() - start
+
+        latencies *= 1e3
+        print("ops:         {}".format(args.ops))
+        print("mean (ms):   {:.3f}".format(latencies.mean()))
+        print("median (ms): {:.3f}".format(np.median(latencies)))
+        print("p99 (ms):    {:.3f}".format(np.percentile(latencies, 99)))
+    finally:
+        remote.close()
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Worker search: registry scan against the #tag index.
+
+Registers --objects objects with tagged string ids on a VirtualWorker, then
+answers a few queries with the former scan of the whole registry and with
+BaseWorker.search, checks that both agree and reports the time per query.
+
+Usage:
+
+    python benchmarks/worker_search.py --objects 1000000
+"""
+import argparse
+import time
+
+import syft as sy
+
+
+def search_scan(worker, query):
+    """The former implementation, a test of every query term against every
+    id of the registry."""
+    if isinstance(query, str):
+        query = {query}
+    else:
+        query = set(query)
+
+    results = set()
+    for id in worker._objects.keys():
+        if isinstance(id, str):
+            if all(constraint in id for constraint in query):
+                results.add(id)
+    return results
+
+
+def timed(function, *args, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function(*args)
+    return result, (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--objects", type=int, default=1000000)
+    parser.add_argument("--datasets", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    hook = sy.TorchHook(verbose=False)
+    worker = sy.VirtualWorker(id="search_bench", hook=hook, is_client_worker=False)
+
+    value = sy.FloatTensor([0])
+    start = time.perf_counter()
+    for i in range(args.objects):
+        split = "#train" if i % 5 else "#test"
+        key = "#dataset_{} {} #sample_{}".format(i % args.datasets, split, i)
+        worker.set_obj(key, value)
+    print(
+        "registered {} objects in {:.1f}s".format(
+            args.objects, time.perf_counter() - start
+        )
+    )
+
+    queries = [
+        "#dataset_7",
+        ["#dataset_7", "#test"],
+        "#sample_{}".format(args.objects // 2),
+        ["#dataset_7", "#sample_7"],
+        "#dataset_1",
+    ]
+
+    print(
+        "{:>36} {:>8} {:>12} {:>12} {:>10}".format(
+            "", "results", "scan (s)", "index (s)", "speedup"
+        )
+    )
+    for query in queries:
+        expected, scan_time = timed(search_scan, worker, query)
+        results, index_time = timed(worker.search, query, repeat=args.repeat)
+        assert results == expected
+        print(
+            "{:>36} {:>8} {:>12.4f} {:>12.6f} {:>9.0f}x".format(
+                str(query), len(results), scan_time, index_time, scan_time / index_time
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
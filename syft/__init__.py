@@ -15,6 +15,11 @@ from syft.core.frameworks.torch import (
     _GeneralizedPointerTensor,
     _SPDZTensor,
     _SNNTensor,
+    _CRTTensor,
+    send_all,
+    get_all,
+    Plan,
+    make_plan,
 )
 from syft.core.workers import VirtualWorker, SocketWorker
 from syft.core.frameworks.numpy import array
@@ -35,6 +40,11 @@ __all__ = [
     "_GeneralizedPointerTensor",
     "_SPDZTensor",
     "_SNNTensor",
+    "_CRTTensor",
+    "send_all",
+    "get_all",
+    "Plan",
+    "make_plan",
     "VirtualWorker",
     "SocketWorker",
     "array",
@@ -0,0 +1,157 @@
+"""Binary encoding of dense numeric payloads.
+
+Tensors and arrays used to travel as nested python lists (``tolist()``),
+which costs a python object per element on both ends of the wire. They are
+now packed as a msgpack extension type holding the dtype, the shape and the
+raw contiguous bytes, and rebuilt on the receiving side as a numpy view over
+the received buffer.
+
+Several arrays can also be packed into a single flat buffer with an offset
+table (pack_flat), which is how the parameters of a model travel when it's
+sent with flat=True.
+
+Messages sent to several workers are encoded once as well: the ids are
+encoded as placeholders which are then patched in place for each recipient.
+"""
+import random
+import struct
+
+import msgpack
+import numpy as np
+
+# msgpack extension code used for dense arrays
+NDARRAY_EXT_CODE = 42
+
+_HEADER_SIZE = struct.Struct("<I")
+
+# msgpack always encodes integers above 2**63 as uint64: a 0xcf tag followed
+# by 8 big-endian bytes, into which any other non negative id can be written
+_UINT64_TAG = b"\xcf"
+_UINT64 = struct.Struct(">Q")
+
+
+def pack_ndarray(array):
+    """Pack a numpy array into a msgpack ExtType.
+
+    The payload is laid out as ``<header length><header><raw bytes>`` where the
+    header is a msgpack list ``[dtype, shape]``. The raw bytes are copied only
+    once, when the payload is assembled.
+
+    :param array: the numpy array to pack
+    :return: a msgpack.ExtType
+    """
+    array = np.ascontiguousarray(array)
+    header = msgpack.packb([array.dtype.str, list(array.shape)], use_bin_type=True)
+    payload = b"".join(
+        (_HEADER_SIZE.pack(len(header)), header, memoryview(array).cast("B"))
+    )
+    return msgpack.ExtType(NDARRAY_EXT_CODE, payload)
+
+
+def unpack_ndarray(payload):
+    """Rebuild a numpy array from the payload produced by pack_ndarray.
+
+    No copy is performed: the returned array is a read-only view over
+    payload, callers which need to own the data should copy it once.
+
+    :param payload: the bytes of the extension type
+    :return: a (read-only) numpy array
+    """
+    (header_size,) = _HEADER_SIZE.unpack_from(payload)
+    offset = _HEADER_SIZE.size + header_size
+    dtype, shape = msgpack.unpackb(payload[_HEADER_SIZE.size : offset], raw=False)
+    dtype = np.dtype(dtype)
+    count = int(np.prod(shape)) if len(shape) > 0 else 1
+    if count == 0:
+        return np.empty(shape, dtype=dtype)
+    return np.frombuffer(payload, dtype=dtype, count=count, offset=offset).reshape(
+        shape
+    )
+
+
+def pack_flat(arrays, alignment=8):
+    """Pack several numpy arrays into one contiguous buffer.
+
+    Each array starts at an offset aligned on alignment bytes, so that the
+    views returned by unpack_flat are aligned for their dtype.
+
+    :param arrays: the numpy arrays to pack
+    :param alignment: the alignment of the offsets, in bytes
+    :return: the buffer (a uint8 numpy array) and its layout, the list of
+        ``[dtype, shape, offset]`` of the arrays
+    """
+    arrays = [np.ascontiguousarray(array) for array in arrays]
+    layout = []
+    size = 0
+    for array in arrays:
+        size += -size % alignment
+        layout.append([array.dtype.str, list(array.shape), size])
+        size += array.nbytes
+
+    buffer = np.empty(size, dtype=np.uint8)
+    for array, (_, _, offset) in zip(arrays, layout):
+        buffer[offset : offset + array.nbytes] = memoryview(array).cast("B")
+    return buffer, layout
+
+
+def unpack_flat(buffer, layout):
+    """Rebuild the arrays packed by pack_flat, as views over buffer.
+
+    :param buffer: the buffer produced by pack_flat
+    :param layout: the layout of the buffer
+    :return: the list of the arrays, which share the memory of buffer
+    """
+    arrays = []
+    for dtype, shape, offset in layout:
+        dtype = np.dtype(dtype)
+        count = int(np.prod(shape)) if len(shape) > 0 else 1
+        if count == 0:
+            arrays.append(np.empty(shape, dtype=dtype))
+            continue
+        array = np.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+        arrays.append(array.reshape(shape))
+    return arrays
+
+
+def ext_hook(code, payload):
+    """Hook given to msgpack.unpackb to decode the syft extension types."""
+    if code == NDARRAY_EXT_CODE:
+        return unpack_ndarray(payload)
+    return msgpack.ExtType(code, payload)
+
+
+def id_placeholder():
+    """Return a random id which msgpack encodes on 8 bytes, to be replaced
+    later with patch_ids."""
+    return random.getrandbits(63) | (1 << 63)
+
+
+def find_id_placeholder(payload, placeholder):
+    """Find the offsets of the encoded placeholder in a msgpack payload.
+
+    :param payload: the encoded message
+    :param placeholder: an id returned by id_placeholder
+    :return: the list of the offsets of the 8 bytes of the placeholder
+    """
+    needle = _UINT64_TAG + _UINT64.pack(placeholder)
+    offsets = []
+    start = payload.find(needle)
+    while start != -1:
+        offsets.append(start + len(_UINT64_TAG))
+        start = payload.find(needle, start + len(needle))
+    return offsets
+
+
+def patch_ids(payload, offsets, ids):
+    """Copy a msgpack payload, writing ids in place of the placeholders.
+
+    :param payload: the message encoded with placeholder ids
+    :param offsets: for each placeholder, its offsets (see find_id_placeholder)
+    :param ids: for each placeholder, the (non negative integer) id to write
+    :return: the patched payload
+    """
+    patched = bytearray(payload)
+    for id_offsets, id in zip(offsets, ids):
+        for offset in id_offsets:
+            _UINT64.pack_into(patched, offset, id)
+    return bytes(patched)
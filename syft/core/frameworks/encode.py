@@ -3,10 +3,12 @@ serializable fashion."""
 import re
 import types
 import logging
+import msgpack
 import torch
 import syft as sy
 import numpy as np
 
+from syft.core.frameworks import binary
 from syft.core.frameworks.torch import utils as torch_utils
 from syft.core.frameworks.numpy import array, array_ptr
 
@@ -135,6 +137,9 @@ class PythonEncoder:
             if self.retrieve_pointers and isinstance(tail_object, sy._PointerTensor):
                 self.found_pointers.append(tail_object)
             return obj.ser(private=private_local)
+        # binary payloads, already packed (see frameworks.binary)
+        elif isinstance(obj, msgpack.ExtType):
+            return obj
         # Ellipsis
         elif isinstance(obj, type(...)):
             return "..."
@@ -250,6 +255,11 @@ class PythonJSONDecoder:
             return dct
         if isinstance(dct, (list,)):
             return [self.python_decode(o) for o in dct]
+        # binary payloads which were not decoded by the msgpack ext_hook
+        if isinstance(dct, msgpack.ExtType):
+            return binary.ext_hook(dct.code, dct.data)
+        if isinstance(dct, np.ndarray):
+            return dct
         if not isinstance(dct, dict):
             raise TypeError("Type not handled", dct)
 
@@ -269,7 +279,11 @@ class PythonJSONDecoder:
                 """
                 # if we intend to receive the tensor itself, construct an array
                 if self.acquire:
-                    return array(dct["data"], id=dct["id"], owner=self.worker)
+                    data = dct["data"]
+                    if isinstance(data, np.ndarray):
+                        # binary payloads are read-only views on the message
+                        data = np.array(data)
+                    return array(data, id=dct["id"], owner=self.worker)
 
                 # if we intend to create a pointer, construct a pointer. Note that
                 else:
@@ -3,6 +3,7 @@ import random
 import numpy as np
 import syft as sy
 
+from syft.core.frameworks import binary
 from syft.core.frameworks.torch import utils
 import torch
 
@@ -97,19 +98,22 @@ class abstractarray(np.ndarray):
 
 class array(abstractarray):
     def ser(self, private=True, to_json=False):
-        if to_json:
-            return json.dumps(self.ser(private=private, to_json=False))
+        out = {}
+        out["type"] = "numpy.array"
+        out["id"] = self.id
+
+        if private:
+            out["data"] = []
+        elif to_json:
+            out["data"] = self.tolist()
         else:
-            out = {}
-            out["type"] = "numpy.array"
-            out["id"] = self.id
+            out["data"] = binary.pack_ndarray(self)
 
-            if private:
-                out["data"] = []
-            else:
-                out["data"] = self.tolist()
+        out["owner"] = self.owner.id
 
-            out["owner"] = self.owner.id
+        if to_json:
+            return json.dumps(out)
+        else:
             return out
 
     def send(self, worker, ptr_id=None):
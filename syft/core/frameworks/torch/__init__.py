@@ -10,6 +10,11 @@ from syft.core.frameworks.torch.tensor import (
     _PointerTensor,
     _SPDZTensor,
     _SNNTensor,
+    _CRTTensor,
+    send_all,
+    get_all,
+    Plan,
+    make_plan,
 )
 
 __all__ = [
@@ -24,6 +29,11 @@ __all__ = [
     "_GeneralizedPointerTensor",
     "_SPDZTensor",
     "_SNNTensor",
+    "_CRTTensor",
+    "send_all",
+    "get_all",
+    "Plan",
+    "make_plan",
 ]
 
 import torch
@@ -92,6 +102,7 @@ torch.guard = {
     "_SPDZTensor": _SPDZTensor,
     "_FixedPrecisionTensor": _FixedPrecisionTensor,
     "_SNNTensor": _SNNTensor,
+    "_CRTTensor": _CRTTensor,
     "Variable": torch.autograd.Variable,
     "FloatTensor": torch.FloatTensor,
     "DoubleTensor": torch.DoubleTensor,
@@ -1 +1,91 @@
 LOG_NAME = "torch_commands.txt"
+
+# Commands which can be sent to a remote worker without waiting for the
+# response when the local worker is in async mode: their result is a single
+# tensor which has the type of the first pointer involved (see
+# _PointerTensor._handle_call_async). The in-place versions are also allowed.
+ASYNC_COMMANDS = {
+    "__add__",
+    "__radd__",
+    "__sub__",
+    "__rsub__",
+    "__mul__",
+    "__rmul__",
+    "__truediv__",
+    "__div__",
+    "__neg__",
+    "__pow__",
+    "__matmul__",
+    "abs",
+    "add",
+    "addmm",
+    "ceil",
+    "clamp",
+    "clone",
+    "contiguous",
+    "cos",
+    "cumsum",
+    "div",
+    "exp",
+    "expand",
+    "expand_as",
+    "floor",
+    "fmod",
+    "log",
+    "matmul",
+    "mm",
+    "mul",
+    "neg",
+    "pow",
+    "remainder",
+    "round",
+    "sigmoid",
+    "sign",
+    "sin",
+    "sqrt",
+    "squeeze",
+    "sub",
+    "t",
+    "tanh",
+    "transpose",
+    "unsqueeze",
+    "view",
+    "view_as",
+}
+
+# Elementwise commands which give the same result as their in-place version
+# when all their tensor arguments have the size and the type of self. In lazy
+# mode, a worker runs them in place on a temporary result that nothing else
+# uses (see BaseWorker._fuse_in_place).
+IN_PLACE_COMMANDS = {
+    "__add__": "add_",
+    "__radd__": "add_",
+    "__sub__": "sub_",
+    "__mul__": "mul_",
+    "__rmul__": "mul_",
+    "__truediv__": "div_",
+    "__div__": "div_",
+    "__neg__": "neg_",
+    "__pow__": "pow_",
+    "abs": "abs_",
+    "add": "add_",
+    "ceil": "ceil_",
+    "clamp": "clamp_",
+    "cos": "cos_",
+    "div": "div_",
+    "exp": "exp_",
+    "floor": "floor_",
+    "fmod": "fmod_",
+    "log": "log_",
+    "mul": "mul_",
+    "neg": "neg_",
+    "pow": "pow_",
+    "remainder": "remainder_",
+    "round": "round_",
+    "sigmoid": "sigmoid_",
+    "sign": "sign_",
+    "sin": "sin_",
+    "sqrt": "sqrt_",
+    "sub": "sub_",
+    "tanh": "tanh_",
+}
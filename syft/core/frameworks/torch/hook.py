@@ -14,6 +14,8 @@ from syft.core.frameworks.torch.tensor import (
     _GeneralizedPointerTensor,
     _TorchTensor,
     _TorchVariable,
+    send_all,
+    get_all,
 )
 
 
@@ -593,22 +595,29 @@ class TorchHook:
                 o.backward()
                 p.grad -= p.grad
 
-        def module_send_(self, dest):
-            """Overloads send to remote for torch.nn.Module."""
-            if module_is_missing_grad(self):
+        def module_send_(self, dest, flat=False):
+            """Overloads send to remote for torch.nn.Module.
+
+            With flat=True, the parameters are packed in a single flat
+            buffer, and the missing grads are created empty rather than with
+            a backward pass."""
+            if flat:
+                for p in self.parameters():
+                    p.init_grad_()
+            elif module_is_missing_grad(self):
                 create_grad_objects(self)
 
-            for p in self.parameters():
-                p.send(dest)
+            # all the parameters are sent in a single message
+            send_all(self.parameters(), dest, flat=flat)
 
             return self
 
         torch.nn.Module.send = module_send_
 
-        def module_get_(self):
+        def module_get_(self, flat=False):
             """Overload get from remote for torch.nn.Module."""
-            for p in self.parameters():
-                p.get()
+            # all the parameters on a worker are fetched in a single message
+            get_all(self.parameters(), flat=flat)
 
         torch.nn.Module.get = module_get_
 
@@ -1,15 +1,18 @@
+import collections
 import msgpack
 import re
 import torch
 import random
 import syft as sy
 from syft.core.frameworks.torch import utils as torch_utils
-from syft.core.frameworks.torch.constants import LOG_NAME
+from syft.core.frameworks.torch.constants import LOG_NAME, ASYNC_COMMANDS
 from syft.core.frameworks import encode
+from syft.core.frameworks import binary
 from syft.core import utils
 import logging
 import numpy as np
 from syft.spdz import spdz
+from syft.mpc import crt
 from syft.mpc.securenn import relu, relu_deriv
 
 
@@ -218,6 +221,7 @@ class _SyftTensor:
                 owner=owner,
                 skip_register=(not register),
                 original_pointer=original_pointer,
+                garbage_collect=original_pointer,
             )
             if not register:
                 ptr.owner.rm_obj(ptr.id)
@@ -301,6 +305,7 @@ class _SyftTensor:
                     owner=worker,
                     id=None,
                     skip_register=True,
+                    garbage_collect=True,
                 )
             else:
                 syft_obj = previous_pointer
@@ -606,6 +611,7 @@ class _LocalTensor(_SyftTensor):
                     owner=worker,
                     id=None,
                     skip_register=True,
+                    garbage_collect=True,
                 )
             else:
                 syft_obj = previous_pointer
@@ -832,14 +838,35 @@ class _GeneralizedPointerTensor(_SyftTensor):
 
         syft_commands = torch_utils.split_to_pointer_commands(syft_command)
 
-        result_dict = {}
+        if owner.async_mode or syft_command["command"] == "end_get":
+            result_dict = {
+                worker_id: sy._PointerTensor.handle_call(command, owner)
+                for worker_id, command in syft_commands.items()
+            }
+        else:
+            # Compile all the commands first, then send them together so that
+            # the workers can run them at the same time
+            worker_ids = list(syft_commands.keys())
+            compiled = [
+                _PointerTensor._compile_call(
+                    torch_utils.wrap_command_pre_ser(syft_commands[worker_id])
+                )
+                for worker_id in worker_ids
+            ]
+            sender = compiled[0][2]
+            responses = sender.send_msgs(
+                [(command, "torch_cmd", location) for command, location, _ in compiled]
+            )
+            result_dict = {}
+            for worker_id, response in zip(worker_ids, responses):
+                response = encode.decode(response, worker=sender)
+                result_dict[worker_id] = _PointerTensor._unwrap_response(
+                    syft_commands[worker_id], response
+                )
+
         torch_type = None
         var_data_type = None
-        for worker_id in syft_commands.keys():
-
-            syft_command = syft_commands[worker_id]
-            result_dict[worker_id] = sy._PointerTensor.handle_call(syft_command, owner)
-
+        for worker_id in result_dict.keys():
             if torch_type is None:
                 torch_type = result_dict[worker_id].torch_type
                 if torch_utils.is_variable_name(torch_type):
@@ -886,9 +913,27 @@ class _GeneralizedPointerTensor(_SyftTensor):
 
         # TODO: deregister_ptr doesn't work
 
+        pointers = list(self.pointer_tensor_dict.values())
+
+        # pointers to local objects don't need any message
+        if any(pointer.location == pointer.owner for pointer in pointers):
+            return [pointer.get() for pointer in pointers]
+
+        # request all the shares together so that they are fetched at the same time
+        for pointer in pointers:
+            pointer._before_get()
+        sender = pointers[0].owner
+        responses = sender.send_msgs(
+            [
+                (pointer.id_at_location, "req_obj", pointer.location)
+                for pointer in pointers
+            ]
+        )
+
         res = []
-        for worker, pointer in self.pointer_tensor_dict.items():
-            res.append(pointer.get())
+        for pointer, response in zip(pointers, responses):
+            tensorvar = encode.decode(response, worker=pointer.owner)
+            res.append(pointer._register_got(tensorvar))
         return res
 
     def sum_get(self):
@@ -957,6 +1002,7 @@ class _PointerTensor(_SyftTensor):
         owner=None,
         skip_register=False,
         original_pointer=False,
+        garbage_collect=False,
     ):
         super().__init__(
             child=child,
@@ -974,6 +1020,12 @@ class _PointerTensor(_SyftTensor):
 
         self.register_pointer()
         self.original_pointer = original_pointer
+
+        # the remote object is deleted once the owner no longer points at it,
+        # if garbage_collect is True (see BaseWorker.retain_pointer)
+        self._remote_key = None
+        if self.location != self.owner and id_at_location is not None:
+            self._remote_key = self.owner.retain_pointer(self, garbage_collect)
         # pointers to themselves that get registered should trigger the flat
         # if it's not getting registered the pointer is probably about to be
         # sent over the wire
@@ -982,7 +1034,19 @@ class _PointerTensor(_SyftTensor):
                 "Do you really want a pointer pointing to itself? (self.location == self.owner)"
             )
 
-    def share(self, *workers):
+    def __del__(self):
+        # the owner is missing if the pointer was de-registered
+        key = getattr(self, "_remote_key", None)
+        owner = getattr(self, "owner", None)
+        if key is not None and owner is not None:
+            owner.release_pointer(key)
+
+    def disown(self):
+        """Keeps the remote object alive when this pointer is collected."""
+        if self._remote_key is not None:
+            self.owner.disown_pointer(self._remote_key)
+
+    def share(self, *workers, field=None):
 
         worker_ids = []
         for worker in workers:
@@ -994,7 +1058,7 @@ class _PointerTensor(_SyftTensor):
         cmd = {}
         cmd["command"] = "share"
         cmd["args"] = worker_ids
-        cmd["kwargs"] = {}
+        cmd["kwargs"] = {} if field is None else {"field": spdz.ser_field(field)}
         cmd["has_self"] = True
         cmd["self"] = self
 
@@ -1013,31 +1077,53 @@ class _PointerTensor(_SyftTensor):
     def handle_call(cls, syft_command, owner):
         """_PointerTensor has an overloaded handle_call function because it
         converts the command to torch tensors and send it over the network."""
-        tensor_command = torch_utils.wrap_command_pre_ser(syft_command)
+        if owner.async_mode or owner.lazy_mode:
+            response = cls._handle_call_async(syft_command, owner)
+            if response is not None:
+                return response
+            if owner._tracing is not None:
+                raise NotImplementedError(
+                    "{} can't be recorded in a plan".format(syft_command["command"])
+                )
 
-        attr = tensor_command["command"]
-        args = tensor_command["args"]
-        kwargs = tensor_command["kwargs"]
-        has_self = tensor_command["has_self"]
-        self_ = tensor_command["self"] if has_self else None
+        tensor_command = torch_utils.wrap_command_pre_ser(syft_command)
 
-        if attr == "end_get":
-            response = self_.get()
+        if tensor_command["command"] == "end_get":
+            response = tensor_command["self"].get()
         else:
-            command, locations, owners = torch_utils.compile_command(
-                attr, args, kwargs, has_self=has_self, self=self_
-            )
-            location = locations[0]
-            owner = owners[0]
+            command, location, owner = cls._compile_call(tensor_command)
 
             # Else we send the command
             response = owner.send_torch_command(recipient=location, message=command)
 
+        return cls._unwrap_response(syft_command, response)
+
+    @staticmethod
+    def _compile_call(tensor_command, return_ids=None):
+        """Encodes a command, and returns it with the worker which should
+        execute it and the worker which sends it."""
+        has_self = tensor_command["has_self"]
+        command, locations, owners = torch_utils.compile_command(
+            tensor_command["command"],
+            tensor_command["args"],
+            tensor_command["kwargs"],
+            has_self=has_self,
+            self=tensor_command["self"] if has_self else None,
+            return_ids=return_ids,
+        )
+        return command, locations[0], owners[0]
+
+    @staticmethod
+    def _unwrap_response(syft_command, response):
+        """Turns the decoded response of a command into the syft object
+        returned by handle_call."""
         # torch_utils.assert_has_only_torch_tensorvars(response)
 
         # If the command is an in-place method, we only need to return the same wrapper to the same
         # pointer, instead jof returning the new wrapper created in response
-        if has_self and utils.is_in_place_method(attr):
+        if syft_command["has_self"] and utils.is_in_place_method(
+            syft_command["command"]
+        ):
             return syft_command["self"]
 
         # Perform the un-wrap: remove the head on all chains (also .data and .grad if any)
@@ -1045,6 +1131,59 @@ class _PointerTensor(_SyftTensor):
         # response is now a _Pointer, with a .data attr which is a _Pointer, etc.
         return response
 
+    @classmethod
+    def _handle_call_async(cls, syft_command, owner):
+        """Queues the command on the owner instead of sending it, and returns
+        a pointer to its future result (see BaseWorker.async_mode).
+
+        The id of the result is chosen here and sent with the command, so the
+        pointer can be used in other commands before the response is received.
+        Only commands listed in ASYNC_COMMANDS on tensors are queued, as the
+        type of their result is known in advance. For any other command, None
+        is returned and the command is sent synchronously."""
+        attr = syft_command["command"]
+        has_self = syft_command["has_self"]
+        in_place = has_self and utils.is_in_place_method(attr)
+        command_name = attr.split(".")[-1]
+        if in_place:
+            command_name = command_name[:-1]
+        if command_name not in ASYNC_COMMANDS:
+            return None
+
+        # the result has the type of the first pointer involved
+        if has_self:
+            reference = syft_command["self"]
+        else:
+            reference = next(
+                (a for a in syft_command["args"] if isinstance(a, _PointerTensor)),
+                None,
+            )
+        if not isinstance(reference, _PointerTensor) or torch_utils.is_variable_name(
+            reference.torch_type
+        ):
+            return None
+
+        tensor_command = torch_utils.wrap_command_pre_ser(syft_command)
+        return_ids = None if in_place else [int(10e10 * random.random())]
+        command, location, owner = cls._compile_call(tensor_command, return_ids)
+
+        if in_place:
+            owner.queue_torch_command(location, command, syft_command["self"])
+            return syft_command["self"]
+
+        result = _PointerTensor(
+            child=None,
+            parent=None,
+            torch_type=reference.torch_type,
+            location=location,
+            id_at_location=return_ids[0],
+            owner=owner,
+            skip_register=True,
+            garbage_collect=True,
+        )
+        owner.queue_torch_command(location, command, result)
+        return result
+
     def end_get(self):
 
         attr = "end_get"
@@ -1144,9 +1283,7 @@ class _PointerTensor(_SyftTensor):
 
         """Get back from a remote worker the chain this pointer is pointing
         at."""
-        # Remove this pointer by default
-        if deregister_ptr:
-            self.owner.de_register(self)
+        self._before_get(deregister_ptr)
 
         # if the pointer happens to be pointing to a local object,
         # just return that object (this is an edge case)
@@ -1156,6 +1293,19 @@ class _PointerTensor(_SyftTensor):
         # get SyftTensor (Local or Pointer) from remote machine
         tensorvar = self.owner.request_obj(self.id_at_location, self.location)
 
+        return self._register_got(tensorvar)
+
+    def _before_get(self, deregister_ptr=True):
+        # Remove this pointer by default
+        if deregister_ptr:
+            self.owner.de_register(self)
+
+        # the remote object is deleted when it is sent back
+        self.disown()
+
+    def _register_got(self, tensorvar):
+        """Registers locally the tensorvar fetched from the location, under
+        the id of this pointer."""
         # Optional, use it in a development phase to perform checks
         # torch_utils.assert_has_only_torch_tensorvars(tensorvar)
 
@@ -1239,7 +1389,7 @@ class _FixedPrecisionTensor(_SyftTensor):
 
         self.field = field
 
-        if spdz.field != self.field:
+        if self.field not in (spdz.field, spdz.RING):
             logging.warning(
                 "spdz.field != self.field, be careful you may experience issues with "
                 "multiplication on fix precision shared tensors."
@@ -1248,7 +1398,11 @@ class _FixedPrecisionTensor(_SyftTensor):
         self.precision_fractional = precision_fractional
         self.precision_integral = precision_integral
         self.precision = self.precision_fractional + self.precision_integral
-        self.torch_max_value = torch.LongTensor([round(self.field / 2)])
+        if self.field == spdz.RING:
+            # values are stored as signed int64, no gate is needed
+            self.torch_max_value = None
+        else:
+            self.torch_max_value = torch.LongTensor([round(self.field / 2)])
         self.kappa = kappa
 
         if already_encoded:
@@ -1284,7 +1438,7 @@ class _FixedPrecisionTensor(_SyftTensor):
             "id": self.id,
             "child": self.child.ser(private=private, as_dict=True),
             "torch_type": self.torch_type,
-            "field": self.field,
+            "field": spdz.ser_field(self.field),
             "base": self.base,
             "precision_fractional": self.precision_fractional,
         }
@@ -1306,7 +1460,7 @@ class _FixedPrecisionTensor(_SyftTensor):
                 child=child,
                 owner=worker,
                 torch_type=msg_obj["torch_type"],
-                field=msg_obj["field"],
+                field=spdz.deser_field(msg_obj["field"]),
                 base=msg_obj["base"],
                 precision_fractional=msg_obj["precision_fractional"],
                 already_encoded=True,
@@ -1321,31 +1475,40 @@ class _FixedPrecisionTensor(_SyftTensor):
     def encode(self, rational):
         owner = rational.owner
         upscaled = (rational * self.base ** self.precision_fractional).long()
-        field_element = upscaled % self.field
 
-        # Handle neg values
-        gate = field_element.gt(self.torch_max_value).long()
-        neg_nums = (field_element - self.field) * gate
-        pos_nums = field_element * (1 - gate)
-        field_element = neg_nums + pos_nums
+        if self.field == spdz.RING:
+            # negative values are already represented by the int64 wraparound
+            field_element = upscaled
+        else:
+            field_element = upscaled % self.field
+
+            # Handle neg values
+            gate = field_element.gt(self.torch_max_value).long()
+            neg_nums = (field_element - self.field) * gate
+            pos_nums = field_element * (1 - gate)
+            field_element = neg_nums + pos_nums
 
         torch_utils.enforce_owner(field_element, owner)
         self.child = field_element
         return self
 
     def decode(self):
+        if isinstance(self.child.child, _CRTTensor):
+            value = self.child.child.decode()
+            return value.float() / (self.base ** self.precision_fractional)
+
         save = self.child.child + 0
         self.child.child = None  # <-- This is doing magic things
-        value = self.child.long() % self.field
+        value = spdz.reduce(self.child.long(), self.field)
         if len(value.size()) == 0:
             # raise TypeError("Can't decode empty tensor")
             return None
-        gate = value.native_gt(self.torch_max_value).long()
-        neg_nums = (value - self.field) * gate
-        pos_nums = value * (1 - gate)
-        result = (neg_nums + pos_nums).float() / (
-            self.base ** self.precision_fractional
-        )
+        if self.field != spdz.RING:
+            gate = value.native_gt(self.torch_max_value).long()
+            neg_nums = (value - self.field) * gate
+            pos_nums = value * (1 - gate)
+            value = neg_nums + pos_nums
+        result = value.float() / (self.base ** self.precision_fractional)
         self.child.child = save.child
         return result
 
@@ -1433,6 +1596,7 @@ class _FixedPrecisionTensor(_SyftTensor):
                     torch_tensorvar = cls.__div__(self, *args, **kwargs)
                 if attr not in ("mm", "__mul__"):
                     response = torch_tensorvar.fix_precision(
+                        field=self.field,
                         already_encoded=True,
                         precision_fractional=max(self_precision, other_precision),
                     )
@@ -1459,7 +1623,7 @@ class _FixedPrecisionTensor(_SyftTensor):
                 torch_tensorvar, precision = self.truncate(torch_tensorvar, args[0])
 
             response = torch_tensorvar.fix_precision(
-                already_encoded=True, precision_fractional=precision
+                field=self.field, already_encoded=True, precision_fractional=precision
             )
 
             # response.child.torch_type = 'syft.FloatTensor'
@@ -1471,13 +1635,14 @@ class _FixedPrecisionTensor(_SyftTensor):
             if attr == "torch.cat":
 
                 prec = args[0][0].precision_fractional
+                field = args[0][0].field
 
                 args = torch_utils.get_child_command(args)[0]
                 kwargs = torch_utils.get_child_command(kwargs)[0]
                 response = torch.cat(*args, **kwargs)
 
                 response = response.fix_precision(
-                    already_encoded=True, precision_fractional=prec
+                    field=field, already_encoded=True, precision_fractional=prec
                 )
 
                 return response
@@ -1503,7 +1668,36 @@ class _FixedPrecisionTensor(_SyftTensor):
             if result_precision_fractional > 0:
                 tail_node = torch_utils.find_tail_of_chain(torch_tensorvar)
                 # print("result_precision_fractional > 0")
-                if isinstance(tail_node, sy._GeneralizedPointerTensor):
+                if isinstance(torch_tensorvar.child, _CRTTensor):
+                    # The residues are divided exactly, see crt.floor_divide
+                    torch_tensorvar = (
+                        torch_tensorvar / self.base ** result_precision_fractional
+                    )
+
+                elif (
+                    isinstance(tail_node, sy._GeneralizedPointerTensor)
+                    and self.field == spdz.RING
+                ):
+                    # In the ring, each worker truncates its own share
+                    if fractional is None:
+                        fractional = result_precision_fractional
+
+                    if isinstance(torch_tensorvar, sy.Variable):
+                        a = torch_tensorvar.data
+                    else:
+                        a = torch_tensorvar
+
+                    mpc_node = a.child
+                    shares = spdz.truncate_ring(mpc_node.shares, fractional, base)
+                    c = type(mpc_node)(shares, field=self.field).wrap(True)
+
+                    if isinstance(torch_tensorvar, sy.Variable):
+                        torch_tensorvar = torch_tensorvar * 0
+                        torch_tensorvar.data.child.child += c.child.child
+                    else:
+                        torch_tensorvar = c
+
+                elif isinstance(tail_node, sy._GeneralizedPointerTensor):
                     # print("truncating MPC")
                     if isinstance(torch_tensorvar, sy.Variable):
                         a = torch_tensorvar.data
@@ -1616,15 +1810,15 @@ class _FixedPrecisionTensor(_SyftTensor):
     def __add__(self, other):
 
         a, b = self.check_and_scale_precision_if_needed(other)
-        return (a + b) % self.field
+        return spdz.reduce(a + b, self.field)
 
     def __sub__(self, other):
         a, b = self.check_and_scale_precision_if_needed(other)
-        return (a - b) % self.field
+        return spdz.reduce(a - b, self.field)
 
     def __rsub__(self, other):
         a, b = self.check_and_scale_precision_if_needed(other)
-        return (b - a) % self.field
+        return spdz.reduce(b - a, self.field)
 
     def __mul__(self, other):
         a, b = self.check_and_scale_precision_if_needed(other)
@@ -1707,22 +1901,23 @@ class _FixedPrecisionTensor(_SyftTensor):
             other = other.fix_precision(precision_fractional=self.precision_fractional)
 
         if self.precision_fractional == other.precision_fractional:
-            gp_response = (
-                self.child * 10 ** self.precision_fractional / other.child
-            ) % self.field
+            gp_response = spdz.reduce(
+                self.child * 10 ** self.precision_fractional / other.child, self.field
+            )
         elif self.precision_fractional > other.precision_fractional:
-            gp_response = (
-                self.child / other.child * 10 ** other.precision_fractional
-            ) % self.field
+            gp_response = spdz.reduce(
+                self.child / other.child * 10 ** other.precision_fractional, self.field
+            )
 
         elif self.precision_fractional < other.precision_fractional:
-            gp_response = (
+            gp_response = spdz.reduce(
                 (
                     self.child
                     * 10 ** (2 * other.precision_fractional - self.precision_fractional)
                 )
-                / other.child
-            ) % self.field
+                / other.child,
+                self.field,
+            )
         return gp_response
 
     # def __mul__(self, other):
@@ -1867,8 +2062,13 @@ class _SPDZTensor(_SyftTensor):
     to occur within each single operation within __add__ and __mul__.
     """
 
-    def __init__(self, shares=None, child=None, torch_type=None, *args, **kwargs):
+    def __init__(
+        self, shares=None, child=None, torch_type=None, *args, field=None, **kwargs
+    ):
         super().__init__(*args, **kwargs)
+
+        # the modulus of the shares: spdz.field, or spdz.RING for the ring Z_2^64
+        self.field = spdz.field if field is None else field
         # Fixme: remove the share on init, declaring a SPDZTensor should autmatically create a _GeneralizedPointerTensor
 
         if shares is not None:
@@ -1909,6 +2109,7 @@ class _SPDZTensor(_SyftTensor):
             "id": self.id,
             "shares": self.child.ser(private=private, as_dict=True),
             "torch_type": self.torch_type,
+            "field": spdz.ser_field(self.field),
         }
         str_type = "__" + type(self).__name__ + "__"
         if as_dict:
@@ -1936,6 +2137,7 @@ class _SPDZTensor(_SyftTensor):
                     id=msg_obj["id"],
                     owner=worker,
                     torch_type=msg_obj["torch_type"],
+                    field=spdz.deser_field(msg_obj.get("field", spdz.field)),
                 )
             elif "___LocalTensor__" in child_shares.keys():
                 # shares = sy._TorchTensor.deser(msg_obj['shares'], worker, acquire)
@@ -1979,9 +2181,13 @@ class _SPDZTensor(_SyftTensor):
 
         # In case wrapper is a variable, do the same with data and grad (if necessary)
         if torch_utils.is_variable(wrapper):
-            wrapper.data = _SPDZTensor(self.child.data).on(wrapper.data)
+            wrapper.data = _SPDZTensor(self.child.data, field=self.field).on(
+                wrapper.data
+            )
             if torch_utils.is_variable(wrapper.grad):
-                wrapper.assign_grad_(_SPDZTensor(self.child.grad).on(wrapper.grad))
+                wrapper.assign_grad_(
+                    _SPDZTensor(self.child.grad, field=self.field).on(wrapper.grad)
+                )
 
         return wrapper
 
@@ -1995,7 +2201,9 @@ class _SPDZTensor(_SyftTensor):
         if self.torch_type == "syft.Variable":
             other = sy.Variable(other)
 
-        other = other.share(*list(self.shares.child.pointer_tensor_dict.keys())).child
+        other = other.share(
+            *list(self.shares.child.pointer_tensor_dict.keys()), field=self.field
+        ).child
 
         return other
 
@@ -2005,7 +2213,7 @@ class _SPDZTensor(_SyftTensor):
             other = self.share_scalar(other)
 
         # gp_ stands for GeneralizedPointer
-        gp_response = spdz.spdz_add(self.shares, other.shares)
+        gp_response = spdz.spdz_add(self.shares, other.shares, self.field)
         return gp_response
 
     def __sub__(self, other):
@@ -2013,7 +2221,9 @@ class _SPDZTensor(_SyftTensor):
         if isinstance(other, (int, float, bool)):
             other = self.share_scalar(other)
 
-        gp_response = spdz.spdz_add(self.shares, spdz.spdz_neg(other.shares))
+        gp_response = spdz.spdz_add(
+            self.shares, spdz.spdz_neg(other.shares, self.field), self.field
+        )
         return gp_response
 
     def __rsub__(self, other):
@@ -2021,19 +2231,23 @@ class _SPDZTensor(_SyftTensor):
         if isinstance(other, (int, float, bool)):
             other = self.share_scalar(other)
 
-        gp_response = spdz.spdz_add(spdz.spdz_neg(self.shares), other.shares)
+        gp_response = spdz.spdz_add(
+            spdz.spdz_neg(self.shares, self.field), other.shares, self.field
+        )
         return gp_response
 
     def __neg__(self):
-        gp_response = spdz.spdz_neg(self.shares)
+        gp_response = spdz.spdz_neg(self.shares, self.field)
         return gp_response
 
     def sum(self, *args, **kwargs):
-        gp_response = torch.fmod(self.child.sum(*args, **kwargs), spdz.field)
+        gp_response = self.child.sum(*args, **kwargs)
+        if self.field != spdz.RING:
+            gp_response = torch.fmod(gp_response, self.field)
         return gp_response
 
     def cumsum(self, *args, **kwargs):
-        gp_response = self.child.cumsum(*args, **kwargs) % spdz.field
+        gp_response = spdz.reduce(self.child.cumsum(*args, **kwargs), self.field)
         return gp_response
 
     def __mul__(self, other):
@@ -2043,11 +2257,13 @@ class _SPDZTensor(_SyftTensor):
             if torch_utils.is_variable_name(self.torch_type):
                 gp_response = self * 1
                 gp_response.data = spdz.spdz_mul(
-                    self.data.shares, other.data.shares, workers
+                    self.data.shares, other.data.shares, workers, self.field
                 )
                 # TODO: and the grad ?
             else:
-                gp_response = spdz.spdz_mul(self.shares, other.shares, workers)
+                gp_response = spdz.spdz_mul(
+                    self.shares, other.shares, workers, self.field
+                )
         else:
             gp_response = self.shares * other
         return gp_response
@@ -2057,11 +2273,13 @@ class _SPDZTensor(_SyftTensor):
         if torch_utils.is_variable_name(self.torch_type):
             gp_response = self * 1
             gp_response.data = spdz.spdz_matmul(
-                self.data.shares, other.data.shares, workers
+                self.data.shares, other.data.shares, workers, self.field
             )
             # TODO: and the grad ?
         else:
-            gp_response = spdz.spdz_matmul(self.shares, other.shares, workers)
+            gp_response = spdz.spdz_matmul(
+                self.shares, other.shares, workers, self.field
+            )
 
         return gp_response
 
@@ -2115,22 +2333,25 @@ class _SPDZTensor(_SyftTensor):
                 var_data_type = gp_response.child.data.torch_type
                 variable = sy.Variable(torch.guard[var_data_type]())
                 variable.init_grad_()
-                mpc_node = type(self)(gp_response)
-                mpc_node.data = type(self)(gp_response.data)
-                mpc_node.grad = type(self)(gp_response.grad)
-                mpc_node.grad.data = type(self)(gp_response.grad.data)
+                mpc_node = type(self)(gp_response, field=self.field)
+                mpc_node.data = type(self)(gp_response.data, field=self.field)
+                mpc_node.grad = type(self)(gp_response.grad, field=self.field)
+                mpc_node.grad.data = type(self)(
+                    gp_response.grad.data, field=self.field
+                )
                 mpc_node.grad.data.child.child = None  # FIXME: is it necessary?
                 torch_utils.bind_var_nodes(variable, mpc_node, grad=True)
                 return variable
             else:
-                response = type(self)(gp_response).wrap(True)
+                response = type(self)(gp_response, field=self.field).wrap(True)
                 return response
         else:
             if attr == "torch.cat":
                 args = torch_utils.get_child_command(args)[0]
                 kwargs = torch_utils.get_child_command(kwargs)[0]
+                field = args[0][0].child.field if args[0] else spdz.field
                 response = torch.cat(*args, **kwargs)
-                return cls(response, torch_type="syft.LongTensor")
+                return cls(response, torch_type="syft.LongTensor", field=field)
 
     def send(self, *workers):
         assert len(workers) > 0, "Please provide workers to receive the data"
@@ -2147,7 +2368,7 @@ class _SPDZTensor(_SyftTensor):
             var.child = None
             if hasattr(self, "grad") and self.grad is not None:
                 var_grad = self.grad.shares.child.sum_get()
-                value = var_grad.data % spdz.field
+                value = spdz.reduce(var_grad.data, self.field)
                 # TODO: Add this thing for negative values
                 # gate = (value > spdz.torch_max_value).long()
                 # neg_nums = (value - spdz.torch_field) * gate
@@ -2158,7 +2379,11 @@ class _SPDZTensor(_SyftTensor):
                 var.assign_grad_(var_grad)
             return var
         # TODO: have deregister_ptr do something
-        value = self.shares.child.sum_get() % spdz.field
+        if self.field == spdz.RING:
+            # shares sum up to the signed value through the int64 wraparound
+            return self.shares.child.sum_get()
+
+        value = self.shares.child.sum_get() % self.field
 
         gate = (value > spdz.torch_max_value).long()
 
@@ -2205,9 +2430,13 @@ class _SNNTensor(_SPDZTensor, _SyftTensor):
 
         # In case wrapper is a variable, do the same with data and grad (if necessary)
         if torch_utils.is_variable(wrapper):
-            wrapper.data = _SNNTensor(self.child.data).on(wrapper.data)
+            wrapper.data = _SNNTensor(self.child.data, field=self.field).on(
+                wrapper.data
+            )
             if torch_utils.is_variable(wrapper.grad):
-                wrapper.assign_grad_(_SNNTensor(self.child.grad).on(wrapper.grad))
+                wrapper.assign_grad_(
+                    _SNNTensor(self.child.grad, field=self.field).on(wrapper.grad)
+                )
 
         return wrapper
 
@@ -2238,6 +2467,316 @@ class _SNNTensor(_SPDZTensor, _SyftTensor):
         return negdiff2.positive()
 
 
+class _CRTTensor(_SyftTensor):
+    """This tensor represents integers by their residues modulo the coprime
+    moduli of syft.mpc.crt, so that values can grow up to the product of the
+    moduli (about 2^104) without overflowing int64. This is typically used
+    below a _FixedPrecisionTensor, whose products of encoded values exceed
+    int64 before they are truncated.
+
+    Like _SPDZTensor, its .child is a torch wrapper: a LongTensor holding the
+    residues stacked along a first dimension, so that each operation is one
+    batched operation over all the residue channels. When shared (see share),
+    it is a _GeneralizedPointerTensor on additive shares of these residues,
+    which support the same operations through Beaver triples and masked
+    truncation.
+    """
+
+    def __init__(
+        self, residues=None, torch_type="syft.LongTensor", *args, shape=None, **kwargs
+    ):
+        super().__init__(*args, **kwargs)
+
+        if residues is None:
+            raise TypeError("cannot initialize _CRTTensor without residues")
+        if isinstance(residues, sy._GeneralizedPointerTensor):
+            raise TypeError("Should have a wrapper on the _GeneralizedPointerTensor")
+
+        self.child = residues  # a LongTensor, > _GeneralizedPointerTensor if shared
+        self.torch_type = torch_type
+
+        # The shape of the residues and the moduli expanded to it are kept
+        # here, so that shared residues need no round trip to the workers
+        if shape is None:
+            shape = residues.get_shape()
+        self.residues_shape = list(shape)
+        self._moduli = None
+
+    # The torch methods run on the residues, and the method implementing them
+    arithmetic = {
+        "__add__": "__add__",
+        "__radd__": "__add__",
+        "add": "__add__",
+        "__sub__": "__sub__",
+        "sub": "__sub__",
+        "__rsub__": "__rsub__",
+        "__mul__": "__mul__",
+        "__rmul__": "__mul__",
+        "mul": "__mul__",
+        "__neg__": "__neg__",
+        "neg": "__neg__",
+        "__div__": "__div__",
+        "__truediv__": "__div__",
+        "div": "__div__",
+        "mm": "mm",
+        "matmul": "mm",
+        "sum": "sum",
+    }
+
+    def get_shape(self):
+        # skip the residue channels
+        return torch.Size(self.residues_shape[1:])
+
+    def ser(self, private, as_dict=True):
+
+        data = {
+            "owner": self.owner.id,
+            "id": self.id,
+            "residues": self.child.ser(private=private, as_dict=True),
+            "torch_type": self.torch_type,
+            "shape": self.residues_shape,
+        }
+        str_type = "__" + type(self).__name__ + "__"
+        if as_dict:
+            return {str_type: data}
+        else:
+            return msgpack.packb({str_type: data}, use_bin_type=True)
+
+    @classmethod
+    def deser(cls, msg_obj, worker, acquire):
+        """General method for de-serializing a _CRTTensor."""
+
+        if acquire:
+            residues = encode.decode(
+                msg_obj["residues"], worker, acquire, message_is_dict=True
+            )
+            return cls(
+                residues,
+                torch_type=msg_obj["torch_type"],
+                shape=msg_obj["shape"],
+                id=msg_obj["id"],
+                owner=worker,
+            )
+        else:
+            return _SyftTensor.deser(msg_obj, worker, acquire)
+
+    def workers(self):
+        """The workers holding the shares, or None if self is not shared."""
+        if isinstance(self.child.child, sy._GeneralizedPointerTensor):
+            return self.child.child.workers()
+        return None
+
+    @staticmethod
+    def _expand_moduli(shape, workers=None):
+        moduli = crt.channel_constants(crt.moduli, shape)
+        if workers is not None:
+            moduli = moduli.contiguous().broadcast(workers)
+        return moduli
+
+    def moduli(self):
+        """The moduli expanded to the shape of the residues, on the workers
+        if self is shared."""
+        if self._moduli is None:
+            self._moduli = self._expand_moduli(self.residues_shape, self.workers())
+        return self._moduli
+
+    def _new(self, residues, shape=None):
+        """Reduces the residues of a result, of the shape of self's residues
+        unless specified, and wraps them in a new _CRTTensor."""
+        if shape is None:
+            shape = self.residues_shape
+            moduli = self.moduli()
+        else:
+            moduli = self._expand_moduli(shape, self.workers())
+        result = _CRTTensor(residues % moduli, shape=shape)
+        if shape == self.residues_shape:
+            result._moduli = moduli
+        return result
+
+    def share(self, *workers):
+        """Splits the residues in additive shares, channel by channel, and
+        sends one share to each worker."""
+        shares = crt.share(self.child, len(workers))
+
+        pointer_shares_dict = {}
+        for share, worker in zip(shares, workers):
+            share.send(worker)
+            pointer_shares_dict[worker] = share.child
+
+        residues = _GeneralizedPointerTensor(
+            pointer_shares_dict, torch_type="syft.LongTensor"
+        ).on(sy.LongTensor([]))
+        return _CRTTensor(residues, shape=self.residues_shape)
+
+    def _operands(self, other):
+        """Returns self and other as _CRTTensors which are either both local
+        or both shared among the same workers."""
+        if isinstance(other, int):
+            values = torch.zeros(self.residues_shape[1:]).long() + other
+            other = _CRTTensor(crt.encode(values))
+
+        if self.workers() is None and other.workers() is not None:
+            return self.share(*other.workers()), other
+        elif self.workers() is not None and other.workers() is None:
+            return self, other.share(*self.workers())
+        return self, other
+
+    def _open(self):
+        """Reconstructs shared residues, as a local _CRTTensor."""
+        residues = self.child.child.sum_get()
+        residues = residues % crt.moduli_like(residues)
+        return _CRTTensor(residues, shape=self.residues_shape)
+
+    def _multiply(self, other, operation, shape=None):
+        """Runs a bilinear operation on the residues of self and other. If one
+        of them is shared, the other one is public and is sent to the
+        workers. If both are shared, the product uses a Beaver triple drawn
+        channel by channel, as spdz.spdz_mul does in a single field."""
+        if self.workers() is not None and other.workers() is not None:
+            return self._beaver_multiply(other, operation, shape)
+        shared = other if other.workers() is not None else self
+
+        a, b = self.child, other.child
+        if shared.workers() is not None:
+            if shared is self:
+                b = (b + 0).broadcast(shared.workers())
+            else:
+                a = (a + 0).broadcast(shared.workers())
+
+        return shared._new(operation(a, b), shape)
+
+    def _beaver_multiply(self, other, operation, shape=None):
+        """Multiplies two shared _CRTTensors: with a triple c = op(a, b), the
+        product is c + op(d, b) + op(a, e) + op(d, e), where d = self - a and
+        e = other - b are opened."""
+        workers = self.workers()
+        a = _CRTTensor(crt.sample_uniform(self.residues_shape[1:]))
+        b = _CRTTensor(crt.sample_uniform(other.residues_shape[1:]))
+        c = a._multiply(b, operation, shape)
+        a, b, c = a.share(*workers), b.share(*workers), c.share(*workers)
+
+        d = (self - a)._open()
+        e = (other - b)._open()
+        result = c + d._multiply(b, operation, shape)
+        result = result + a._multiply(e, operation, shape)
+        return result + d._multiply(e, operation, shape)
+
+    def _truncate(self, divisor):
+        """Divides shared residues by a public positive integer. A random mask
+        r, much larger than the values, hides self while x + r is opened, so
+        that floor((x + r) / divisor) - floor(r / divisor) can be computed.
+        The result is the floor of x / divisor, or one above.
+
+        The values must be below 2^crt.TRUNCATION_BITS in absolute value, so
+        that the mask hides them. The local worker deals the masks, as it
+        deals the Beaver triples, so it checks this before using the result.
+        """
+        workers = self.workers()
+        mask = _CRTTensor(crt.sample_mask(self.residues_shape[1:]))
+        masked = (self + mask.share(*workers))._open()
+        if not crt.abs_below((masked - mask).child, crt.TRUNCATION_BITS):
+            raise ValueError(
+                "Shared _CRTTensors can only be truncated below 2^{}".format(
+                    crt.TRUNCATION_BITS
+                )
+            )
+
+        public = _CRTTensor(crt.floor_divide(masked.child, divisor))
+        mask_part = _CRTTensor(crt.floor_divide(mask.child, divisor))
+        return public - mask_part.share(*workers)
+
+    def __add__(self, other):
+        a, b = self._operands(other)
+        return a._new(a.child + b.child)
+
+    def __sub__(self, other):
+        a, b = self._operands(other)
+        return a._new(a.child - b.child)
+
+    def __rsub__(self, other):
+        a, b = self._operands(other)
+        return a._new(b.child - a.child)
+
+    def __neg__(self):
+        return self._new(-self.child)
+
+    def __mul__(self, other):
+        if isinstance(other, int):
+            return self._new(self.child * other)
+        return self._multiply(other, lambda a, b: a * b)
+
+    def mm(self, other):
+        shape = self.residues_shape[:2] + other.residues_shape[2:]
+        return self._multiply(other, torch.matmul, shape)
+
+    def __div__(self, other):
+        """Divides by a public positive integer, rounding down. Shared
+        residues may be rounded up instead, see _truncate."""
+        if not isinstance(other, int):
+            raise NotImplementedError("_CRTTensors can only be divided by an integer.")
+        if self.workers() is not None:
+            return self._truncate(other)
+        residues = crt.floor_divide(self.child, other)
+        return _CRTTensor(residues, shape=self.residues_shape)
+
+    def sum(self, dim=None):
+        n_moduli = self.residues_shape[0]
+        if dim is None:
+            residues = self.child.view(n_moduli, -1).sum(1).view(n_moduli, 1)
+            return self._new(residues, [n_moduli, 1])
+
+        if dim < 0:
+            dim += len(self.residues_shape) - 1
+        # skip the residue channels
+        shape = self.residues_shape[: dim + 1] + self.residues_shape[dim + 2 :]
+        residues = self.child.sum(dim + 1)
+        if len(shape) == 1:
+            shape = [n_moduli, 1]
+            residues = residues.view(*shape)
+        return self._new(residues, shape)
+
+    @classmethod
+    def handle_call(cls, command, owner):
+        """Runs the arithmetic operations on the residues, the other
+        operations are not supported."""
+
+        attr = command["command"]
+        args = command["args"]
+        kwargs = command["kwargs"]
+        has_self = command["has_self"]
+
+        if has_self:
+            self = command["self"]
+            if attr not in cls.arithmetic:
+                raise NotImplementedError(
+                    attr + " is not supported on a _CRTTensor. Call .get() first?"
+                )
+            response = getattr(cls, cls.arithmetic[attr])(self, *args, **kwargs)
+        else:
+            if attr not in ("torch.mm", "torch.matmul"):
+                raise NotImplementedError(
+                    attr + " is not supported on a _CRTTensor. Call .get() first?"
+                )
+            response = cls.mm(*args, **kwargs)
+
+        return response.wrap(True)
+
+    def decode(self):
+        """Returns the LongTensor of the values represented by the local
+        residues."""
+        if self.workers() is not None:
+            raise NotImplementedError(
+                "It is not possible to decode shared residues, call .get() instead"
+            )
+        return crt.decode(self.child)
+
+    def get(self, deregister_ptr=False):
+        if self.workers() is None:
+            return self.decode()
+
+        return crt.decode(self._open().child)
+
+
 class _TorchObject:
     """This tensor is simply a more convenient way to add custom functions to
     all Torch tensor types, including Torch Variable.
@@ -2302,10 +2841,15 @@ class _TorchObject:
     def native_get_shape(self):
         return self.get_shape()
 
-    def share(self, *workers):
-        """Create additive shares of a tensorvar and send them to workers."""
+    def share(self, *workers, field=None):
+        """Create additive shares of a tensorvar and send them to workers.
+
+        The shares are taken modulo field, which defaults to spdz.field. With
+        field=spdz.RING, they live in Z_2^64 and rely on the int64 wraparound.
+        A fixed precision tensor is shared in the field it was encoded in.
+        """
         if isinstance(self.child, _PointerTensor):
-            response = self.child.share(*workers)
+            response = self.child.share(*workers, field=field)
             if torch_utils.is_variable(self):
                 self_copy = self
                 self_copy.child = response
@@ -2316,8 +2860,16 @@ class _TorchObject:
             else:
                 return response.wrap(True)
 
+        elif isinstance(self.child, _CRTTensor):
+            return self.child.share(*workers).wrap(True)
+
         elif isinstance(self.child, _FixedPrecisionTensor):
-            var_shared = self.child.child.share(*workers)
+            if field is not None and spdz.deser_field(field) != self.child.field:
+                raise ValueError(
+                    "The tensor was encoded in the field {}, call "
+                    "fix_precision(field=...) first".format(self.child.field)
+                )
+            var_shared = self.child.child.share(*workers, field=self.child.field)
             self.child.child = var_shared
             if torch_utils.is_variable(self):
                 self.data.child.child = var_shared.data
@@ -2327,17 +2879,23 @@ class _TorchObject:
             return self
 
         else:
+            # the field may come serialized from a remote pointer
+            field = spdz.field if field is None else spdz.deser_field(field)
             is_variable = torch_utils.is_variable(self)
             if is_variable:
                 if not hasattr(self, "grad") or self.grad is None:
                     self.init_grad_()
             n_workers = len(workers)
-            shares = self._share(n_workers)
+            if spdz.PRG_SHARES and not is_variable:
+                self._check_shareable()
+                pointer_shares_dict = spdz.share_communication(self, workers, field)
+            else:
+                shares = self._share(n_workers, field)
 
-            pointer_shares_dict = {}
-            for share, worker in zip(shares, workers):
-                share.send(worker)
-                pointer_shares_dict[worker] = share.child
+                pointer_shares_dict = {}
+                for share, worker in zip(shares, workers):
+                    share.send(worker)
+                    pointer_shares_dict[worker] = share.child
 
             self_copy = self * 1
             if is_variable:
@@ -2346,37 +2904,65 @@ class _TorchObject:
                 pointer_shares_dict, torch_type="syft.LongTensor"
             ).on(self_copy)
 
-            x_mpc = _SNNTensor(x_gp, torch_type="syft.LongTensor").on(self)
+            x_mpc = _SNNTensor(x_gp, torch_type="syft.LongTensor", field=field).on(
+                self
+            )
             if is_variable:
                 torch_utils.link_var_chain_to_data_and_grad_chains(
                     x_mpc, x_mpc.data, x_mpc.grad
                 )
             return x_mpc
 
-    def native_share(self, *workers):
-        out = self.share(*workers)
+    def native_share(self, *workers, field=None):
+        out = self.share(*workers, field=field)
         return out
 
-    def _share(self, n_workers):
+    def _share(self, n_workers, field=None):
+        if field is None:
+            field = spdz.field
         if torch_utils.is_variable(self):
-            data_shares = self.data._share(n_workers)
+            data_shares = self.data._share(n_workers, field)
             shares = []
             for data_share in data_shares:
                 shares.append(sy.Variable(data_share))
             return shares
         else:
-            if not isinstance(self, torch.LongTensor):
-                raise TypeError(
-                    "Can only MPCShare LongTensor type. You tried to share "
-                    + str(type(self).__name__)
-                    + "."
-                    + " Do you need to call .fix_precision() first?"
-                )
-            return spdz.share(self, n_workers)
+            self._check_shareable()
+            return spdz.share(self, n_workers, field)
+
+    def _check_shareable(self):
+        if not isinstance(self, torch.LongTensor):
+            raise TypeError(
+                "Can only MPCShare LongTensor type. You tried to share "
+                + str(type(self).__name__)
+                + "."
+                + " Do you need to call .fix_precision() first?"
+            )
 
     def _encode(self):
         return spdz.encode(self)
 
+    def crt(self):
+        """Represents the integers of a LongTensor by their residues (see
+        _CRTTensor). On a fixed precision tensor, this applies to the encoded
+        values, whose products can then exceed int64 before truncation."""
+        if isinstance(self.child, _FixedPrecisionTensor):
+            self.child.child = self.child.child.crt()
+            # The residues are reduced by the _CRTTensor, and the encoded
+            # values are signed integers, as in the ring
+            self.child.field = spdz.RING
+            self.child.torch_max_value = None
+            return self
+
+        if not isinstance(self, torch.LongTensor):
+            raise TypeError(
+                "Can only represent LongTensor type with residues. You tried "
+                + str(type(self).__name__)
+                + "."
+                + " Do you need to call .fix_precision() first?"
+            )
+        return _CRTTensor(crt.encode(self)).wrap(True)
+
     def fix_precision(
         self,
         field=(2 ** 31) - 1,
@@ -2480,11 +3066,21 @@ class _TorchObject:
         ).wrap()
 
     def move(self, worker, new_id=None):
-
+        """Moves the remote object pointed at to worker, and makes self point
+        at it there. The client only sends a "move" message to the worker
+        holding the object, which sends it to worker directly: the data
+        doesn't go through the client, and no pointer to a pointer is
+        created.
+
+        :param worker: the worker (or id of the worker) receiving the object,
+            which must be known by the worker holding it
+        :param new_id: the id of the object on worker, random by default
+        :return: self
+        """
         if isinstance(self.child, _PointerTensor):
             if self.child.original_pointer:
 
-                return self.send(worker).end_get()
+                return self._move(worker, new_id)
             else:
 
                 raise Exception(
@@ -2504,6 +3100,35 @@ class _TorchObject:
                 + ")?"
             )
 
+    def _move(self, worker, new_id=None):
+        pointer = self.child
+        owner = pointer.owner
+        worker = owner.get_worker(worker)
+        if worker == pointer.location:
+            return self
+        if worker == owner:
+            return self.get()
+
+        pointers = [self.child]
+        if torch_utils.is_variable(self):
+            pointers.append(self.data.child)
+            if self.grad is not None:
+                pointers += [self.grad.child, self.grad.data.child]
+        remote_ids = self._remote_ids(new_id)
+
+        message = {
+            "id": pointer.id_at_location,
+            "ids": remote_ids,
+            "recipient": worker.id,
+        }
+        owner.send_msg(message=message, message_type="move", recipient=pointer.location)
+
+        for node, remote_id in zip(pointers, remote_ids):
+            if isinstance(node, _PointerTensor):
+                owner.move_pointer(node, worker, remote_id)
+
+        return self
+
 
 class _TorchTensor(_TorchObject):
     def __str__(self):
@@ -2534,11 +3159,13 @@ class _TorchTensor(_TorchObject):
     def ser(self, private, as_dict=True):
         key = encode.get_serialized_key(self)
 
-        data = (
-            self.tolist()
-            if not private and not torch_utils.is_tensor_empty(self)
-            else []
-        )
+        if private or torch_utils.is_tensor_empty(self):
+            data = []
+        elif isinstance(self, torch.HalfTensor):
+            # HalfTensor can't be viewed as a numpy array
+            data = self.tolist()
+        else:
+            data = binary.pack_ndarray(self.native_numpy())
         tensor_msg = {
             "torch_type": type(self).__name__,
             "data": data,
@@ -2567,7 +3194,14 @@ class _TorchTensor(_TorchObject):
             return syft_obj.parent
 
         # If not, build the torch wrapper
-        tensorvar = torch.guard[obj_type](msg_obj["data"])
+        data = msg_obj["data"]
+        if isinstance(data, np.ndarray):
+            # Binary payload: the received buffer is read-only, so copy it once
+            # and let the wrapper share the memory of this copy
+            tensorvar = torch.guard[obj_type]()
+            tensorvar.native_set_(torch.native_from_numpy(np.array(data)))
+        else:
+            tensorvar = torch.guard[obj_type](data)
 
         # And connect it the the child syft_tensor
         torch_utils.bind_tensor_nodes(tensorvar, syft_obj)
@@ -2580,14 +3214,34 @@ class _TorchTensor(_TorchObject):
     def broadcast(self, workers):
         """Send to multiple workers and get back a _GeneralizedPointerTensor.
 
+        The tensor is serialized only once, whatever the number of workers.
+
         :return:
         """
         # TODO: Doublon with the new functionality send(*worker)
         # Even if .send is on Var and .broadcast en _GenPtrT
+        return _GeneralizedPointerTensor(self._send_many(workers)).on(self)
+
+    def _send_many(self, workers):
+        """Send a copy of self to each worker, and return the dict of the
+        pointers to these copies."""
+        workers = [self.owner.get_worker(worker) for worker in workers]
+        ptr_ids = [int(10e10 * random.random()) for _ in workers]
+        self.owner.send_obj_many(self, workers, [[ptr_id] for ptr_id in ptr_ids])
+
         pointers_dict = {}
-        for worker in workers:
-            pointers_dict[worker] = self.clone().send(worker).child
-        return _GeneralizedPointerTensor(pointers_dict).on(self)
+        for worker, ptr_id in zip(workers, ptr_ids):
+            # an empty wrapper per worker, which holds the pointer
+            wrapper = torch.guard[self.child.torch_type]()
+            pointer = wrapper.child.create_pointer(
+                location=worker,
+                id_at_location=ptr_id,
+                register=True,
+                original_pointer=True,
+            )
+            torch_utils.bind_tensor_nodes(wrapper, pointer)
+            pointers_dict[worker] = pointer
+        return pointers_dict
 
     def send(self, *workers, ptr_id=None):
         """Give the root of the chain held by self to worker self->alice->obj
@@ -2601,50 +3255,64 @@ class _TorchTensor(_TorchObject):
         """
         assert len(workers) > 0, "Please provide workers to receive the data"
 
-        if isinstance(self.child, _LocalTensor):
-            original_pointer = True
-        else:
-            original_pointer = False
-
         if len(workers) == 1:
             worker = workers[0]
         else:
-            gpt_dict = {}
-            for worker in workers:
-                gpt_dict[worker] = (self * 1).send(worker).child
-            sy._GeneralizedPointerTensor(gpt_dict).on(self)
+            sy._GeneralizedPointerTensor(self._send_many(workers)).on(self)
             return self
 
         worker = self.owner.get_worker(worker)
 
-        if ptr_id is None:
-            ptr_id = int(10e10 * random.random())
-
-        obj_id = self.child.id
+        ids = self._chain_ids()
+        remote_ids = self._remote_ids(ptr_id)
+        self._disown_pointers()
 
         # creates a pointer to LocalTensor without a Torch object wrapping it because
         # we're going to set self.child to be this pointer.
         # we set register=True because we want it to be registered locally
 
-        self.owner.send_obj(self, ptr_id, worker)
+        self.owner.send_obj(self, remote_ids[0], worker)
+
+        self._point_to(worker, ids, remote_ids)
+
+        return self
+
+    def _chain_ids(self):
+        """The ids of the chain, to be restored once it's sent (see
+        send_all)."""
+        return [self.child.id]
+
+    def _remote_ids(self, ptr_id=None):
+        """The ids of the chain once it's sent: [id]."""
+        if ptr_id is None:
+            ptr_id = int(10e10 * random.random())
+        return [ptr_id]
+
+    def _disown_pointers(self):
+        # the remote object pointed at now belongs to the recipient
+        if isinstance(self.child, _PointerTensor):
+            self.child.disown()
+
+    def _point_to(self, worker, ids, remote_ids):
+        """Replaces the chain, which was sent to worker, by a pointer to
+        it."""
+        original_pointer = isinstance(self.child, _LocalTensor)
 
         # clears data which could be cached in the wrapper (which is self)
         # which would be confusing for folks
         self.native_set_()
 
         # set this wrapper's child to be the newly created PointerTensor
-        self.child.id = obj_id
+        self.child.id = ids[0]
         syft_pointer = self.child.create_pointer(
             location=worker,
-            id_at_location=ptr_id,
+            id_at_location=remote_ids[0],
             register=True,
             original_pointer=original_pointer,
         )
         torch_utils.bind_tensor_nodes(self, syft_pointer)
         self.parent = None
 
-        return self
-
     def get(self, deregister_ptr=True, update_ptr_wrapper=True):
         """Get a remote tensor back to the local worker.
 
@@ -2659,6 +3327,12 @@ class _TorchTensor(_TorchObject):
         # returns a Tensor object wrapping a SyftTensor
         tensor = self.child.get(deregister_ptr=deregister_ptr)
 
+        return self._set_got(tensor, update_ptr_wrapper)
+
+    def _set_got(self, tensor, update_ptr_wrapper=True):
+        """Updates self with the tensor got back from its pointer (see
+        get)."""
+
         # GeneralizedPointerTensor returns a list
         if isinstance(tensor, list):
             return tensor
@@ -2726,31 +3400,20 @@ class _TorchVariable(_TorchObject):
         elif len(workers) == 0:
             raise TypeError("Please provide workers to receive the data")
         else:  # Multiple workers case
-            gpt_dict = {}
-            if not hasattr(self, "grad") or self.grad is None:
-                self.init_grad_()
-            for worker in workers:
-                gpt_dict[worker] = (self * 1).send(worker).child
-
-            sy._GeneralizedPointerTensor(gpt_dict).on(self)
+            sy._GeneralizedPointerTensor(self._send_many(workers)).on(self)
             return self
 
         worker = self.owner.get_worker(worker)
 
-        # Init new remote ids if needed
-        (new_id, new_data_id, new_grad_id, new_grad_data_id) = utils.map_tuple(
-            None,
-            (new_id, new_data_id, new_grad_id, new_grad_data_id),
-            lambda id: id if id is not None else int(10e10 * random.random()),
-        )
-
         # Store tensorvar ids
-        obj_id = self.child.id
-        obj_data_id = self.data.child.id
-        obj_grad_id = self.grad.child.id if self.grad is not None else None
-        obj_grad_data_id = self.grad.data.child.id if self.grad is not None else None
+        ids = self._chain_ids()
+        remote_ids = self._remote_ids(
+            new_id, new_data_id, new_grad_id, new_grad_data_id
+        )
+        self._disown_pointers()
 
         # Send the variable (note that if self.grad was None it will be instanciated here)
+        new_id, new_data_id, new_grad_id, new_grad_data_id = remote_ids
         self.owner.send_obj(
             self,
             new_id,
@@ -2760,11 +3423,78 @@ class _TorchVariable(_TorchObject):
             new_grad_data_id=new_grad_data_id,
         )
 
+        self._point_to(worker, ids, remote_ids)
+
+        return self
+
+    def _chain_ids(self):
+        """The ids of the chains of the variable, of its data and of its
+        grad, to be restored once they're sent (see send_all)."""
+        obj_id = self.child.id
+        obj_data_id = self.data.child.id
+        obj_grad_id = self.grad.child.id if self.grad is not None else None
+        obj_grad_data_id = self.grad.data.child.id if self.grad is not None else None
+        return [obj_id, obj_data_id, obj_grad_id, obj_grad_data_id]
+
+    def _remote_ids(
+        self, new_id=None, new_data_id=None, new_grad_id=None, new_grad_data_id=None
+    ):
+        """The ids of the chains once they're sent: [id, data_id, grad_id,
+        grad_data_id]."""
+        # Init new remote ids if needed
+        return list(
+            utils.map_tuple(
+                None,
+                (new_id, new_data_id, new_grad_id, new_grad_data_id),
+                lambda id: id if id is not None else int(10e10 * random.random()),
+            )
+        )
+
+    def _disown_pointers(self):
+        # the remote objects pointed at now belong to the recipient
+        for node in (self.child, self.data.child):
+            if isinstance(node, _PointerTensor):
+                node.disown()
+
+    def _point_to(self, worker, ids, remote_ids):
+        self._create_pointer_chains(worker, ids, remote_ids)
+
+    def _send_many(self, workers):
+        """Send a copy of self to each worker, and return the dict of the
+        pointers to these copies."""
+        workers = [self.owner.get_worker(worker) for worker in workers]
+        if not hasattr(self, "grad") or self.grad is None:
+            self.init_grad_()
+        remote_ids = [
+            [int(10e10 * random.random()) for _ in range(4)] for _ in workers
+        ]
+        self.owner.send_obj_many(self, workers, remote_ids)
+
+        pointers_dict = {}
+        data_type = self.data.child.torch_type
+        for worker, ids in zip(workers, remote_ids):
+            # an empty variable per worker, which holds the pointers
+            wrapper = sy.Variable(torch.guard[data_type]())
+            wrapper.init_grad_()
+            wrapper._create_pointer_chains(
+                worker,
+                [
+                    wrapper.child.id,
+                    wrapper.data.child.id,
+                    wrapper.grad.child.id,
+                    wrapper.grad.data.child.id,
+                ],
+                ids,
+            )
+            pointers_dict[worker] = wrapper.child
+        return pointers_dict
+
+    def _create_pointer_chains(self, worker, ids, remote_ids):
+        """Replace the chains of the variable, of its data and of its grad by
+        pointers to the remote_ids at worker."""
         # For each object, clear it, create a pointer and insert it as a direct child
         for id, remote_id, wrapper in zip(
-            [obj_id, obj_data_id, obj_grad_id, obj_grad_data_id],
-            [new_id, new_data_id, new_grad_id, new_grad_data_id],
-            [self, self.data, self.grad, self.grad.data],
+            ids, remote_ids, [self, self.data, self.grad, self.grad.data]
         ):
             # Clear data which could be cached in the wrapper (which is self)
             if id is not None:  # id is None when we had self.grad = None
@@ -2780,8 +3510,6 @@ class _TorchVariable(_TorchObject):
         # Todo: This could be included in link_var_chain_to_data_and_grad_chains
         self.child.grad.data = self.grad.data.child
 
-        return self
-
     def get(self, deregister_ptr=True, update_ptr_wrapper=True):
         """Get a remote variable back to the local worker.
 
@@ -2800,6 +3528,12 @@ class _TorchVariable(_TorchObject):
         # returns a Variable object wrapping a SyftTensor
         variable = self.child.get(deregister_ptr)
 
+        return self._set_got(variable, update_ptr_wrapper)
+
+    def _set_got(self, variable, update_ptr_wrapper=True):
+        """Updates self with the variable got back from its pointer (see
+        get)."""
+
         # Optional: use it in development phase
         # torch_utils.assert_has_only_torch_tensorvars(variable)
 
@@ -2975,3 +3709,269 @@ class _TorchVariable(_TorchObject):
             self.data.child = self.data.child.child.child
         self.child = self.child.child.child
         torch_utils.fix_chain_ends(self)
+
+
+def send_all(tensorvars, worker, flat=False):
+    """Sends several tensors or variables to worker in a single message, and
+    turns each of them into a pointer to its copy, like calling .send(worker)
+    on each of them does with one message per tensor.
+
+    :param tensorvars: a list of tensors or variables of the same owner
+    :param worker: the worker (or id of the worker) receiving them
+    :param flat: if True, tensorvars must be local variables, whose data and
+        grads are sent packed in a single flat buffer (see BaseWorker.send_flat)
+    :return: the list of tensorvars, which now point at worker
+    """
+    tensorvars = list(tensorvars)
+    if not tensorvars:
+        return tensorvars
+    owner = tensorvars[0].owner
+    worker = owner.get_worker(worker)
+
+    ids = [tensorvar._chain_ids() for tensorvar in tensorvars]
+    remote_ids = [tensorvar._remote_ids() for tensorvar in tensorvars]
+    for tensorvar in tensorvars:
+        tensorvar._disown_pointers()
+
+    if flat:
+        owner.send_flat(tensorvars, remote_ids, worker)
+    else:
+        owner.send_objs(tensorvars, remote_ids, worker)
+
+    for tensorvar, ids_, remote_ids_ in zip(tensorvars, ids, remote_ids):
+        tensorvar._point_to(worker, ids_, remote_ids_)
+
+    return tensorvars
+
+
+def get_all(tensorvars, deregister_ptr=True, flat=False):
+    """Gets back the remote tensors or variables pointed at by tensorvars,
+    with a single message per worker holding them, like calling .get() on
+    each of them does with one message per tensor. Tensorvars which are not
+    pointers (e.g. shared tensors) are got one by one.
+
+    :param tensorvars: a list of pointers to tensors or variables
+    :param deregister_ptr: should the pointers be de-registered (Default: True)
+    :param flat: if True, the variables are sent back packed in a single flat
+        buffer per worker (see BaseWorker.request_flat), and the tensors are
+        got one by one
+    :return: the list of tensorvars got back
+    """
+    tensorvars = list(tensorvars)
+    results = list(tensorvars)
+
+    by_location = collections.OrderedDict()
+    for i, tensorvar in enumerate(tensorvars):
+        pointer = tensorvar.child
+        if (
+            isinstance(pointer, _PointerTensor)
+            and pointer.location != pointer.owner
+            and (not flat or torch_utils.is_variable(tensorvar))
+        ):
+            by_location.setdefault(pointer.location, []).append(i)
+        else:
+            results[i] = tensorvar.get(deregister_ptr=deregister_ptr)
+
+    for location, indices in by_location.items():
+        pointers = [tensorvars[i].child for i in indices]
+        for pointer in pointers:
+            pointer._before_get(deregister_ptr)
+
+        owner = pointers[0].owner
+        request = owner.request_flat if flat else owner.request_objs
+        got = request([p.id_at_location for p in pointers], location)
+
+        for i, pointer, tensorvar in zip(indices, pointers, got):
+            results[i] = tensorvars[i]._set_got(pointer._register_got(tensorvar))
+
+    return results
+
+
+class Plan:
+    """A function recorded on pointers to tensors of a worker (see make_plan),
+    which this worker has stored and replays on other tensors when the plan
+    is called: each call is a single "run_plan" message carrying the ids of
+    the inputs and of the outputs, instead of one message per operation.
+
+    :Example:
+
+    >>> step = sy.make_plan(lambda w, x: (w - x.t().mm(x.mm(w)) * 0.1), w, x)
+    >>> w = step(w, x)  # a single message
+    """
+
+    def __init__(
+        self,
+        owner,
+        location,
+        id,
+        input_ids,
+        output_ids,
+        output_types,
+        single_output=False,
+        retained_keys=(),
+    ):
+        self.owner = owner
+        self.location = location
+        self.id = id
+        self.input_ids = input_ids
+        self.output_ids = output_ids
+        self.output_types = output_types
+        self.single_output = single_output
+        # the remote tensors the plan uses besides its inputs
+        self.retained_keys = list(retained_keys)
+
+    def __del__(self):
+        # the worker deletes the plan along with the next message it receives
+        owner = getattr(self, "owner", None)
+        if owner is not None:
+            owner.release_plan(self.location.id, self.id)
+            for key in getattr(self, "retained_keys", ()):
+                owner.release_pointer(key)
+
+    def __call__(self, *args):
+        if len(args) != len(self.input_ids):
+            raise TypeError(
+                "The plan takes {} inputs but {} were given".format(
+                    len(self.input_ids), len(args)
+                )
+            )
+        input_ids = [_plan_pointer(arg, self.location).id_at_location for arg in args]
+
+        # an output which is an input (modified in place) keeps its id
+        output_ids = []
+        for output_id in self.output_ids:
+            if output_id in self.input_ids:
+                output_ids.append(input_ids[self.input_ids.index(output_id)])
+            else:
+                output_ids.append(int(10e10 * random.random()))
+
+        message = {"id": self.id, "input_ids": input_ids, "output_ids": output_ids}
+        self.owner.send_msg(
+            message=message, message_type="run_plan", recipient=self.location
+        )
+
+        outputs = []
+        for output_id, new_id, torch_type in zip(
+            self.output_ids, output_ids, self.output_types
+        ):
+            if output_id in self.input_ids:
+                outputs.append(args[self.input_ids.index(output_id)])
+                continue
+            pointer = _PointerTensor(
+                child=None,
+                parent=None,
+                torch_type=torch_type,
+                location=self.location,
+                id_at_location=new_id,
+                owner=self.owner,
+                skip_register=True,
+                garbage_collect=True,
+            )
+            outputs.append(pointer.wrap())
+
+        if self.single_output:
+            return outputs[0]
+        return tuple(outputs)
+
+
+def _plan_pointer(tensor, location):
+    """Returns the pointer of a plan input or output, which must be a tensor
+    pointing at location."""
+    pointer = getattr(tensor, "child", None)
+    if (
+        not torch_utils.is_tensor(tensor)
+        or not isinstance(pointer, _PointerTensor)
+        or pointer.location != location
+    ):
+        raise TypeError(
+            "The inputs and outputs of a plan must be tensors (Variables are not "
+            "supported) on {}, not {}".format(location.id, type(tensor).__name__)
+        )
+    return pointer
+
+
+def make_plan(function, *args):
+    """Records the operations which function performs on the pointers args,
+    and sends them as a plan to the worker the pointers point at. The
+    operations are not executed: the returned Plan executes them, on the same
+    or other pointers, with a single message per call.
+
+    The operations are recorded like in async mode (see
+    BaseWorker.async_mode), so only the commands of ASYNC_COMMANDS on tensors
+    of a single worker can be used in function. Any other command, or getting
+    a tensor back, raises an error. In particular, Variables and autograd are
+    not supported: a training step must compute its gradients explicitly on
+    tensors, as in the example of Plan.
+
+    The tensors function uses besides args, such as constants captured from
+    an enclosing scope, are kept alive on the worker as long as the plan.
+
+    :param function: the function to record, which returns a tensor or a
+        tuple of tensors
+    :param args: the pointers to the tensors given to function
+    :return: a Plan, which can be called like function
+    """
+    if not args:
+        raise TypeError("Please provide the pointers the plan is recorded on")
+    owner = args[0].child.owner
+    location = args[0].child.location
+    input_ids = [_plan_pointer(arg, location).id_at_location for arg in args]
+
+    # the commands queued before belong to the caller
+    owner.sync(location)
+
+    async_mode = owner.async_mode
+    owner.async_mode = True
+    owner._tracing = location
+    try:
+        outputs = function(*args)
+    finally:
+        owner.async_mode = async_mode
+        owner._tracing = None
+        pending = owner._pending_commands.pop(location.id, [])
+
+    single_output = not isinstance(outputs, (tuple, list))
+    if single_output:
+        outputs = [outputs]
+    pointers = [_plan_pointer(output, location) for output in outputs]
+
+    commands = [command for command, _ in pending]
+    result_ids = {
+        id for command in commands for id in command["obj"].get("return_ids", [])
+    }
+    output_ids = [pointer.id_at_location for pointer in pointers]
+    for output_id in output_ids:
+        if output_id not in result_ids and output_id not in input_ids:
+            raise ValueError("The outputs of a plan must be computed by the plan")
+
+    # the results were never computed, there is nothing to delete remotely
+    for _, result in pending:
+        if isinstance(result, _PointerTensor) and result.id_at_location in result_ids:
+            result.disown()
+
+    captured_ids = set(owner._pointed_ids(commands, location.id))
+    captured_ids -= result_ids | set(input_ids)
+    keys = [(location.id, id) for id in captured_ids]
+    retained_keys = [key for key in keys if owner.retain_remote(key)]
+
+    plan = Plan(
+        owner,
+        location,
+        int(10e10 * random.random()),
+        input_ids,
+        output_ids,
+        [pointer.torch_type for pointer in pointers],
+        single_output,
+        retained_keys,
+    )
+    owner.send_msg(
+        message={
+            "id": plan.id,
+            "commands": commands,
+            "input_ids": input_ids,
+            "output_ids": output_ids,
+        },
+        message_type="plan",
+        recipient=location,
+    )
+    return plan
@@ -350,14 +350,19 @@ def get_variables_in_backward_graph(var, nodes=[], seen=set()):
     return nodes, seen
 
 
-def compile_command(attr, args, kwargs, has_self=False, self=None):
+def compile_command(attr, args, kwargs, has_self=False, self=None, return_ids=None):
     """Returns the JSON serializable encoded command, the location which should
     receive it and the owners of the pointers seen in the command Is used in
     the _PointerTensor handlecall to prepare the command before forwarding it
-    to a remote worker."""
+    to a remote worker.
+
+    If return_ids is given, the remote worker registers the result under these
+    ids (see BaseWorker._set_result_ids)."""
     command = {"command": attr, "has_self": has_self, "args": args, "kwargs": kwargs}
     if has_self:
         command["self"] = self
+    if return_ids is not None:
+        command["return_ids"] = return_ids
 
     command, pointers = encode.encode(command, retrieve_pointers=True)
 
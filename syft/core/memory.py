@@ -0,0 +1,224 @@
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import torch
+
+import syft as sy
+from syft.core.frameworks.torch import utils as torch_utils
+
+
+class MemoryBudget:
+    """Accounting of the memory used by the tensors of a worker's registry,
+    which spills the least recently used ones to disk once their total size
+    goes over a budget.
+
+    A spilled tensor keeps its place in the registry but its storage is
+    released: its data is written to a memory-mapped .npy file in spill_dir
+    and read back when the object is next fetched with get_obj. Only the
+    tensors of _LocalTensor nodes are accounted (pointers and shares hold no
+    data of their own), and a view of a spilled tensor which was taken
+    beforehand keeps the former storage alive. Objects should thus only be
+    accessed through get_obj, as remote workers do, when a budget is set.
+
+    :Parameters:
+
+    * **budget (int, optional)** the number of bytes the registered tensors
+      can take in memory, or None for no limit (Default: None)
+
+    * **spill_dir (str, optional)** the directory where tensors are
+      spilled, a temporary directory created on first spill by default
+
+    :Example:
+
+    >>> bob = sy.VirtualWorker(id="bob", hook=hook, memory_budget=2 ** 30)
+    >>> bob.memory.stats()["resident_bytes"]
+    0
+    """
+
+    def __init__(self, budget=None, spill_dir=None):
+        self.budget = budget
+        self.spill_dir = spill_dir
+        self._own_spill_dir = False
+        self._lock = threading.RLock()
+        # key -> size in bytes of the resident tensors, least recently
+        # used first
+        self._resident = OrderedDict()
+        # key -> (path, size in bytes, tensor) of the spilled tensors
+        self._spilled = {}
+        self.resident_bytes = 0
+        self.spilled_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.spills = 0
+
+    @staticmethod
+    def _tensor_of(obj):
+        """Returns the torch tensor holding the data of a registered object,
+        or None if it has none which can be spilled."""
+        if not isinstance(obj, sy._LocalTensor):
+            return None
+        tensor = obj.child
+        if not torch_utils.is_tensor(tensor) or isinstance(tensor, torch.HalfTensor):
+            return None
+        return tensor
+
+    @staticmethod
+    def _chain_keys(obj):
+        """Returns the keys of the data and grad.data chains of a registered
+        Variable, which hold its tensors, or an empty list for other
+        objects."""
+        if not isinstance(obj, sy._LocalTensor) or not torch_utils.is_variable(
+            obj.child
+        ):
+            return []
+        var = obj.child
+        nodes = [var.data]
+        if var.grad is not None:
+            nodes.append(var.grad.data)
+        return [node.child.id for node in nodes]
+
+    @classmethod
+    def _nbytes(cls, obj):
+        tensor = cls._tensor_of(obj)
+        if tensor is None or torch_utils.is_tensor_empty(tensor):
+            return 0
+        return tensor.native_numpy().nbytes
+
+    def _resize(self, key, nbytes):
+        self.resident_bytes += nbytes - self._resident.get(key, 0)
+        self._resident[key] = nbytes
+        self._resident.move_to_end(key)
+
+    def add(self, key, obj, objects):
+        """Accounts for an object stored in the registry under key, then
+        spills other objects if the budget is exceeded.
+
+        :Parameters:
+
+        * **key (int or str)** the id of the object in the registry
+
+        * **obj (object)** the object stored
+
+        * **objects (dict)** the registry
+        """
+        with self._lock:
+            if key in self._spilled and self._spilled[key][2] is self._tensor_of(obj):
+                # the spilled object is registered again
+                self._load(key)
+            self.remove(key)
+            nbytes = self._nbytes(obj)
+            if nbytes:
+                self._resize(key, nbytes)
+                self.enforce(objects, keep=[key])
+
+    def touch(self, key, obj, objects):
+        """Marks an object fetched from the registry as the most recently
+        used, reading it back from disk if it was spilled. For a Variable,
+        this applies to the tensors of its data and grad chains, which are
+        registered under their own keys."""
+        with self._lock:
+            keys = [k for k in self._chain_keys(obj) if k in objects]
+            accounted = [self._refresh(k, objects[k]) for k in keys]
+            accounted.append(self._refresh(key, obj))
+            if any(accounted):
+                self.enforce(objects, keep=keys + [key])
+
+    def _refresh(self, key, obj):
+        """Reads an object back if it was spilled, and measures it again: its
+        tensor may have been resized, or bound to the object after its
+        registration. Returns whether the object is accounted."""
+        spilled = key in self._spilled
+        if spilled:
+            self._load(key)
+        nbytes = self._nbytes(obj)
+        if not nbytes and key not in self._resident:
+            return False
+        if spilled:
+            self.misses += 1
+        else:
+            self.hits += 1
+        self._resize(key, nbytes)
+        return True
+
+    def remove(self, key):
+        """Stops accounting for an object removed from the registry."""
+        with self._lock:
+            if key in self._resident:
+                self.resident_bytes -= self._resident.pop(key)
+            elif key in self._spilled:
+                path, nbytes, _ = self._spilled.pop(key)
+                self.spilled_bytes -= nbytes
+                os.remove(path)
+
+    def enforce(self, objects, keep=()):
+        """Spills the least recently used tensors until the resident ones fit
+        in the budget. The tensors with a key in keep are never spilled."""
+        if self.budget is None:
+            return
+        with self._lock:
+            while self.resident_bytes > self.budget:
+                key = next(iter(self._resident), None)
+                if key is None or key in keep:
+                    break
+                self._spill(key, objects[key])
+
+    def _spill(self, key, obj):
+        if self.spill_dir is None:
+            self.spill_dir = tempfile.mkdtemp(prefix="syft_spill_")
+            self._own_spill_dir = True
+        fd, path = tempfile.mkstemp(suffix=".npy", dir=self.spill_dir)
+        os.close(fd)
+
+        tensor = self._tensor_of(obj)
+        array = tensor.native_numpy()
+        spilled = np.lib.format.open_memmap(
+            path, mode="w+", dtype=array.dtype, shape=array.shape
+        )
+        spilled[...] = array
+        spilled.flush()
+        del spilled
+        tensor.native_set_()
+
+        nbytes = self._resident.pop(key)
+        self.resident_bytes -= nbytes
+        self._spilled[key] = (path, nbytes, tensor)
+        self.spilled_bytes += nbytes
+        self.spills += 1
+
+    def _load(self, key):
+        path, nbytes, tensor = self._spilled.pop(key)
+        self.spilled_bytes -= nbytes
+        array = np.array(np.load(path, mmap_mode="r"))
+        os.remove(path)
+        tensor.native_set_(torch.native_from_numpy(array))
+
+    def stats(self):
+        """Returns the counters, as a dictionary which can be dumped to
+        JSON."""
+        with self._lock:
+            return {
+                "budget": self.budget,
+                "resident_bytes": self.resident_bytes,
+                "spilled_bytes": self.spilled_bytes,
+                "resident_objects": len(self._resident),
+                "spilled_objects": len(self._spilled),
+                "hits": self.hits,
+                "misses": self.misses,
+                "spills": self.spills,
+            }
+
+    def clear(self):
+        """Forgets every object and deletes the spilled files."""
+        with self._lock:
+            for key in list(self._spilled):
+                self.remove(key)
+            self._resident.clear()
+            self.resident_bytes = 0
+            if self._own_spill_dir:
+                shutil.rmtree(self.spill_dir, ignore_errors=True)
+                self.spill_dir = None
+                self._own_spill_dir = False
@@ -1,9 +1,14 @@
 from datetime import datetime
+import bisect
 import cProfile
 import pstats
+import threading
 from functools import wraps
 
-PROFILE_MODE = True
+# cProfile every message sent and log the stats in SEND_MSG_STATS_LOG. This is
+# a debug mode: it slows down every message, use WorkerMetrics to monitor a
+# worker instead.
+PROFILE_MODE = False
 
 SEND_MSG_STATS_LOG = "send_msg_profiling.log"
 LOGFILE_LINE_FORMAT = "{}\tFrom: {}\tTo: {}\ttype: {}\t{:.2f} ms\ttotal calls: {}\n"
@@ -11,6 +16,107 @@ LOGFILE_LINE_FORMAT = "{}\tFrom: {}\tTo: {}\ttype: {}\t{:.2f} ms\ttotal calls: {
 # how many milliseconds there are in one second
 MS_IN_S = 1000
 
+# upper bounds (in ms) of the latency histogram buckets, the last bucket of
+# the histogram counts every latency above the last bound
+LATENCY_BUCKETS_MS = (
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    25,
+    50,
+    100,
+    250,
+    500,
+    1000,
+    2500,
+    10000,
+)
+
+
+class WorkerMetrics:
+    """In-memory counters of the messages sent and received by a worker.
+
+    For each direction ("sent" or "received") and each message type, it keeps
+    the number of messages, the bytes sent and received, the total and max
+    latency and a latency histogram (see LATENCY_BUCKETS_MS). Recording a
+    message is a few dictionary updates, so metrics are enabled by default.
+
+    :Example:
+
+    >>> bob = sy.VirtualWorker(id="bob", hook=hook)
+    >>> x = sy.FloatTensor([1, 2, 3]).send(bob)
+    >>> hook.local_worker.metrics.snapshot()["sent"]["obj"]["count"]
+    1
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._stats = {"sent": {}, "received": {}}
+
+    def record(self, direction, message_type, bytes_out, bytes_in, seconds):
+        """Accounts for one message.
+
+        :Parameters:
+
+        * **direction (str)** "sent" or "received"
+
+        * **message_type (str)** the type of the message (obj, torch_cmd, ...)
+
+        * **bytes_out (int)** the number of bytes written by this worker
+
+        * **bytes_in (int)** the number of bytes read by this worker
+
+        * **seconds (float)** the time spent handling the message
+        """
+        if not self.enabled:
+            return
+
+        ms = seconds * MS_IN_S
+        with self._lock:
+            stats = self._stats[direction].get(message_type)
+            if stats is None:
+                stats = {
+                    "count": 0,
+                    "bytes_out": 0,
+                    "bytes_in": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "histogram": [0] * (len(LATENCY_BUCKETS_MS) + 1),
+                }
+                self._stats[direction][message_type] = stats
+            stats["count"] += 1
+            stats["bytes_out"] += bytes_out
+            stats["bytes_in"] += bytes_in
+            stats["total_ms"] += ms
+            if ms > stats["max_ms"]:
+                stats["max_ms"] = ms
+            stats["histogram"][bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+
+    def snapshot(self):
+        """Returns a copy of the counters, as a dictionary which can be
+        dumped to JSON."""
+        with self._lock:
+            snapshot = {
+                direction: {
+                    message_type: dict(stats, histogram=list(stats["histogram"]))
+                    for message_type, stats in by_type.items()
+                }
+                for direction, by_type in self._stats.items()
+            }
+        snapshot["latency_buckets_ms"] = list(LATENCY_BUCKETS_MS)
+        return snapshot
+
+    def reset(self):
+        """Clears all the counters."""
+        with self._lock:
+            self._stats = {"sent": {}, "received": {}}
+
 
 def save_send_msg_stats(prof, *args, **kwargs):
     """
@@ -1,3 +1,9 @@
+import bisect
+import collections
+import itertools
+import time
+import threading
+import weakref
 import torch
 import msgpack
 import logging
@@ -7,8 +13,34 @@ from abc import ABC, abstractmethod
 
 from syft.core import utils
 from syft.core.frameworks.torch import utils as torch_utils
+from syft.core.frameworks.torch.constants import IN_PLACE_COMMANDS
 from syft.core.frameworks import encode
-from ..profiling import profile, save_send_msg_stats, PROFILE_MODE
+from syft.core.frameworks import binary
+from syft.core import profiling
+from syft.spdz import spdz
+from ..profiling import profile, save_send_msg_stats, WorkerMetrics
+from ..memory import MemoryBudget
+from concurrent.futures import ThreadPoolExecutor
+
+# Maximum number of messages sent at the same time by send_msgs
+MAX_SEND_THREADS = 16
+
+# Number of remote objects to delete queued for a worker beyond which they are
+# deleted right away, instead of with the next message sent to this worker
+GC_BATCH_SIZE = 1000
+
+_send_executor = None
+_send_executor_lock = threading.Lock()
+
+
+def _get_send_executor():
+    """Returns the thread pool shared by all the workers to send messages
+    concurrently, creating it on first use."""
+    global _send_executor
+    with _send_executor_lock:
+        if _send_executor is None:
+            _send_executor = ThreadPoolExecutor(max_workers=MAX_SEND_THREADS)
+        return _send_executor
 
 
 class BaseWorker(ABC):
@@ -61,8 +93,22 @@ class BaseWorker(ABC):
         * **verbose (bool, optional)** A flag for whether or not to
           print events to stdout.
 
+        * **memory_budget (int, optional)** the number of bytes the tensors
+          of the registry can take in memory. Beyond it, the least recently
+          used ones are spilled to disk and read back on get_obj (see
+          memory.MemoryBudget). No limit by default.
+
+        * **spill_dir (str, optional)** the directory where tensors are
+          spilled, a temporary directory by default.
+
     """
 
+    # Whether messages to this worker can be sent from another thread while
+    # messages to other workers are in flight (see send_msgs). Workers which
+    # process messages in the calling thread, like VirtualWorker, gain nothing
+    # from it.
+    supports_concurrent_send = False
+
     def __init__(
         self,
         hook=None,
@@ -73,6 +119,8 @@ class BaseWorker(ABC):
         known_workers={},
         verbose=True,
         queue_size=0,
+        memory_budget=None,
+        spill_dir=None,
     ):
 
         if hook is None and hasattr(sy, "local_worker"):
@@ -98,9 +146,24 @@ class BaseWorker(ABC):
         #  or creates in this dictionary. The key to each object
         # is it's id.
         self._objects = {}
+
+        # The memory used by the tensors of self._objects, and the ones
+        # spilled to disk when it goes over memory_budget
+        self.memory = MemoryBudget(memory_budget, spill_dir)
+
         self._pointers = {known_worker.id: {} for known_worker in known_workers}
+
+        # An inverted index of the #tag tokens of the string ids in
+        # self._objects: each tag maps to the set of ids carrying it. It is
+        # kept up to date by set_obj and rm_obj and answers search queries
+        # without scanning the registry. The sorted list of the tags, used
+        # for prefix queries, is updated as tags come and go.
+        self._tags = {}
+        self._sorted_tags = []
         for k, v in objects.items():
             self._objects[k] = v
+            self._index_tags(k)
+            self.memory.add(k, v, self._objects)
             # Register the pointer by location/id@location
             if isinstance(v, sy._PointerTensor):
                 v.register_pointer()
@@ -128,9 +191,46 @@ class BaseWorker(ABC):
         # A flag for whether or not to print events to stdout.
         self.verbose = verbose
 
-        # A list for storing messages to be sent as well as the max size of the list
+        # A list for storing messages to be sent as well as the max size of the list.
+        # Messages can be sent from several threads (see send_msgs), so the
+        # list is only used under _queue_lock
         self.message_queue = []
         self.queue_size = queue_size
+        self._queue_lock = threading.Lock()
+
+        # In-memory counters of the messages sent and received, per message
+        # type (see profiling.WorkerMetrics.snapshot)
+        self.metrics = WorkerMetrics()
+
+        # In async mode, the torch commands on remote tensors are not sent
+        # right away: they are queued per recipient and sent as one composite
+        # message on the next sync (see sync)
+        self.async_mode = False
+        self._pending_commands = {}
+
+        # Lazy mode queues the commands in the same way, but they are sent in
+        # a "lazy" message with the ids of the results which are no longer
+        # pointed at, so that the recipient can compute them in place and
+        # doesn't keep them (see sync)
+        self.lazy_mode = False
+
+        # The worker whose commands are being recorded in a plan, if any (see
+        # tensor.make_plan), and the plans recorded by other workers, by id
+        self._tracing = None
+        self._plans = {}
+
+        # The number of pointers of this worker to each remote object, by
+        # (location id, id at location), and whether this worker owns the
+        # object. When the last pointer to an owned object is garbage
+        # collected, the object is queued in _garbage, and deleted on its
+        # location along with the next message sent there (see release_pointer)
+        self._remote_refs = {}
+        self._released = collections.deque()
+        self._garbage = {}
+        # The same goes for the plans stored by other workers (see release_plan)
+        self._released_plans = collections.deque()
+        self._plan_garbage = {}
+        self._gc_lock = threading.Lock()
 
         if hasattr(sy, "local_worker"):
             sy.local_worker.add_worker(self)
@@ -146,14 +246,70 @@ class BaseWorker(ABC):
 
         return self.encode_msg({"id": self.id, "type": type(self)})
 
-    def _search(self, query):
+    @staticmethod
+    def _tags_of(id):
+        """Returns the keys under which an object id is indexed: the part of
+        each of its tokens which starts at a "#", for every "#" of the token
+        (none if the id is not a string). A "#tag" query term is a substring
+        of the id if and only if it's a prefix of one of these keys."""
+        if not isinstance(id, str):
+            return []
+        tags = []
+        for token in id.split():
+            start = token.find("#")
+            while start != -1:
+                tags.append(token[start:])
+                start = token.find("#", start + 1)
+        return tags
+
+    def _index_tags(self, id):
+        for tag in self._tags_of(id):
+            if tag not in self._tags:
+                self._tags[tag] = set()
+                bisect.insort(self._sorted_tags, tag)
+            self._tags[tag].add(id)
+
+    def _unindex_tags(self, id):
+        for tag in self._tags_of(id):
+            ids = self._tags.get(tag)
+            if ids is None:
+                continue
+            ids.discard(id)
+            if not ids:
+                del self._tags[tag]
+                del self._sorted_tags[bisect.bisect_left(self._sorted_tags, tag)]
+
+    def _tag_matches(self, tag, exact=False):
+        """Returns the ids containing tag, with a prefix query on the sorted
+        keys of the tag index. With exact, only the ids having tag as one of
+        their tokens are returned."""
+        if exact:
+            return {id for id in self._tags.get(tag, ()) if tag in id.split()}
+
+        ids = set()
+        start = bisect.bisect_left(self._sorted_tags, tag)
+        for key in itertools.islice(self._sorted_tags, start, None):
+            if not key.startswith(tag):
+                break
+            ids.update(self._tags[key])
+        return ids
+
+    def _search(self, query, exact=False):
         """Queries all local tensors which have string ids, returning the
         tensors which match the query. The query is composed of one or more
-        substrings which all be contained within a tensor's ID in order for it
-        to be a match.
+        constraints which must all be met by a tensor's ID in order for it to
+        be a match.
+
+        A constraint is a substring which must be contained within the ID.
+        The constraints which are a single #tag (e.g. "#boston") are answered
+        with the tag index, by intersecting the sets of matching IDs, smallest
+        first, and the other ones are then tested on these IDs. With exact,
+        a #tag constraint must instead be one of the tokens of the ID (e.g.
+        "#boston" doesn't match "#boston_housing").
 
         :param query: either a string or a list of strings
-        :return: a list of tensors
+        :param exact: whether #tag constraints match whole tokens only
+        :return: a set of tensor ids
         """
 
         if isinstance(query, str):
@@ -161,30 +317,39 @@ class BaseWorker(ABC):
         else:
             query = set(query)
 
-        results = set()
-        for id in self._objects.keys():
-            if isinstance(id, str):
-                failed = False
-                for constraint in query:
-                    if constraint not in id:
-                        failed = True
-                if not failed:
-                    results.add(id)
-        return results
-
-    def search(self, query="#boston"):
+        tags = [c for c in query if c.startswith("#") and len(c.split()) == 1]
+        substrings = [c for c in query if c not in tags]
+
+        if tags:
+            matches = sorted((self._tag_matches(tag, exact) for tag in tags), key=len)
+            results = set(matches[0])
+            for ids in matches[1:]:
+                if not results:
+                    break
+                results &= ids
+        else:
+            results = {id for id in self._objects.keys() if isinstance(id, str)}
+
+        return {
+            id
+            for id in results
+            if all(constraint in id for constraint in substrings)
+        }
+
+    def search(self, query="#boston", exact=False):
         """Queries all local tensors which have string ids, returning the
         tensors which match the query. The query is composed of one or more
-        substrings which all be contained within a tensor's ID in order for it
-        to be a match.
+        substrings which must all be contained in a tensor's ID in order for
+        it to be a match (see _search).
 
         :param query: either a string or a list of strings
+        :param exact: whether #tag constraints match whole tokens only
         :return: a list of tensors
         """
 
-        return self._search(query)
+        return self._search(query, exact)
 
-    def send_msg(self, message, message_type, recipient, profile_mode=PROFILE_MODE):
+    def send_msg(self, message, message_type, recipient, profile_mode=None):
         """Sends a string message to another worker with message_type
         information indicating how the message should be processed.
 
@@ -198,13 +363,21 @@ class BaseWorker(ABC):
           the message is processed by the recipient. The types of message are described
           in :func:`receive_msg`.
 
-        * **profile_mode (bool, optional)** when truthy, sending will be profiled.
+        * **profile_mode (bool, optional)** when truthy, sending will be profiled with
+          cProfile and logged (debug mode). Defaults to profiling.PROFILE_MODE.
 
         * **out (object)** the response from the message being sent. This can be a variety
           of object types. However, the object is typically only used during testing or
           local development with :class:`VirtualWorker` workers.
         """
 
+        # the commands queued in async mode must be executed first
+        if recipient.id in self._pending_commands:
+            self.sync(recipient)
+
+        self._collect_released()
+        self._flush_full_garbage()
+
         # create a an empty message wrapper
         message_wrapper = {}
 
@@ -213,24 +386,33 @@ class BaseWorker(ABC):
 
         # this information determins how the message is routed when it is received
         # you can find how this type information is handled in the function
-        # process_message_type. At present it includes obj, req_obj, torch_cmd,
-        # numpy_cmd, composite, and query as possible values.
+        # process_message_type. At present it includes obj, flat_obj, req_obj,
+        # req_objs, req_flat, move, prg_share, torch_cmd, numpy_cmd, composite,
+        # lazy, plan, run_plan, delete and query as possible values.
         message_wrapper["type"] = message_type
 
         # if you're planning to send groups of messages at a time, this appends
-        # the message to a queue. However, by default the queue size is set to 1
-        # which means that this doesn't do anything.
-        self.message_queue.append(message_wrapper)
-
-        # manages grouping messages (for faster performance)
+        # the message to a queue (for faster performance). However, by default
+        # the queue size is set to 0 and the queue isn't used.
         if self.queue_size:
-            if len(self.message_queue) > self.queue_size:
+            with self._queue_lock:
+                self.message_queue.append(message_wrapper)
+                if len(self.message_queue) <= self.queue_size:
+                    return None
 
                 # if the queue is full, reset the message_wrapper object
-                # with all messages to be set.
+                # with all messages to be set, and empty the queue
                 message_wrapper = self.compile_composite_message()
-            else:
-                return None
+                self.message_queue = []
+
+        # the remote objects no longer pointed at are deleted with this message
+        garbage = self._pop_garbage(recipient.id)
+        if garbage:
+            message_wrapper["delete"] = garbage
+        with self._gc_lock:
+            plans = self._plan_garbage.pop(recipient.id, None)
+        if plans:
+            message_wrapper["delete_plans"] = plans
 
         # this packages the message dictionary into JSON and adds a final newline
         # i believe the extra newline was necessary - possibly to make decoding
@@ -238,16 +420,38 @@ class BaseWorker(ABC):
         # binary
         message_wrapper_json = self.encode_msg(message_wrapper)
 
-        # empty the message queue which previously held our messages
-        self.message_queue = []
+        return self._send_encoded_msg(
+            message_wrapper_json, message_wrapper["type"], recipient, profile_mode
+        )
+
+    def _send_encoded_msg(
+        self, message_wrapper_json, message_type, recipient, profile_mode=None
+    ):
+        """Sends a message wrapper which is already encoded, and records it in
+        the metrics of the worker."""
 
         # since all logic for this class is general to ALL worker types, we now
         # need to call the worker-specific message send function wihch sends
         # the message according to the correct protocol (such as HTTPS, Socket,
         # or other ways of sending messages).
+        if profile_mode is None:
+            profile_mode = profiling.PROFILE_MODE
+
+        start = time.perf_counter()
         if profile_mode:
-            return self._profiled_send_msg(message_wrapper_json, recipient)
-        return self._send_msg(message_wrapper_json, recipient)
+            response = self._profiled_send_msg(message_wrapper_json, recipient)
+        else:
+            response = self._send_msg(message_wrapper_json, recipient)
+
+        self.metrics.record(
+            "sent",
+            message_type,
+            len(message_wrapper_json),
+            len(response) if response is not None else 0,
+            time.perf_counter() - start,
+        )
+
+        return response
 
     @profile(save_send_msg_stats)
     def _profiled_send_msg(self, *args, **kwargs):
@@ -264,11 +468,8 @@ class BaseWorker(ABC):
         # create new message container
         message_wrapper = {}
 
-        # iterate through messages and create a list
-        message_wrapper["message"] = {
-            message_number: message
-            for message_number, message in enumerate(self.message_queue)
-        }
+        # the messages are kept in a list, in the order they were queued
+        message_wrapper["message"] = list(self.message_queue)
         message_wrapper["type"] = "composite"
 
         return message_wrapper
@@ -306,6 +507,8 @@ class BaseWorker(ABC):
           local development with :class:`VirtualWorker` workers.
         """
 
+        start = time.perf_counter()
+
         # load json into a dictionary where all objects have been deserialized
         message_wrapper = encode.decode(
             self.decode_msg(message_wrapper_json), worker=self
@@ -315,15 +518,33 @@ class BaseWorker(ABC):
         # the "response" which should be sent back to the original worker. "private" (bool)
         # determines whether we are intentionally leaving out the data in the response
         # and instead sending pointers to the data which we will actually keep locally
-        response, private = self.process_message_type(message_wrapper)
+        try:
+            response, private = self.process_message_type(message_wrapper)
+        finally:
+            # the sender may have sent along objects to delete (see send_msg).
+            # They're deleted last, as the commands of the message may use them
+            if "delete" in message_wrapper:
+                self.delete_objs(message_wrapper["delete"])
+            for plan_id in message_wrapper.get("delete_plans", []):
+                self._plans.pop(plan_id, None)
 
         # serialize any objects in the response into their string/dictionary form (recursive)
-        response = encode.encode(
-            response, retrieve_pointers=False, private_local=private
-        )
+        # (the responses of a composite message are already serialized one by one)
+        if message_wrapper["type"] != "composite":
+            response = encode.encode(
+                response, retrieve_pointers=False, private_local=private
+            )
 
         response = self.encode_msg(response)
 
+        self.metrics.record(
+            "received",
+            message_wrapper["type"],
+            len(response),
+            len(message_wrapper_json),
+            time.perf_counter() - start,
+        )
+
         return response
 
     def encode_msg(self, msg):
@@ -331,7 +552,8 @@ class BaseWorker(ABC):
         return msgpack.packb(msg, use_bin_type=True)
 
     def decode_msg(self, msg):
-        return msgpack.unpackb(msg, raw=False)
+        # tensor payloads are msgpack extension types (see frameworks.binary)
+        return msgpack.unpackb(msg, raw=False, ext_hook=binary.ext_hook)
 
     def process_message_type(self, message_wrapper):
         """This method takes a message wrapper and attempts to process it
@@ -365,6 +587,12 @@ class BaseWorker(ABC):
             if isinstance(message, np.ndarray):
                 """do nothing."""
 
+            # several objects sent at once (see send_objs)
+            elif isinstance(message, list):
+                for obj in message:
+                    if not isinstance(obj, np.ndarray):
+                        torch_utils.fix_chain_structure(obj)
+
             # if object is a Torch object - pre-process it for registration
             else:
                 torch_utils.fix_chain_structure(object)
@@ -377,51 +605,71 @@ class BaseWorker(ABC):
             # TODO: send a "successful" or "not successful" response?
             return {}, False
 
+        # a share of a secret, sent as a seed to be expanded here. The
+        # expanded tensor is registered like a received object
+        # (see spdz.share_communication)
+        elif message_wrapper["type"] == "prg_share":
+
+            share = spdz.expand_seed(
+                message["seed"], message["shape"], spdz.deser_field(message["mod"])
+            )
+            self.de_register(share)
+            torch_utils.enforce_owner(share, self)
+            share.child.id = message["id"]
+            self.register(share)
+
+            return {}, False
+
+        # variables sent packed in a single flat buffer (see send_flat)
+        elif message_wrapper["type"] == "flat_obj":
+
+            variables = self._unpack_variables(message)
+            for variable, ids in zip(variables, message["ids"]):
+                variable.child.id, variable.data.child.id = ids[:2]
+                variable.grad.child.id, variable.grad.data.child.id = ids[2:]
+                self.register(variable)
+
+            return {}, False
+
         # if the message contains Receiving a request for an object
         # to be sent to another worker. For example "x.get()" would execute here.
         # if x is a pointer to an object hosted on this worker.
         elif message_wrapper["type"] == "req_obj":
 
-            # Because it was pointed at, it's the first syft_object of the chain,
-            # so its parent is the tensorvar
-            object = self.get_obj(message)
+            # False means we're actually return the data (it's not private)
+            return self._release_obj(message), False
 
-            # if object being returned is a numpy array
-            if isinstance(object, np.ndarray):
-                """"""
-                # delete the numpy array from our local registry
-                self.de_register(object)
+        # the same, for several objects at once (see request_objs)
+        elif message_wrapper["type"] == "req_objs":
 
-                # send the numpy array back to the worker that asked for it
-                return object, False
+            return [self._release_obj(remote_key) for remote_key in message], False
 
-            # object is a pytorch array
-            else:
+        # the same, for variables sent back packed in a flat buffer (see
+        # request_flat). The buffer is not a torch object, so the response is
+        # encoded as is
+        elif message_wrapper["type"] == "req_flat":
 
-                # if the object is NOT a variable, then we simply
-                # take the object's parent, and return the entire object
-                # all children will be serialized recursively
-                tensorvar = object.parent
+            variables = [self._release_obj(remote_key) for remote_key in message]
+            return self._pack_variables(variables), False
 
-                # if the object is a variable, we have to make special
-                # considerations to ensure that the data and grad are all
-                # properly deregistered
-                if torch_utils.is_variable_name(object.torch_type):
-                    syft_data_object = tensorvar.data.child
-                    self.de_register(syft_data_object)
-                    if tensorvar.grad is not None:
-                        syft_grad_object = tensorvar.grad.child
-                        self.de_register(syft_grad_object)
-                        syft_grad_data_object = tensorvar.grad.data.child
-                        self.de_register(syft_grad_data_object)
+        # a request to send an object to another worker, on behalf of the
+        # sender which points at it (see _TorchObject.move). The object is
+        # removed from here, as if it had been requested with req_obj
+        elif message_wrapper["type"] == "move":
 
+            recipient = self.get_worker(message["recipient"])
+            if isinstance(recipient, (str, int)):
+                raise LookupError(
+                    "{} can't move an object to the unknown worker {}".format(
+                        self.id, recipient
+                    )
+                )
 
-                # deregister the object
-                self.de_register(object)
+            ids = message["ids"]
+            object = self._release_obj(message["id"])
+            self.send_obj(object, ids[0], recipient, *ids[1:])
 
-                # return the object
-                # False means we're actually return the data (it's not private)
-                return tensorvar, False
+            return {}, False
 
         #  A torch command from another worker involving one or more tensors
         #  hosted locally. For example: "z = x + y" would execute here.
@@ -430,6 +678,11 @@ class BaseWorker(ABC):
             # route the command to the torch command logic
             result = self.process_torch_command(message)
 
+            # the sender may have chosen the ids of the result, to be able to
+            # use it in other commands before receiving this response
+            if message.get("return_ids") is not None:
+                self._set_result_ids(result, iter(message["return_ids"]))
+
             # save the results locally in self._objects
             self.register(result)
 
@@ -452,9 +705,102 @@ class BaseWorker(ABC):
             # Result is private - so only actually return a pointer to result
             return result, True
 
-        # A composite command. Must be unrolled
+        # A composite command. Must be unrolled: the messages are decoded and
+        # executed one after the other, so that a message can refer to the
+        # results of the previous ones (see return_ids in torch_cmd)
         elif message_wrapper["type"] == "composite":
-            raise NotImplementedError("Composite command not handled at the moment")
+
+            # messages compiled by older workers are indexed by their number
+            if isinstance(message, dict):
+                message = [message[k] for k in sorted(message.keys())]
+
+            responses = []
+            for sub_message_wrapper in message:
+                sub_message_wrapper = encode.decode(sub_message_wrapper, worker=self)
+                response, private = self.process_message_type(sub_message_wrapper)
+                responses.append(
+                    encode.encode(
+                        response, retrieve_pointers=False, private_local=private
+                    )
+                )
+
+            # each response is encoded with its own privacy
+            return responses, None
+
+        # torch commands queued by the sender in lazy mode (see sync), with the
+        # ids of the results it no longer points at. These temporary results
+        # are computed in place when possible, and deleted at the end
+        elif message_wrapper["type"] == "lazy":
+
+            temporary_ids = set(message["temporary_ids"])
+            uses = collections.Counter(self._pointed_ids(message["commands"]))
+            # only the results of elementwise commands own their storage: the
+            # others, such as view or t, may share the storage of their input
+            fresh_ids = {
+                id
+                for command in message["commands"]
+                if command["obj"]["command"] in IN_PLACE_COMMANDS
+                for id in command["obj"].get("return_ids", [])
+            }
+
+            for command in message["commands"]:
+                if not self._fuse_in_place(command, temporary_ids, fresh_ids, uses):
+                    command_wrapper = encode.decode(
+                        {"message": command, "type": "torch_cmd"}, worker=self
+                    )
+                    self.process_message_type(command_wrapper)
+
+            self.delete_objs(temporary_ids)
+
+            return {}, False
+
+        # a plan: torch commands recorded by the sender, stored to be run
+        # later on other tensors (see tensor.make_plan)
+        elif message_wrapper["type"] == "plan":
+
+            input_ids = message["input_ids"]
+            output_ids = message["output_ids"]
+            result_ids = {
+                id
+                for command in message["commands"]
+                for id in command["obj"].get("return_ids", [])
+            }
+            message["intermediate_ids"] = [
+                id
+                for id in result_ids
+                if id not in output_ids and id not in input_ids
+            ]
+            self._plans[message["id"]] = message
+
+            return {}, False
+
+        # a call of a plan, with the ids of its inputs and of its outputs. The
+        # ids recorded in the commands are replaced by these ones, and the
+        # intermediate results are deleted once the plan is run
+        elif message_wrapper["type"] == "run_plan":
+
+            plan = self._plans[message["id"]]
+            ids = dict(zip(plan["input_ids"], message["input_ids"]))
+            ids.update(zip(plan["output_ids"], message["output_ids"]))
+
+            for command in plan["commands"]:
+                command = self._map_plan_ids(command, ids)
+                command_wrapper = encode.decode(
+                    {"message": command, "type": "torch_cmd"}, worker=self
+                )
+                self.process_message_type(command_wrapper)
+
+            self.delete_objs(plan["intermediate_ids"])
+
+            return {}, False
+
+        # a message listing objects to delete, because the sender no longer
+        # points at them (see flush_garbage)
+        elif message_wrapper["type"] == "delete":
+
+            self.delete_objs(message)
+
+            return {}, False
 
         # a message asking for a list of tensors which fit a certain criteria.
         # at the time of writing this comment, this is a partial string match on the id
@@ -488,6 +834,128 @@ class BaseWorker(ABC):
         # Hopefully we don't reach this point.
         return "Unrecognized message type:" + message_wrapper["type"]
 
+    def _pointed_ids(self, message, location_id=None):
+        """Yields the ids of the objects of location_id (this worker by
+        default) which an encoded message points at, once per pointer."""
+        if location_id is None:
+            location_id = self.id
+        if isinstance(message, dict):
+            if message.get("location") == location_id and "id_at_location" in message:
+                yield message["id_at_location"]
+            for value in message.values():
+                yield from self._pointed_ids(value, location_id)
+        elif isinstance(message, list):
+            for value in message:
+                yield from self._pointed_ids(value, location_id)
+
+    def _fuse_in_place(self, command, temporary_ids, fresh_ids, uses):
+        """Runs an encoded elementwise command of a lazy message in place, if
+        self is a temporary result which only this command uses, computed by
+        an elementwise command of the same message (fresh_ids), and the other
+        tensor arguments have its size and type. The result is then registered
+        under the return id of the command, instead of the temporary one.
+
+        Returns False if the command can't be run in place."""
+        command = dict(command, obj=dict(command["obj"]))
+        obj = command["obj"]
+        in_place = IN_PLACE_COMMANDS.get(obj["command"])
+        return_ids = obj.get("return_ids")
+        if in_place is None or not obj["has_self"] or not return_ids or obj["kwargs"]:
+            return False
+
+        self_ids = list(self._pointed_ids(obj["self"]))
+        if len(self_ids) != 1:
+            return False
+        self_id = self_ids[0]
+        if self_id not in temporary_ids or self_id not in fresh_ids:
+            return False
+        if uses[self_id] != 1:
+            return False
+
+        tensor = self.get_obj(self_id).parent
+        args = obj["args"]
+        if isinstance(args, dict):
+            args = args.get(encode.get_serialized_key(()), [None])
+        for arg in args:
+            if isinstance(arg, (int, float)):
+                continue
+            arg_ids = list(self._pointed_ids(arg))
+            if len(arg_ids) != 1:
+                return False
+            other = self.get_obj(arg_ids[0]).parent
+            if type(other) is not type(tensor) or other.size() != tensor.size():
+                return False
+
+        obj["command"] = in_place
+        del obj["return_ids"]
+        command_wrapper = encode.decode(
+            {"message": command, "type": "torch_cmd"}, worker=self
+        )
+        self.process_message_type(command_wrapper)
+
+        syft_obj = self.get_obj(self_id)
+        self.rm_obj(self_id)
+        temporary_ids.discard(self_id)
+        syft_obj.id = return_ids[0]
+        self.set_obj(syft_obj.id, syft_obj)
+        return True
+
+    def _map_plan_ids(self, message, ids):
+        """Returns a copy of an encoded command of a plan, where the ids of
+        the objects of this worker and the return ids are replaced according
+        to the ids dict."""
+        if isinstance(message, dict):
+            message = {k: self._map_plan_ids(v, ids) for k, v in message.items()}
+            if message.get("location") == self.id and "id_at_location" in message:
+                id_at_location = message["id_at_location"]
+                message["id_at_location"] = ids.get(id_at_location, id_at_location)
+            if message.get("return_ids") is not None:
+                return_ids = message["return_ids"]
+                message["return_ids"] = [ids.get(id, id) for id in return_ids]
+            return message
+        elif isinstance(message, list):
+            return [self._map_plan_ids(m, ids) for m in message]
+        return message
+
+    def _release_obj(self, remote_key):
+        """Removes an object requested by another worker from the registry,
+        and returns what should be sent back: the array of a numpy array, or
+        the tensorvar at the head of the chain of a torch object."""
+
+        # Because it was pointed at, it's the first syft_object of the chain,
+        # so its parent is the tensorvar
+        object = self.get_obj(remote_key)
+
+        # if object being returned is a numpy array
+        if isinstance(object, np.ndarray):
+            # delete the numpy array from our local registry
+            self.de_register(object)
+
+            # send the numpy array back to the worker that asked for it
+            return object
+
+        # if the object is NOT a variable, then we simply
+        # take the object's parent, and return the entire object
+        # all children will be serialized recursively
+        tensorvar = object.parent
+
+        # if the object is a variable, we have to make special
+        # considerations to ensure that the data and grad are all
+        # properly deregistered
+        if torch_utils.is_variable_name(object.torch_type):
+            syft_data_object = tensorvar.data.child
+            self.de_register(syft_data_object)
+            if tensorvar.grad is not None:
+                syft_grad_object = tensorvar.grad.child
+                self.de_register(syft_grad_object)
+                syft_grad_data_object = tensorvar.grad.data.child
+                self.de_register(syft_grad_data_object)
+
+        # deregister the object
+        self.de_register(object)
+
+        return tensorvar
+
     def __str__(self):
         """This is a simple to-string for all classes that extend BaseWorker
         which just returns the type and ID of the worker. For example, a
@@ -655,6 +1123,9 @@ class BaseWorker(ABC):
             msg += " Check your code to make sure you haven't already called .get() on this pointer!!!"
 
             raise Exception(msg)
+
+        # reads the tensor back from disk if it was spilled
+        self.memory.touch(remote_key, obj, self._objects)
         return obj
 
     def set_obj(self, remote_key, value, force=False, tmp=False):
@@ -708,6 +1179,8 @@ class BaseWorker(ABC):
 
         if not self.is_client_worker or force:
             self._objects[remote_key] = value
+            self._index_tags(remote_key)
+            self.memory.add(remote_key, value, self._objects)
 
     def rm_obj(self, remote_key):
         """This method removes an object from the permament object registory if
@@ -732,6 +1205,189 @@ class BaseWorker(ABC):
                     if id_at_location in self._pointers[location].keys():
                         del self._pointers[location][id_at_location]
             del self._objects[remote_key]
+            self._unindex_tags(remote_key)
+            self.memory.remove(remote_key)
+
+    def delete_objs(self, remote_keys):
+        """Removes several objects from the permanent registry, if they exist.
+
+        :Parameters:
+
+        * **remote_keys (list)** the ids of the objects to be removed
+        """
+        for remote_key in remote_keys:
+            self.rm_obj(remote_key)
+
+    def retain_pointer(self, pointer, owned):
+        """Accounts for a new pointer of this worker to a remote object, and
+        returns the key under which it is counted.
+
+        :Parameters:
+
+        * **pointer (** :class:`_PointerTensor` **)** the new pointer
+
+        * **owned (bool)** whether this worker owns the remote object (it sent
+          it, or it is the result of one of its commands) and should delete it
+          when it no longer points at it. The object is only deleted if all the
+          pointers to it were created as owning it.
+        """
+        key = (pointer.location.id, pointer.id_at_location)
+        with self._gc_lock:
+            ref = self._remote_refs.get(key)
+            if ref is None:
+                self._remote_refs[key] = [1, owned]
+            else:
+                ref[0] += 1
+                ref[1] = ref[1] and owned
+            # the object is pointed at again before being deleted
+            garbage = self._garbage.get(key[0])
+            if garbage is not None:
+                garbage.pop(key[1], None)
+        return key
+
+    def retain_remote(self, key):
+        """Keeps a remote object alive until release_pointer(key) is called,
+        as one more pointer to it would. Returns False if the object is not
+        deleted once no longer pointed at anyway, and nothing was counted.
+
+        :Parameters:
+
+        * **key (tuple)** the (location id, id at location) of the object
+        """
+        with self._gc_lock:
+            ref = self._remote_refs.get(key)
+            if ref is None:
+                return False
+            ref[0] += 1
+        return True
+
+    def move_pointer(self, pointer, location, id_at_location):
+        """Makes pointer point at the remote object it pointed at once it has
+        been moved to id_at_location on location (see _TorchObject.move). The
+        object is still deleted when it's no longer pointed at, if it was
+        owned."""
+        pointers = self._pointers.get(pointer.location.id)
+        if pointers is not None:
+            pointers.pop(pointer.id_at_location, None)
+
+        owned = False
+        if pointer._remote_key is not None:
+            with self._gc_lock:
+                ref = self._remote_refs.get(pointer._remote_key)
+                owned = ref is not None and ref[1]
+            # there is nothing left to delete at the former location
+            self.disown_pointer(pointer._remote_key)
+            self.release_pointer(pointer._remote_key)
+
+        pointer.location = self.get_worker(location)
+        pointer.id_at_location = id_at_location
+        self._pointers.setdefault(pointer.location.id, {})
+        pointer.register_pointer()
+        pointer._remote_key = self.retain_pointer(pointer, owned)
+
+    def release_pointer(self, key):
+        """Called when a pointer is garbage collected. This can happen at any
+        point, even while a message is being sent, so the key is only queued:
+        the reference counts are updated the next time a message is sent."""
+        self._released.append(key)
+
+    def release_plan(self, location_id, plan_id):
+        """Called when a Plan is garbage collected. Like the remote objects no
+        longer pointed at, the plan stored by its location is deleted along
+        with the next message sent there."""
+        self._released_plans.append((location_id, plan_id))
+
+    def disown_pointer(self, key):
+        """Prevents the deletion of a remote object once it is no longer
+        pointed at, for instance because it was sent to another worker or
+        already fetched with .get()."""
+        with self._gc_lock:
+            ref = self._remote_refs.get(key)
+            if ref is not None:
+                ref[1] = False
+
+    def _collect_released(self):
+        """Updates the reference counts of the remote objects with the
+        pointers collected since the last call, and queues the owned objects
+        which are no longer pointed at for deletion."""
+        with self._gc_lock:
+            while self._released:
+                key = self._released.popleft()
+                ref = self._remote_refs.get(key)
+                if ref is None:
+                    continue
+                ref[0] -= 1
+                if ref[0] == 0:
+                    del self._remote_refs[key]
+                    if ref[1]:
+                        self._garbage.setdefault(key[0], {})[key[1]] = None
+            while self._released_plans:
+                location_id, plan_id = self._released_plans.popleft()
+                self._plan_garbage.setdefault(location_id, []).append(plan_id)
+
+    def _pop_garbage(self, location_id):
+        """Returns the ids of the objects of location_id to delete. The ones
+        which queued commands still use or create are kept until the commands
+        are sent."""
+        pending_ids = self._pending_ids(location_id)
+        with self._gc_lock:
+            garbage = self._garbage.get(location_id)
+            if not garbage:
+                return []
+            ids = [id for id in garbage if id not in pending_ids]
+            for id in ids:
+                del garbage[id]
+            if not garbage:
+                del self._garbage[location_id]
+        return ids
+
+    def _pending_ids(self, location_id):
+        """Returns the ids of the objects of location_id which the commands
+        queued for it (see sync) point at or return."""
+        ids = set()
+        for message, _ in self._pending_commands.get(location_id, ()):
+            ids.update(self._pointed_ids(message, location_id))
+            ids.update(message["obj"].get("return_ids", []))
+        return ids
+
+    def _flush_full_garbage(self):
+        """Deletes the objects queued for the workers which have more than
+        GC_BATCH_SIZE of them."""
+        with self._gc_lock:
+            full = [k for k, ids in self._garbage.items() if len(ids) >= GC_BATCH_SIZE]
+        for location_id in full:
+            self.flush_garbage(self.get_worker(location_id))
+
+    def flush_garbage(self, recipient=None):
+        """flush_garbage(self, recipient=None) -> None Deletes the remote
+        objects this worker no longer points at, and the plans it no longer
+        uses, with one message per worker.
+
+        They are otherwise deleted along with the next message sent to their
+        worker, or as soon as GC_BATCH_SIZE of them are queued for a worker.
+
+        :Parameters:
+
+        * **recipient (** :class:`BaseWorker` **, optional)** the worker whose
+          objects are deleted. By default, the objects of all the workers are
+          deleted.
+        """
+        self._collect_released()
+        if recipient is None:
+            with self._gc_lock:
+                location_ids = set(self._garbage) | set(self._plan_garbage)
+        else:
+            location_ids = [recipient.id]
+
+        for location_id in location_ids:
+            garbage = self._pop_garbage(location_id)
+            # the plans to delete are sent along with the message
+            if garbage or location_id in self._plan_garbage:
+                self.send_msg(
+                    message=garbage,
+                    message_type="delete",
+                    recipient=self.get_worker(location_id),
+                )
 
     def _clear_tmp_objects(self):
         """This method releases all objects from the temporary registry."""
@@ -1082,6 +1738,125 @@ class BaseWorker(ABC):
         * **recipient (** :class:`VirtualWorker` **)** the worker object to send the message to.
         """
 
+        self._set_sent_ids(
+            object, new_id, recipient, new_data_id, new_grad_id, new_grad_data_id
+        )
+
+        object = encode.encode(object, retrieve_pointers=False, private_local=False)
+
+        # We don't need any response to proceed to registration
+        self.send_msg(message=object, message_type="obj", recipient=recipient)
+
+    def send_objs(self, objects, new_ids, recipient):
+        """send_objs(self, objects, new_ids, recipient) Sends several objects
+        to another worker in a single message, and removes them from the
+        local worker.
+
+        :Parameters:
+        * **objects (list)** the python objects to be sent
+        * **new_ids (list)** for each object, the ids where it should be stored:
+          [id] for a tensor and [id, data_id, grad_id, grad_data_id] for a variable.
+        * **recipient (** :class:`BaseWorker` **)** the worker to send the message to.
+        """
+        for object, ids in zip(objects, new_ids):
+            self._set_sent_ids(object, ids[0], recipient, *ids[1:])
+
+        objects = encode.encode(
+            list(objects), retrieve_pointers=False, private_local=False
+        )
+
+        self.send_msg(message=objects, message_type="obj", recipient=recipient)
+
+    def send_flat(self, variables, new_ids, recipient):
+        """send_flat(self, variables, new_ids, recipient) Sends several
+        variables to another worker in a single message, like send_objs, but
+        with their data and grads packed in one contiguous buffer instead of
+        being serialized chain by chain. The recipient builds the variables
+        over views of this buffer.
+
+        :Parameters:
+        * **variables (list)** the variables to be sent, which must hold their
+          data locally
+        * **new_ids (list)** for each variable, the ids where it should be
+          stored: [id, data_id, grad_id, grad_data_id]
+        * **recipient (** :class:`BaseWorker` **)** the worker to send the message to.
+        """
+        for variable, ids in zip(variables, new_ids):
+            if not isinstance(variable.child, sy._LocalTensor):
+                raise TypeError(
+                    "Only local variables can be sent in a flat buffer, not a "
+                    "variable with a {} child".format(type(variable.child).__name__)
+                )
+            self._set_sent_ids(variable, ids[0], recipient, *ids[1:])
+
+        message = self._pack_variables(variables)
+        message["ids"] = [list(ids) for ids in new_ids]
+        message = encode.encode(message, retrieve_pointers=False, private_local=False)
+
+        self.send_msg(message=message, message_type="flat_obj", recipient=recipient)
+
+    def _pack_variables(self, variables):
+        """Packs the data, and the grads if any, of variables into a single
+        buffer (see binary.pack_flat). Returns the message describing them,
+        which _unpack_variables turns back into variables."""
+        arrays = []
+        entries = []
+        for variable in variables:
+            data = len(arrays)
+            arrays.append(variable.data.native_numpy())
+            grad = None
+            if variable.grad is not None and not torch_utils.is_tensor_empty(
+                variable.grad.data
+            ):
+                grad = len(arrays)
+                arrays.append(variable.grad.data.native_numpy())
+            torch_type = type(variable.data).__name__
+            entries.append([torch_type, variable.requires_grad, data, grad])
+
+        buffer, layout = binary.pack_flat(arrays)
+        return {
+            "buffer": binary.pack_ndarray(buffer),
+            "layout": layout,
+            "variables": entries,
+        }
+
+    def _unpack_variables(self, message):
+        """Builds the variables packed by _pack_variables, owned by this
+        worker but not registered yet."""
+        # the received buffer is a read-only view on the message: it's copied
+        # once, and every tensor is a view on this copy
+        buffer = np.array(message["buffer"])
+        arrays = binary.unpack_flat(buffer, message["layout"])
+
+        variables = []
+        for torch_type, requires_grad, data, grad in message["variables"]:
+            tensor = torch.guard[torch_type]()
+            if arrays[data].size > 0:
+                tensor.native_set_(torch.native_from_numpy(arrays[data]))
+            variable = sy.Variable(tensor, requires_grad=requires_grad)
+            variable.init_grad_()
+            if grad is not None:
+                variable.grad.data.native_set_(torch.native_from_numpy(arrays[grad]))
+
+            self.de_register(variable)
+            self.de_register(variable.grad)
+            torch_utils.enforce_owner(variable, self)
+            variables.append(variable)
+
+        return variables
+
+    def _set_sent_ids(
+        self,
+        object,
+        new_id,
+        recipient,
+        new_data_id=None,
+        new_grad_id=None,
+        new_grad_data_id=None,
+    ):
+        """Gives to an object about to be sent to recipient the ids it will
+        have there, after checking that they're not in use."""
+
         # if the object is a torch object, run some special checks, otherwise just set the ID
         if hasattr(object, "child"):
             object.child.id = new_id
@@ -1136,10 +1911,249 @@ class BaseWorker(ABC):
                 )
             )
 
-        object = encode.encode(object, retrieve_pointers=False, private_local=False)
+    def send_obj_many(self, object, recipients, new_ids):
+        """send_obj_many(self, obj, recipients, new_ids) Sends the same torch
+        object to several workers. The object is encoded only once, with
+        placeholder ids, and the ids of each recipient are then written in a
+        copy of the encoded message (see frameworks.binary.patch_ids). The ids
+        of object are left unchanged.
 
-        # We don't need any response to proceed to registration
-        self.send_msg(message=object, message_type="obj", recipient=recipient)
+        :Parameters:
+        * **object (object)** a torch tensor or variable to be sent
+        * **recipients (list of** :class:`BaseWorker` **)** the workers to send the object to.
+        * **new_ids (list)** for each recipient, the ids where the object should be stored:
+          [id] for a tensor and [id, data_id, grad_id, grad_data_id] for a variable.
+        """
+        if torch_utils.is_variable_name(object.child.torch_type):
+            if object.grad is None:
+                object.init_grad_()
+            nodes = [object, object.data, object.grad, object.grad.data]
+        else:
+            nodes = [object]
+
+        for recipient, ids in zip(recipients, new_ids):
+            if self is recipient:
+                raise MemoryError(
+                    "The recipient {} is the same as the owner {} of the object {} that you are trying to send".format(
+                        recipient, self, object.id
+                    )
+                )
+            if len(ids) != len(nodes):
+                raise AttributeError(
+                    "Please provide {} ids for each recipient".format(len(nodes))
+                )
+            for id in ids:
+                if self.get_pointer_to(recipient, id) is not None:
+                    raise MemoryError("You already point at ", recipient, ":", id)
+
+        # Encode the object once, with placeholders instead of the ids
+        old_ids = [node.child.id for node in nodes]
+        placeholders = [binary.id_placeholder() for _ in nodes]
+        try:
+            for node, placeholder in zip(nodes, placeholders):
+                node.child.id = placeholder
+            message = encode.encode(object, retrieve_pointers=False, private_local=False)
+            template = self.encode_msg({"message": message, "type": "obj"})
+        finally:
+            for node, id in zip(nodes, old_ids):
+                node.child.id = id
+
+        offsets = [binary.find_id_placeholder(template, p) for p in placeholders]
+
+        for recipient, ids in zip(recipients, new_ids):
+            # the commands queued in async mode must be executed first
+            if recipient.id in self._pending_commands:
+                self.sync(recipient)
+            message_wrapper_json = binary.patch_ids(template, offsets, ids)
+            self._send_encoded_msg(message_wrapper_json, "obj", recipient)
+
+    def _set_result_ids(self, result, return_ids):
+        """Gives to the syft objects of result the ids consumed from the
+        return_ids iterator: one id for a tensor, four ids for a variable (for
+        var, var.data, var.grad and var.grad.data)"""
+        if torch_utils.is_variable(result):
+            if result.grad is None:
+                result.init_grad_()
+            syft_objects = [
+                result.child,
+                result.data.child,
+                result.grad.child,
+                result.grad.data.child,
+            ]
+        elif torch_utils.is_tensor(result):
+            syft_objects = [result.child]
+        elif isinstance(result, (list, tuple)):
+            for res in result:
+                self._set_result_ids(res, return_ids)
+            return
+        else:
+            return
+
+        for syft_object in syft_objects:
+            new_id = next(return_ids, None)
+            if new_id is None:
+                return
+            self.rm_obj(syft_object.id)
+            syft_object.id = new_id
+
+    def send_composite(self, messages, recipient):
+        """send_composite(self, messages, recipient) -> list Sends several
+        messages to recipient in a single round trip. They are executed in
+        order by the recipient and their responses come back in one message.
+
+        :Parameters:
+
+        * **messages (list of (message, message_type))** the messages to send,
+          as they would be given to :func:`send_msg`.
+
+        * **recipient (** :class:`BaseWorker` **)** the worker executing the messages.
+
+        * **out (list)** the decoded response of each message.
+
+        :Example:
+
+        >>> cmd1, _, _ = torch_utils.compile_command("__add__", [y], {}, True, x, return_ids=[z_id])
+        >>> cmd2, _, _ = torch_utils.compile_command("__mul__", [z], {}, True, z)
+        >>> me.send_composite([(cmd1, "torch_cmd"), (cmd2, "torch_cmd")], bob)
+        """
+        message = [
+            {"message": message, "type": message_type}
+            for message, message_type in messages
+        ]
+        response = self.send_msg(
+            message=message, message_type="composite", recipient=recipient
+        )
+        return [encode.decode(r, worker=self) for r in self.decode_msg(response)]
+
+    def queue_torch_command(self, recipient, message, result=None):
+        """Queues a torch command for recipient, to be sent on the next
+        sync. result is the local pointer to the result of the command."""
+        self._pending_commands.setdefault(recipient.id, []).append((message, result))
+
+    def sync(self, recipient=None):
+        """sync(self, recipient=None) -> None Sends the torch commands queued
+        in async mode, as one composite message per recipient, and waits for
+        their execution. This is done automatically before any other message
+        is sent to the same recipient, for instance on .get().
+
+        In lazy mode, the commands are sent in a "lazy" message instead, along
+        with the ids of their results which are no longer pointed at: the
+        recipient computes chains of elementwise commands in place on these
+        temporary results, and deletes them once the commands are executed.
+
+        :Parameters:
+
+        * **recipient (** :class:`BaseWorker` **, optional)** the worker whose
+          commands are sent. By default, the commands of all the workers are sent.
+
+        :Example:
+
+        >>> me.async_mode = True
+        >>> z = x + y  # nothing is sent yet
+        >>> w = z * z
+        >>> me.sync()  # one message for the 2 commands
+
+        >>> me.lazy_mode = True
+        >>> w = (x + y) * 2 - 1  # only one tensor is allocated by the recipient
+        >>> w.get()
+        """
+        if recipient is None:
+            recipients = list(self._pending_commands.keys())
+        else:
+            recipients = [recipient.id]
+
+        if self._tracing is not None and self._tracing.id in recipients:
+            raise NotImplementedError(
+                "Messages can't be sent to {} while a plan is recorded".format(
+                    self._tracing.id
+                )
+            )
+
+        for recipient_id in recipients:
+            pending = self._pending_commands.pop(recipient_id, None)
+            if not pending:
+                continue
+            if self.lazy_mode:
+                self._send_lazy(pending, self.get_worker(recipient_id))
+            else:
+                self.send_composite(
+                    [(message, "torch_cmd") for message, _ in pending],
+                    self.get_worker(recipient_id),
+                )
+
+    def _send_lazy(self, pending, recipient):
+        """Sends the commands queued for recipient in lazy mode (see sync)."""
+        # the pointers of the results live in reference cycles with their
+        # wrappers, which only a collection of the whole heap would release.
+        # The cycles are broken while the queue holding the pointers is
+        # emptied, so the temporary results are released right away
+        messages = [message for message, _ in pending]
+        results = []
+        for _, result in pending:
+            if isinstance(result, sy._PointerTensor) and result.parent is not None:
+                results.append((weakref.ref(result), weakref.ref(result.parent)))
+                result.parent = None
+        pending.clear()
+
+        for pointer_ref, wrapper_ref in results:
+            pointer = pointer_ref()
+            if pointer is None:
+                continue
+            wrapper = wrapper_ref()
+            if wrapper is None:
+                # the pointer is used without its wrapper, in a
+                # _GeneralizedPointerTensor for instance
+                pointer.wrap()
+            else:
+                pointer.parent = wrapper
+        self._collect_released()
+
+        # the results no longer pointed at were never created remotely: they
+        # are not deleted before the commands, but by the recipient after them
+        return_ids = {
+            id for message in messages for id in message["obj"].get("return_ids", [])
+        }
+        with self._gc_lock:
+            garbage = self._garbage.get(recipient.id, {})
+            temporary_ids = [id for id in garbage if id in return_ids]
+            for id in temporary_ids:
+                del garbage[id]
+
+        message = {
+            "commands": messages,
+            "temporary_ids": temporary_ids,
+        }
+        self.send_msg(message=message, message_type="lazy", recipient=recipient)
+
+    def send_msgs(self, messages):
+        """send_msgs(self, messages) -> list Sends several messages and returns
+        their (encoded) responses in the same order. When every message goes
+        to a different worker and all these workers support it, the messages
+        are sent concurrently so that the round trips overlap; otherwise they
+        are sent one after the other.
+
+        :Parameters:
+
+        * **messages (list)** a list of (message, message_type, recipient) tuples
+        """
+        recipients = [recipient for _, _, recipient in messages]
+        concurrent = (
+            len(messages) > 1
+            and len({recipient.id for recipient in recipients}) == len(messages)
+            and all(recipient.supports_concurrent_send for recipient in recipients)
+        )
+        if not concurrent:
+            return [
+                self.send_msg(message, message_type, recipient)
+                for message, message_type, recipient in messages
+            ]
+
+        executor = _get_send_executor()
+        futures = [
+            executor.submit(self.send_msg, message, message_type, recipient)
+            for message, message_type, recipient in messages
+        ]
+        return [future.result() for future in futures]
 
     def send_torch_command(self, recipient, message):
         """send_torch_command(self, recipient, message) -> object.
@@ -1203,6 +2217,48 @@ class BaseWorker(ABC):
 
         return object
 
+    def request_objs(self, obj_ids, recipient):
+        """request_objs(self, obj_ids, recipient) -> list Requests several
+        objects from another worker in a single message (see request_obj).
+
+        :Parameters:
+
+        * **obj_ids (list of str or int)** the ids of the objects being requested
+
+        * **recipient (** :class:`BaseWorker` **)** the worker who currently has the
+          objects.
+
+        * **out (list)** the objects, in the order of obj_ids
+        """
+
+        objects = self.send_msg(
+            message=list(obj_ids), message_type="req_objs", recipient=recipient
+        )
+
+        return encode.decode(objects, worker=self)
+
+    def request_flat(self, obj_ids, recipient):
+        """request_flat(self, obj_ids, recipient) -> list Requests several
+        variables from another worker, which sends them back packed in a
+        single flat buffer (see send_flat).
+
+        :Parameters:
+
+        * **obj_ids (list of str or int)** the ids of the variables being requested
+
+        * **recipient (** :class:`BaseWorker` **)** the worker who currently has the
+          variables.
+
+        * **out (list)** the variables, in the order of obj_ids, which are not
+          registered
+        """
+
+        message = self.send_msg(
+            message=list(obj_ids), message_type="req_flat", recipient=recipient
+        )
+
+        return self._unpack_variables(encode.decode(message, worker=self))
+
     def get_pointer_to(self, location, id_at_location):
         # We keep a dict with keys = owners and subkeys id@loc : self._pointers[location][id@loc] = obj_id
         # But it has to be updated every time you add, SEND or de_register a pointer
@@ -1,11 +1,15 @@
 import json
 import socket
-
-import msgpack
+import struct
 
 from syft.core.frameworks import encode
 from syft.core.workers import BaseWorker
 
+# Every message is prefixed by its length, as an unsigned 64 bits integer
+FRAME_HEADER = struct.Struct("!Q")
+# Maximum number of bytes handed to the socket at once
+FRAME_CHUNK_SIZE = 1 << 20
+
 
 class SocketWorker(BaseWorker):
     """A worker capable of performing the functions of a BaseWorker across a
@@ -85,6 +89,10 @@ class SocketWorker(BaseWorker):
     [torch.FloatTensor of size 5]
     """
 
+    # messages to different workers can be sent from different threads:
+    # each connection is only used by one message at a time
+    supports_concurrent_send = True
+
     def __init__(
         self,
         hook=None,
@@ -99,6 +107,8 @@ class SocketWorker(BaseWorker):
         verbose=True,
         is_pointer=False,
         queue_size=0,
+        memory_budget=None,
+        spill_dir=None,
     ):
 
         super().__init__(
@@ -110,6 +120,8 @@ class SocketWorker(BaseWorker):
             known_workers=known_workers,
             verbose=verbose,
             queue_size=queue_size,
+            memory_budget=memory_budget,
+            spill_dir=spill_dir,
         )
 
         self.hostname = hostname
@@ -157,16 +169,18 @@ class SocketWorker(BaseWorker):
             connection, address = self.serversocket.accept()
             try:
                 while num_messages != 0:
-                    # collapse buffer of messages into a string
+                    # read one full message
                     message = self._process_buffer(connection)
 
+                    # the client closed the connection, wait for the next one
+                    if message is None:
+                        break
+
                     # process message and generate response
-                    response = self.receive_msg(message)  # .decode()
+                    response = self.receive_msg(message)
 
-                    # if(response[-1] != b"\n"):
-                    #    response += b"\n"
                     # send response back
-                    connection.send(response)  # .encode()
+                    self._send_frame(connection, response)
 
                     if self.verbose:
                         print("Received Command From:", address)
@@ -228,37 +242,67 @@ class SocketWorker(BaseWorker):
           local development with :class:`VirtualWorker` workers.
         """
 
-        recipient.clientsocket.send(message_wrapper_json_binary)
+        self._send_frame(recipient.clientsocket, message_wrapper_json_binary)
 
         response = self._process_buffer(recipient.clientsocket)
+        if response is None:
+            raise ConnectionError("Connection closed by " + str(recipient.id))
 
         return response
 
     @classmethod
-    def _process_buffer(cls, socket, buffer_size=108_192, delimiter="\n"):
-        # WARNING: will hang if buffer doesn't finish with newline
+    def _process_buffer(cls, socket, chunk_size=FRAME_CHUNK_SIZE):
+        """Reads one length-prefixed message from socket.
 
-        buffer = socket.recv(buffer_size)  # .decode('utf-8')
-        # buffer = msgpack.unpackb(buffer, raw=False)
-        # print('decoded')
-        # print(buffer)
-        return buffer
+        Messages are framed with an 8 bytes big-endian header holding the
+        length of the payload. The payload is read in chunks straight into a
+        preallocated buffer, so large messages are neither truncated nor
+        copied while they are reassembled.
 
-        buffering = True
-        while buffering:
-            print(buffer)
-            if delimiter in buffer:
+        :Parameters:
 
-                (line, buffer) = buffer.split(delimiter, 1)
+        * **socket (socket.socket)** the connection to read from.
 
-                return line + delimiter
-            else:
-                more = socket.recv(buffer_size)  # .decode('utf-8')
-                more = msgpack.unpackb(more, raw=False)
-                if not more:
-                    buffering = False
-                else:
-                    buffer += more
-        if buffer:
-            print("processed")
-            return buffer
+        * **chunk_size (int, optional)** the maximum number of bytes read per
+          call to recv.
+
+        * **out (bytearray or None)** the payload of the message, or None if
+          the peer closed the connection before sending a new message.
+        """
+        header = cls._recv_exactly(socket, FRAME_HEADER.size, chunk_size)
+        if header is None:
+            return None
+
+        (size,) = FRAME_HEADER.unpack(header)
+        payload = cls._recv_exactly(socket, size, chunk_size)
+        if payload is None:
+            raise ConnectionError("Connection closed in the middle of a message")
+        return payload
+
+    @staticmethod
+    def _recv_exactly(socket, size, chunk_size=FRAME_CHUNK_SIZE):
+        """Reads exactly size bytes from socket, returns None if the
+        connection is closed before the first byte is received."""
+        buffer = bytearray(size)
+        view = memoryview(buffer)
+        received = 0
+        while received < size:
+            n = socket.recv_into(view[received:], min(size - received, chunk_size))
+            if n == 0:
+                if received == 0:
+                    return None
+                raise ConnectionError("Connection closed in the middle of a message")
+            received += n
+        return buffer
+
+    @staticmethod
+    def _send_frame(socket, payload, chunk_size=FRAME_CHUNK_SIZE):
+        """Writes payload to socket, prefixed by its length.
+
+        The payload is streamed in chunks of at most chunk_size bytes with
+        sendall, which never leaves part of a message unsent.
+        """
+        socket.sendall(FRAME_HEADER.pack(len(payload)))
+        view = memoryview(payload)
+        for start in range(0, len(view), chunk_size):
+            socket.sendall(view[start : start + chunk_size])
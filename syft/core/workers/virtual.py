@@ -82,6 +82,8 @@ class VirtualWorker(BaseWorker):
         known_workers={},
         verbose=False,
         queue_size=0,
+        memory_budget=None,
+        spill_dir=None,
     ):
 
         super().__init__(
@@ -93,6 +95,8 @@ class VirtualWorker(BaseWorker):
             known_workers=known_workers,
             verbose=verbose,
             queue_size=queue_size,
+            memory_budget=memory_budget,
+            spill_dir=spill_dir,
         )
 
     def _send_msg(self, message_wrapper_json_binary, recipient):
@@ -1,8 +1,8 @@
 import websockets
 import asyncio
 import json
+import threading
 
-from syft.core import utils
 from syft.core.workers import BaseWorker
 
 
@@ -41,6 +41,10 @@ class WebSocketWorker(BaseWorker):
 
     * **verbose (bool, optional)** A flag for whether or not to print events to stdout.
 
+    * **pool_size (int, optional)** When the worker is a pointer, the maximum number
+      of connections kept open to the remote worker. Connections are opened lazily,
+      reused across messages and re-established if the server dropped them.
+
 
     :Example Server:
 
@@ -86,6 +90,10 @@ class WebSocketWorker(BaseWorker):
     [torch.FloatTensor of size 5]
     """
 
+    # messages to different workers can be sent from different threads:
+    # each message borrows its own pooled connection
+    supports_concurrent_send = True
+
     def __init__(
         self,
         hook=None,
@@ -100,6 +108,9 @@ class WebSocketWorker(BaseWorker):
         verbose=True,
         is_pointer=False,
         queue_size=0,
+        memory_budget=None,
+        spill_dir=None,
+        pool_size=4,
     ):
 
         super().__init__(
@@ -111,6 +122,8 @@ class WebSocketWorker(BaseWorker):
             known_workers=known_workers,
             verbose=verbose,
             queue_size=queue_size,
+            memory_budget=memory_budget,
+            spill_dir=spill_dir,
         )
 
         self.is_asyncronous = True
@@ -122,48 +135,107 @@ class WebSocketWorker(BaseWorker):
         self.max_connections = max_connections
         self.is_pointer = is_pointer
 
+        # Client side connection pool, all the connections live on a single
+        # event loop which runs in a background thread (see _client_loop)
+        self.pool_size = pool_size
+        self._loop = None
+        self._loop_lock = threading.Lock()
+        self._idle_connections = []
+        self._pool_semaphore = None
+
         if self.is_pointer:
             if self.verbose:
                 print("Attaching Pointer to WebSocket Worker....")
             self.serversocket = None
-            clientsocket = websockets.client.connect(self.uri)
-            self.clientsocket = clientsocket
 
         else:
             if self.verbose:
                 print("Starting a Websocket Worker....")
-                if not is_client_worker or self.is_pointer:
+            if not is_client_worker or self.is_pointer:
+                if self.verbose:
                     print("Ready to recieve commands....")
-                    self.serversocket = websockets.serve(
-                        self._server_socket_listener, self.hostname, self.port
-                    )
+                self.serversocket = websockets.serve(
+                    self._server_socket_listener,
+                    self.hostname,
+                    self.port,
+                    max_size=None,
+                )
+                if self.verbose:
                     print("Server Socket has been initialized")
-                    asyncio.get_event_loop().run_until_complete(self.serversocket)
-                    asyncio.get_event_loop().run_forever()
+                asyncio.get_event_loop().run_until_complete(self.serversocket)
+                asyncio.get_event_loop().run_forever()
+
+            elif self.verbose:
+                print("Ready...")
 
-                else:
-                    print("Ready...")
+    def _client_loop(self):
+        """Returns the event loop carrying the client connections, starting it
+        in a daemon thread on first use.
 
-    async def _client_socket_connect(self, json_request):
-        """Establishes a connection to the server socket and waits for a
-        response. Then the response is returned.
+        The same loop is reused for every message, so that connections
+        opened on it can be kept alive between messages.
+        """
+        if self._loop is None:
+            with self._loop_lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    thread = threading.Thread(target=loop.run_forever, daemon=True)
+                    thread.start()
+                    self._loop = loop
+        return self._loop
+
+    async def _acquire_connection(self):
+        """Takes an idle connection from the pool, or opens a new one if
+        fewer than pool_size connections are in use."""
+        if self._pool_semaphore is None:
+            self._pool_semaphore = asyncio.Semaphore(self.pool_size)
+
+        await self._pool_semaphore.acquire()
+        try:
+            while self._idle_connections:
+                connection = self._idle_connections.pop()
+                if connection.open:
+                    return connection
+            return await websockets.connect(self.uri, max_size=None)
+        except Exception:
+            self._pool_semaphore.release()
+            raise
+
+    def _release_connection(self, connection):
+        """Gives a connection back to the pool."""
+        if connection.open:
+            self._idle_connections.append(connection)
+        self._pool_semaphore.release()
+
+    async def _client_socket_connect(self, message_wrapper_binary):
+        """Sends a message on a pooled connection to the server socket and
+        waits for a response. Then the response is returned.
+
+        If the server closed the connection while it was idle, the message is
+        sent again on a new connection. A connection lost while waiting for the
+        response is not retried since the message may have been processed.
 
         :Parameters:
 
-        * **json_request** JSON request that is needed to be sent to the server Socket
+        * **message_wrapper_binary** the message to send to the server socket
 
-        * ** out (json)** The response from the server is returned as JSON.
+        * **out (binary)** The response from the server.
         """
-
-        async with websockets.connect(self.uri) as client_socket:
-            await client_socket.send(json_request)
-            recieved_msg = await client_socket.recv()
-            return recieved_msg
+        connection = await self._acquire_connection()
+        try:
+            try:
+                await connection.send(message_wrapper_binary)
+            except websockets.exceptions.ConnectionClosed:
+                connection = await websockets.connect(self.uri, max_size=None)
+                await connection.send(message_wrapper_binary)
+            return await connection.recv()
+        finally:
+            self._release_connection(connection)
 
     async def _server_socket_listener(self, websocket, path):
-        """A listener for the server socket so whenever a message is sent by a
-        client to the server socket, this method is called and the server
-        responses accordingly.
+        """A listener for the server socket so whenever a client connects to
+        the server socket, this method is called and the server answers every
+        message received on the connection until the client closes it.
 
         :Parameters:
 
@@ -171,14 +243,10 @@ class WebSocketWorker(BaseWorker):
 
         * **path** The path which messages are recieved from and sent to.
         """
-
-        msg_wrapper_byte = await websocket.recv()
-        msg_wrapper_str = msg_wrapper_byte.decode("utf-8")
-        if self.verbose:
-            print("Recieved Command From:", self.uri)
-        decoder = utils.PythonJSONDecoder(self)
-        msg_wrapper = decoder.decode(msg_wrapper_str)
-        await websocket.send(self.process_message_type(msg_wrapper))
+        async for message_wrapper_binary in websocket:
+            if self.verbose:
+                print("Recieved Command From:", self.uri)
+            await websocket.send(self.receive_msg(message_wrapper_binary))
 
     def whoami(self):
         """Returns metadata information about the worker.
@@ -188,58 +256,39 @@ class WebSocketWorker(BaseWorker):
         """
         return json.dumps({"uri": self.uri, "id": self.id})
 
-    async def _send_msg(self, message_wrapper_json_binary, recipient):
-        response = await recipient._client_socket_listener(message_wrapper_json_binary)
-        response = self._process_buffer(response=response)
-        return response
-
-    def send_msg(self, message, message_type, recipient):
+    def _send_msg(self, message_wrapper_json_binary, recipient):
         """Sends a string message to another worker with message_type
         information indicating how the message should be processed.
 
         :Parameters:
 
-        * **recipient (** :class:`VirtualWorker` **)** the worker being sent a message.
-
-        * **message (string)** the message being sent
+        * **recipient (** :class:`WebSocketWorker` **)** the worker being sent a message.
 
-        * **message_type (string)** the type of message being sent. This affects how
-          the message is processed by the recipient. The types of message are described
-          in :func:`receive_msg`.
+        * **message_wrapper_json_binary (binary)** the message being sent encoded in binary
 
-        * **out (object)** the response from the message being sent. This can be a variety
-          of object types. However, the object is typically only used during testing or
-          local development with :class:`VirtualWorker` workers.
+        * **out (binary)** the response from the message being sent.
         """
-        message_wrapper = {}
-        message_wrapper["message"] = message
-        message_wrapper["type"] = message_type
-        self.message_queue.append(message_wrapper)
-        if self.queue_size:
-            if len(self.message_queue) > self.queue_size:
-                message_wrapper = self.compile_composite_message()
-            else:
-                return None
-
-        message_wrapper_json = json.dumps(message_wrapper) + "\n"
-
-        message_wrapper_json_binary = message_wrapper_json.encode()
-
-        self.message_queue = []
-        response = recipient._client_socket_listener(message_wrapper_json_binary)
-        response = self._process_buffer(response=response)
-        return response
-
-    def _process_buffer(cls, response, delimiter="\n"):
-        buffer = response
-        if delimiter in buffer:
-            (line, buffer) = buffer.split(delimiter, 1)
-            return line + delimiter
-        else:
-            return buffer
-
-    def _client_socket_listener(cls, message_wrapper_json_binary):
-        response = asyncio.get_event_loop().run_until_complete(
-            cls._client_socket_connect(message_wrapper_json_binary)
+        return recipient._client_socket_listener(message_wrapper_json_binary)
+
+    def _client_socket_listener(self, message_wrapper_binary):
+        """Sends a message from any thread and blocks until the response
+        arrives. Several threads may send at once, each one on its own pooled
+        connection."""
+        future = asyncio.run_coroutine_threadsafe(
+            self._client_socket_connect(message_wrapper_binary), self._client_loop()
         )
-        return response
+        return future.result()
+
+    def close(self):
+        """Closes the pooled connections and stops the client event loop."""
+        if self._loop is None:
+            return
+
+        async def close_connections():
+            while self._idle_connections:
+                await self._idle_connections.pop().close()
+
+        asyncio.run_coroutine_threadsafe(close_connections(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop = None
+        self._pool_semaphore = None
@@ -5,8 +5,11 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import hashlib
 import numpy as np
 import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from six.moves import xrange
 
 import torch
@@ -16,6 +19,7 @@ from torch.autograd import Variable as Var
 from torch.utils.data import DataLoader, Dataset
 
 ckpt_path = "checkpoint/"
+votes_path = "votes/"
 
 
 def partition_dataset(data, labels, nb_teachers, teacher_id):
@@ -155,18 +159,45 @@ def train_teachers(
     train(model, train_loader, test_loader, ckpt_path, filename)
 
 
-def softmax_preds(model, nb_labels, images_loader, ckpt_path, return_logits=False):
+def label_dtype(nb_labels):
+    """Helper function: smallest integer type which can hold the labels."""
+    return np.int8 if nb_labels <= np.iinfo(np.int8).max + 1 else np.int16
+
+
+def softmax_preds(
+    model,
+    nb_labels,
+    images_loader,
+    ckpt_path,
+    return_logits=False,
+    out=None,
+    labels_only=False,
+):
     """Compute softmax activations (probabilities) with the model saved in the
     path specified as an argument.
 
+    The model runs in inference mode (volatile Variables) and the predictions
+    of each batch are written to out as soon as they are computed, so out can
+    be a memory-mapped array larger than the memory.
+
     :param images: a np array of images
     :param ckpt_path: a TF model checkpoint
     :param logits: if set to True, return logits instead of probabilities
-    :return: probabilities (or logits if logits is set to True)
+    :param out: array of shape (samples, nb_labels), or (samples,) when
+                labels_only is set, to write the predictions to. It is
+                allocated in memory if not given.
+    :param labels_only: if set to True, only the label (argmax) of each sample
+                        is kept
+    :return: probabilities (or logits if logits is set to True, or labels if
+             labels_only is set to True)
     """
     # Compute nb samples and deduce nb of batches
     data_length = len(images_loader.dataset)
-    preds = np.zeros((data_length, nb_labels), dtype=np.float32)
+    if out is None:
+        if labels_only:
+            out = np.zeros(data_length, dtype=label_dtype(nb_labels))
+        else:
+            out = np.zeros((data_length, nb_labels), dtype=np.float32)
     start = 0
 
     check = torch.load(ckpt_path)
@@ -174,19 +205,79 @@ def softmax_preds(model, nb_labels, images_loader, ckpt_path, return_logits=Fals
     model.eval()  # set model to evaluate mode
 
     for img, label in images_loader:
-        output = model(Var(img))
-        output_softmax = F.softmax(output).data.numpy()
+        # No graph is needed, as there is no backward pass
+        output = model(Var(img, volatile=True))
 
         end = start + len(img)
 
-        preds[start:end, :] = output_softmax
+        if labels_only:
+            # The softmax doesn't change the argmax
+            out[start:end] = output.data.max(1)[1].view(-1).numpy()
+        elif return_logits:
+            out[start:end, :] = output.data.numpy()
+        else:
+            out[start:end, :] = F.softmax(output).data.numpy()
 
         start += len(img)
 
-    return preds
+    return out
+
+
+def teacher_filename(dataset, nb_teachers, teacher_id):
+    """Helper function: name of the checkpoint file of a teacher model."""
+    return (
+        str(dataset) + "_" + str(nb_teachers) + "_teachers_" + str(teacher_id) + ".pth"
+    )
+
+
+def _teachers_softmax_preds(
+    model,
+    nb_labels,
+    dataset,
+    batch_size,
+    filenames,
+    result_path,
+    result_shape,
+    labels_only,
+):
+    """Runs in a worker process of ensemble_preds(): computes the predictions
+    of some teachers and writes them straight into the memory-mapped result
+    array, so that nothing is sent back to the parent process.
+
+    :param filenames: dict teacher id -> checkpoint filename of the teachers
+    """
+    # The teachers already run in parallel, one per process
+    torch.set_num_threads(1)
+
+    stdnt_data_loader = DataLoader(dataset, batch_size=batch_size, shuffle=False)
+    dtype = label_dtype(nb_labels) if labels_only else np.float32
+    result = np.memmap(result_path, dtype=dtype, mode="r+", shape=result_shape)
+
+    for teacher_id, filename in filenames.items():
+        softmax_preds(
+            model,
+            nb_labels,
+            stdnt_data_loader,
+            ckpt_path + filename,
+            out=result[teacher_id],
+            labels_only=labels_only,
+        )
+        print("Computed Teacher " + str(teacher_id) + " softmax predictions")
+
+    result.flush()
+    del result
 
 
-def ensemble_preds(model, dataset, nb_labels, nb_teachers, stdnt_data_loader):
+def ensemble_preds(
+    model,
+    dataset,
+    nb_labels,
+    nb_teachers,
+    stdnt_data_loader,
+    n_jobs=1,
+    result_path=None,
+    labels_only=False,
+):
     """Given a dataset, a number of teachers, and some input data, this helper
     function queries each teacher for predictions on the data and returns all
     predictions in a single array. (That can then be aggregated into one single
@@ -196,38 +287,211 @@ def ensemble_preds(model, dataset, nb_labels, nb_teachers, stdnt_data_loader):
     :param dataset: string corresponding to mnist, cifar10, or svhn
     :param nb_teachers: number of teachers (in the ensemble) to learn from
     :param stdnt_data: unlabeled student training data
-    :return: 3d array (teacher id, sample id, probability per class)
+    :param n_jobs: number of processes among which the teachers are spread
+                   (-1 for one per CPU core). Each process writes the
+                   predictions of its teachers in a memory-mapped array.
+    :param result_path: if given, the predictions are written batch by batch
+                        to a memory-mapped array backed by this file, which is
+                        returned. When n_jobs > 1 and result_path is not
+                        given, a temporary file is used and the result is
+                        loaded in memory.
+    :param labels_only: if set to True, only the label given by each teacher to
+                        each sample is kept (see teacher_labels()), as int8 (or
+                        int16 for more than 128 labels)
+    :return: 3d array (teacher id, sample id, probability per class), or 2d
+             array (teacher id, sample id) of labels if labels_only is set
     """
 
     # Compute shape of array that will hold probabilities produced by each
     # teacher, for each training point, and each output class
     result_shape = (nb_teachers, len(stdnt_data_loader.dataset), nb_labels)
+    dtype = np.float32
+    if labels_only:
+        result_shape = result_shape[:2]
+        dtype = label_dtype(nb_labels)
+
+    if n_jobs == -1:
+        n_jobs = os.cpu_count()
+
+    if n_jobs > 1:
+        return _ensemble_preds_parallel(
+            model,
+            dataset,
+            nb_labels,
+            nb_teachers,
+            stdnt_data_loader,
+            n_jobs,
+            result_shape,
+            result_path,
+            labels_only,
+        )
 
     # Create array that will hold result
-    result = np.zeros(result_shape, dtype=np.float32)
+    if result_path is None:
+        result = np.zeros(result_shape, dtype=dtype)
+    else:
+        result = np.memmap(result_path, dtype=dtype, mode="w+", shape=result_shape)
 
     # Get predictions from each teacher
     for teacher_id in xrange(nb_teachers):
         # Compute path of checkpoint file for teacher model with ID teacher_id
-        filename = (
-            str(dataset)
-            + "_"
-            + str(nb_teachers)
-            + "_teachers_"
-            + str(teacher_id)
-            + ".pth"
-        )
+        filename = teacher_filename(dataset, nb_teachers, teacher_id)
         # Get predictions on our training data and store in result array
-        result[teacher_id] = softmax_preds(
-            model, nb_labels, stdnt_data_loader, ckpt_path + filename
+        softmax_preds(
+            model,
+            nb_labels,
+            stdnt_data_loader,
+            ckpt_path + filename,
+            out=result[teacher_id],
+            labels_only=labels_only,
         )
 
         # This can take a while when there are a lot of teachers so output status
         print("Computed Teacher " + str(teacher_id) + " softmax predictions")
 
+    if result_path is not None:
+        result.flush()
+
+    return result
+
+
+def _ensemble_preds_parallel(
+    model,
+    dataset,
+    nb_labels,
+    nb_teachers,
+    stdnt_data_loader,
+    n_jobs,
+    result_shape,
+    result_path,
+    labels_only,
+):
+    """ensemble_preds() with the teachers spread among n_jobs processes."""
+    temporary = result_path is None
+    if temporary:
+        fd, result_path = tempfile.mkstemp(suffix=".preds")
+        os.close(fd)
+
+    # Create the file of the array that will hold result
+    dtype = label_dtype(nb_labels) if labels_only else np.float32
+    result = np.memmap(result_path, dtype=dtype, mode="w+", shape=result_shape)
+    del result
+
+    try:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            futures = []
+            for job in range(n_jobs):
+                filenames = {
+                    teacher_id: teacher_filename(dataset, nb_teachers, teacher_id)
+                    for teacher_id in xrange(job, nb_teachers, n_jobs)
+                }
+                if not filenames:
+                    continue
+                futures.append(
+                    executor.submit(
+                        _teachers_softmax_preds,
+                        model,
+                        nb_labels,
+                        stdnt_data_loader.dataset,
+                        stdnt_data_loader.batch_size,
+                        filenames,
+                        result_path,
+                        result_shape,
+                        labels_only,
+                    )
+                )
+            for future in futures:
+                # Raise the errors of the workers, if any
+                future.result()
+
+        result = np.memmap(result_path, dtype=dtype, mode="r+", shape=result_shape)
+        if temporary:
+            result = np.array(result)
+    finally:
+        if temporary:
+            os.remove(result_path)
+
     return result
 
 
+def _votes_key(dataset, nb_teachers, stdnt_data_loader):
+    """Hashes the student data and the checkpoints of the teachers, so that
+    cached votes are not reused once a teacher has been trained again."""
+    digest = hashlib.sha1()
+    stdnt_data = getattr(stdnt_data_loader.dataset, "X", None)
+    if stdnt_data is not None:
+        if torch.is_tensor(stdnt_data):
+            stdnt_data = stdnt_data.numpy()
+        digest.update(np.ascontiguousarray(stdnt_data).tobytes())
+    else:
+        # Datasets other than PrepareData are only known by their size
+        digest.update(str(len(stdnt_data_loader.dataset)).encode())
+    for teacher_id in xrange(nb_teachers):
+        filename = teacher_filename(dataset, nb_teachers, teacher_id)
+        with open(ckpt_path + filename, "rb") as checkpoint:
+            for chunk in iter(lambda: checkpoint.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def teacher_votes(
+    model,
+    dataset,
+    nb_labels,
+    nb_teachers,
+    stdnt_data_loader,
+    n_jobs=1,
+    use_cache=True,
+):
+    """Returns the label given by each teacher to each student sample. The
+    labels are cached on disk, in votes_path, in a memory-mapped .npy file
+    keyed by the dataset, the number of teachers and the hashes of the
+    student data and of the teacher checkpoints: running the aggregation again
+    (e.g. with another lap_scale) then doesn't need the teachers.
+
+    :param dataset: string corresponding to mnist, cifar10, or svhn
+    :param nb_teachers: number of teachers (in the ensemble) to learn from
+    :param n_jobs: number of processes running the teachers (see ensemble_preds)
+    :param use_cache: if set to False, the teachers are run again and the cache
+                      is refreshed
+    :return: 2d array (teacher id, sample id) of int8 labels (int16 when there
+             are more than 128 labels)
+    """
+    key = _votes_key(dataset, nb_teachers, stdnt_data_loader)
+    filename = (
+        votes_path + str(dataset) + "_" + str(nb_teachers) + "_votes_" + key + ".npy"
+    )
+
+    if use_cache and os.path.isfile(filename):
+        print("Loaded teacher votes from " + filename)
+        return np.load(filename, mmap_mode="r")
+
+    labels = ensemble_preds(
+        model,
+        dataset,
+        nb_labels,
+        nb_teachers,
+        stdnt_data_loader,
+        n_jobs=n_jobs,
+        labels_only=True,
+    )
+
+    if not os.path.isdir(votes_path):
+        os.makedirs(votes_path)
+
+    # Write to a temporary file first, so that an interrupted run leaves no
+    # partial cache behind
+    votes = np.lib.format.open_memmap(
+        filename + ".tmp", mode="w+", dtype=labels.dtype, shape=labels.shape
+    )
+    votes[:] = labels
+    votes.flush()
+    del votes
+    os.replace(filename + ".tmp", filename)
+
+    return np.load(filename, mmap_mode="r")
+
+
 def prepare_student_data(
     model,
     dataset,
@@ -237,6 +501,8 @@ def prepare_student_data(
     nb_teachers,
     stdnt_share,
     lap_scale,
+    n_jobs=1,
+    use_cache=True,
 ):
     """Takes a dataset name and the size of the teacher ensemble and prepares
     training data for the student model, according to parameters indicated in
@@ -244,6 +510,9 @@ def prepare_student_data(
 
     :param dataset: string corresponding to mnist, cifar10, or svhn
     :param nb_teachers: number of teachers (in the ensemble) to learn from
+    :param n_jobs: number of processes running the teachers (see ensemble_preds)
+    :param use_cache: if set to False, the teacher votes cached by a previous run
+                      are not used (see teacher_votes)
     :return: pairs of (data, labels) to be used for student training and testing
     """
 
@@ -261,13 +530,19 @@ def prepare_student_data(
 
     stdnt_loader = DataLoader(stdnt_prep, batch_size=64, shuffle=False)
 
-    # Compute teacher predictions for student training data
-    teachers_preds = ensemble_preds(
-        model, dataset, nb_labels, nb_teachers, stdnt_loader
+    # Compute teacher votes for student training data, or reuse cached ones
+    teachers_votes = teacher_votes(
+        model,
+        dataset,
+        nb_labels,
+        nb_teachers,
+        stdnt_loader,
+        n_jobs=n_jobs,
+        use_cache=use_cache,
     )
 
-    # Aggregate teacher predictions to get student training labels
-    stdnt_labels = noisy_max(teachers_preds, nb_labels, lap_scale)
+    # Aggregate teacher votes to get student training labels
+    stdnt_labels = noisy_max(teachers_votes, nb_labels, lap_scale)
 
     # Print accuracy of aggregated labels
     ac_ag_labels = accuracy(stdnt_labels, test_labels[:stdnt_share])
@@ -356,6 +631,42 @@ def labels_from_probs(probs):
     return np.asarray(labels, dtype=np.int32)
 
 
+def teacher_labels(logits):
+    """Helper function: returns the (teacher id, sample id) array of the labels
+    given by the teachers.
+
+    :param logits: either logits or probabilities of shape (teacher id, sample
+                   id, class), or already the labels, as returned by
+                   teacher_votes()
+    """
+    if len(np.shape(logits)) == 2:
+        return logits
+
+    # Compute labels from logits/probs and reshape array properly
+    labels = labels_from_probs(logits)
+    labels_shape = np.shape(labels)
+    return labels.reshape((labels_shape[0], labels_shape[1]))
+
+
+def vote_counts(labels, nb_labels):
+    """Helper function: counts the votes of the teachers for each sample and
+    class, with a single histogram over all the samples.
+
+    :param labels: array of shape (teachers, samples) with the teacher labels
+    :param nb_labels: number of classes
+    :return: array of shape (samples, nb_labels) with the vote counts
+    """
+    nb_samples = np.shape(labels)[1]
+    if np.size(labels) > 0 and np.max(labels) >= nb_labels:
+        raise ValueError("Found labels greater than nb_labels - 1")
+
+    # Give each sample its own range of nb_labels bins
+    bins = labels + np.arange(nb_samples) * nb_labels
+    counts = np.bincount(bins.ravel(), minlength=nb_samples * nb_labels)
+
+    return counts.reshape((nb_samples, nb_labels))
+
+
 def noisy_max(logits, nb_labels, lap_scale, return_clean_votes=False):
     """This aggregation mechanism takes the softmax/logit output of several
     models resulting from inference on identical inputs and computes the noisy-
@@ -363,7 +674,9 @@ def noisy_max(logits, nb_labels, lap_scale, return_clean_votes=False):
     it adds Laplacian noise to label counts and returns the most frequent
     label.
 
-    :param logits: logits or probabilities for each sample
+    :param logits: logits or probabilities for each sample, or the teacher labels
+                   (see teacher_labels())
+    :param nb_labels: number of classes
     :param lap_scale: scale of the Laplacian noise to be added to counts
     :param return_clean_votes: if set to True, also returns clean votes (without
                         Laplacian noise). This can be used to perform the
@@ -373,36 +686,19 @@ def noisy_max(logits, nb_labels, lap_scale, return_clean_votes=False):
              the teachers.
     """
 
-    # Compute labels from logits/probs and reshape array properly
-    labels = labels_from_probs(logits)
-    labels_shape = np.shape(labels)
-    labels = labels.reshape((labels_shape[0], labels_shape[1]))
-
-    # Initialize array to hold final labels
-    result = np.zeros(int(labels_shape[1]))
-
-    if return_clean_votes:
-        # Initialize array to hold clean votes for each sample
-        clean_votes = np.zeros((int(labels_shape[1]), nb_labels))
-
-    # Parse each sample
-    for i in xrange(int(labels_shape[1])):
-        # Count number of votes assigned to each class
-        label_counts = np.bincount(labels[:, i], minlength=10)
+    labels = teacher_labels(logits)
 
-        if return_clean_votes:
-            # Store vote counts for export
-            clean_votes[i] = label_counts
+    # Count number of votes assigned to each class, for all the samples
+    clean_votes = vote_counts(labels, nb_labels)
 
-        # Cast in float32 to prepare before addition of Laplacian noise
-        label_counts = np.asarray(label_counts, dtype=np.float32)
-
-        # Sample independent Laplacian noise for each class
-        for item in xrange(10):
-            label_counts[item] += np.random.laplace(loc=0.0, scale=float(lap_scale))
+    # Cast in float32 and add independent Laplacian noise to each count
+    label_counts = np.asarray(clean_votes, dtype=np.float32)
+    label_counts += np.random.laplace(
+        loc=0.0, scale=float(lap_scale), size=label_counts.shape
+    )
 
-        # Result is the most frequent label
-        result[i] = np.argmax(label_counts)
+    # Result is the most frequent label
+    result = np.argmax(label_counts, axis=1)
 
     # Cast labels to np.int32 for compatibility with deep_cnn.py feed dictionaries
     result = np.asarray(result, dtype=np.int32)
@@ -412,38 +708,37 @@ def noisy_max(logits, nb_labels, lap_scale, return_clean_votes=False):
         # result: labels obtained from the noisy aggregation
         # clean_votes: the number of teacher votes assigned to each sample and class
         # labels: the labels assigned by teachers (before the noisy aggregation)
-        return result, clean_votes, labels
+        return result, np.asarray(clean_votes, dtype=np.float64), labels
     else:
         # Only return labels resulting from noisy aggregation
         return result
 
 
-def aggregation_most_frequent(logits):
+def aggregation_most_frequent(logits, nb_labels=None):
     """This aggregation mechanism takes the softmax/logit output of several
     models resulting from inference on identical inputs and computes the most
     frequent label. It is deterministic (no noise injection like noisy_max()
     above.
 
-    :param logits: logits or probabilities for each sample
+    :param logits: logits or probabilities for each sample, or the teacher labels
+                   (see teacher_labels())
+    :param nb_labels: number of classes, by default the last dimension of logits
+                      (or the greatest teacher label + 1)
     :return:
     """
-    # Compute labels from logits/probs and reshape array properly
-    labels = labels_from_probs(logits)
-    labels_shape = np.shape(labels)
-    labels = labels.reshape((labels_shape[0], labels_shape[1]))
-
-    # Initialize array to hold final labels
-    result = np.zeros(int(labels_shape[1]))
+    labels = teacher_labels(logits)
 
-    # Parse each sample
-    for i in xrange(int(labels_shape[1])):
-        # Count number of votes assigned to each class
-        label_counts = np.bincount(labels[:, i], minlength=10)
+    if nb_labels is None:
+        if len(np.shape(logits)) == 2:
+            nb_labels = int(np.max(labels)) + 1
+        else:
+            nb_labels = np.shape(logits)[-1]
 
-        label_counts = np.asarray(label_counts, dtype=np.int32)
+    # Count number of votes assigned to each class, for all the samples
+    label_counts = vote_counts(labels, nb_labels)
 
-        # Result is the most frequent label
-        result[i] = np.argmax(label_counts)
+    # Result is the most frequent label
+    result = np.argmax(label_counts, axis=1)
 
     return np.asarray(result, dtype=np.int32)
 
@@ -1,3 +1,3 @@
-from syft.mpc import securenn, utils
+from syft.mpc import crt, securenn, utils
 
-__all__ = ["securenn", "utils"]
+__all__ = ["crt", "securenn", "utils"]
@@ -1,101 +1,140 @@
-# import torch as th
-# from functools import reduce
-#
-# prod = lambda xs: reduce(lambda x, y: x * y, xs)
-#
-#
-# def _egcd(a, b):
-#     if a == 0:
-#         return (b, 0, 1)
-#     else:
-#         g, y, x = _egcd(b % a, a)
-#         return (g, x - (b // a) * y, y)
-#
-#
-# def _inverse(a, m):
-#     _, b, _ = _egcd(a, m)
-#     return b % m
-#
-#
-# moduli = [1999703, 1990007, 1996949, 1925899, 1816117]
-# modulus = prod(moduli)
-# moduli_inverses = [_inverse(modulus // mi, mi) for mi in moduli]
-#
-#
-# class CrtTensor(object):
-#
-#     def __init__(self, values, residues=None):
-#         if values is not None:
-#             residues = [values % mi for mi in moduli]
-#         self.residues = residues
-#
-#     @staticmethod
-#     def sample_uniform(shape):
-#         return CrtTensor(None, [
-#             th.randint(0, mi, shape).type(th.LongTensor)
-#             for mi in moduli
-#         ])
-#
-#     def recombine(self, bound=2 ** 31):
-#         return self._explicit_crt(bound)
-#
-#     def __add__(self, other):
-#         return CrtTensor(None, [
-#             (xi + yi) % mi
-#             for xi, yi, mi in zip(self.residues, other.residues, moduli)
-#         ])
-#
-#     def __sub__(self, other):
-#         return CrtTensor(None, [
-#             (xi - yi) % mi
-#             for xi, yi, mi in zip(self.residues, other.residues, moduli)
-#         ])
-#
-#     def __mul__(self, other):
-#         return CrtTensor(None, [
-#             (xi * yi) % mi
-#             for xi, yi, mi in zip(self.residues, other.residues, moduli)
-#         ])
-#
-#     def matmul(self, other):
-#         return CrtTensor(None, [
-#             th.matmul(xi, yi) % mi
-#             for xi, yi, mi in zip(self.residues, other.residues, moduli)
-#         ])
-#
-#     def __mod__(self, k):
-#         return CrtTensor(self._explicit_crt(k))
-#
-#     def _explicit_crt(self, bound):
-#         def sum(xs):
-#             return th.cat(xs).view(len(moduli), *xs[0].shape).sum(0)
-#
-#         t = [
-#             (xi * qi) % mi
-#             for xi, qi, mi in zip(self.residues, moduli_inverses, moduli)
-#         ]
-#         alpha = sum(tuple(
-#             ti.type(th.DoubleTensor) / float(mi)
-#             for ti, mi in zip(t, moduli)
-#         ))
-#
-#         b = [(modulus // mi) % bound for mi in moduli]
-#         u = sum(tuple(
-#             ti * bi
-#             for ti, bi in zip(t, b)
-#         ))
-#
-#         B = modulus % bound
-#         v = th.round(alpha).type(th.LongTensor) * B
-#         w = u.type(th.LongTensor) - v
-#
-#         return w % bound
-#
-#
-# x = CrtTensor(th.LongTensor([100000, 200000, 300000, 400000]).reshape(2, 2))
-# y = CrtTensor(th.LongTensor([100000, 200000, 300000, 400000]).reshape(2, 2))
-# z = x.matmul(y)
-# print(z.recombine(2 ** 40))
-#
-# x = CrtTensor.sample_uniform((2, 2))
-# print(x.residues)
+"""Chinese Remainder Theorem (CRT) representation of integer tensors.
+
+An integer x is represented by its residues x mod m_i for a few coprime
+moduli m_i. This gives a ring as large as the product of the moduli (about
+2^104 here) while every residue stays small enough to be multiplied with
+int64 operations. The residues of a tensor are stacked along a new first
+dimension, so that an operation on a CRT tensor is a single batched op over
+all the residue channels.
+"""
+from functools import reduce
+
+import torch
+
+from syft.mpc.utils import modinv
+
+moduli = [1999703, 1990007, 1996949, 1925899, 1816117]
+modulus = reduce(lambda x, y: x * y, moduli)
+moduli_inverses = [modinv(modulus // mi, mi) for mi in moduli]
+
+INT64_MAX = 2 ** 63 - 1
+
+# Shared values are truncated by opening them with a random mask of
+# MASK_BITS (see sample_mask), which hides them statistically with
+# STATISTICAL_SECURITY bits as long as they are below 2^TRUNCATION_BITS in
+# absolute value. The masked values stay below modulus / 2.
+MASK_BITS = 102
+STATISTICAL_SECURITY = 40
+TRUNCATION_BITS = MASK_BITS - 1 - STATISTICAL_SECURITY
+
+
+def _to_int64(n):
+    """Maps an integer to the int64 with the same value modulo 2^64."""
+    n = n % 2 ** 64
+    return n - 2 ** 64 if n > INT64_MAX else n
+
+
+def channel_constants(values, shape):
+    """Expands one value per residue channel to a LongTensor of the given
+    shape, the shape of the stacked residues."""
+    view = [len(values)] + [1] * (len(shape) - 1)
+    return torch.LongTensor(values).view(*view).expand(*shape)
+
+
+def moduli_like(residues):
+    return channel_constants(moduli, list(residues.get_shape()))
+
+
+def encode(values):
+    """Returns the stacked residues of a LongTensor of (signed) integers."""
+    shape = [len(moduli)] + list(values.get_shape())
+    return values.unsqueeze(0).expand(*shape) % channel_constants(moduli, shape)
+
+
+def sample_uniform(shape):
+    """Returns the residues of a tensor uniformly drawn in [0, modulus)."""
+    return torch.cat([torch.LongTensor(1, *shape).random_(mi) for mi in moduli])
+
+
+def sample_mask(shape, bits=MASK_BITS):
+    """Returns the residues of a tensor uniformly drawn in [-2^(bits-1),
+    2^(bits-1)). It is drawn in two halves, as it does not fit in int64."""
+    half = bits // 2
+    high = encode(torch.LongTensor(*shape).random_(2 ** half))
+    low = encode(torch.LongTensor(*shape).random_(2 ** (bits - half)))
+    shape = list(high.get_shape())
+    shift = channel_constants([2 ** (bits - half) % mi for mi in moduli], shape)
+    offset = channel_constants([2 ** (bits - 1) % mi for mi in moduli], shape)
+    moduli_ = channel_constants(moduli, shape)
+    return (high * shift + low - offset) % moduli_
+
+
+def share(residues, n_workers):
+    """Splits residues in n_workers additive shares, channel by channel."""
+    shape = list(residues.get_shape())[1:]
+    shares = [sample_uniform(shape) for _ in range(n_workers - 1)]
+    last = residues
+    for share_ in shares:
+        last = last - share_
+    shares.append(last % moduli_like(residues))
+    return shares
+
+
+def explicit_crt(residues, bound):
+    """Recombines residues into the integer they represent modulo bound,
+    without ever building the integer itself.
+
+    The integer is x = sum(t_i * modulus / m_i) - alpha * modulus, where
+    t_i = x_i * (modulus / m_i)^-1 mod m_i and alpha = round(sum(t_i / m_i)).
+    Taking the rounded alpha gives the representative of x in
+    (-modulus / 2, modulus / 2], so negative values are recovered as such.
+
+    :param residues: the stacked residues
+    :param bound: 2 ** 64 to get an int64 (exact as long as |x| < 2^63, the
+        arithmetic wraps around modulo 2^64), or an integer below 2^39 to get
+        x mod bound in [0, bound)
+    """
+    shape = list(residues.get_shape())
+    moduli_ = channel_constants(moduli, shape)
+    t = residues * channel_constants(moduli_inverses, shape) % moduli_
+    alpha = torch.round((t.double() / moduli_.double()).sum(0)).long()
+
+    b = [_to_int64((modulus // mi) % bound) for mi in moduli]
+    u = (t * channel_constants(b, shape)).sum(0)
+    result = u - alpha * _to_int64(modulus % bound)
+    if bound == 2 ** 64:
+        return result
+    return result % bound
+
+
+def abs_below(residues, bits):
+    """Returns whether the integers represented by residues are all in
+    (-2^bits, 2^bits), for bits >= 60. They are first divided by 2^60, so
+    that the quotients fit in int64."""
+    for _ in range(3):
+        residues = floor_divide(residues, 2 ** 20)
+    quotients = decode(residues)
+    bound = 2 ** (bits - 60)
+    return bool(((quotients >= -bound) * (quotients < bound)).all())
+
+
+def decode(residues):
+    """Returns the int64 LongTensor represented by the residues."""
+    return explicit_crt(residues, 2 ** 64)
+
+
+def floor_divide(residues, divisor):
+    """Divides the integers represented by residues by a positive divisor,
+    rounding down, without leaving the residues.
+
+    x - (x mod divisor) is a multiple of divisor, so it is divided exactly
+    by multiplying each channel with the inverse of divisor modulo m_i.
+    """
+    if divisor >= min(moduli):
+        raise ValueError("The divisor should be smaller than the moduli.")
+    shape = list(residues.get_shape())
+    remainder = explicit_crt(residues, divisor)
+    inverses = [modinv(divisor, mi) for mi in moduli]
+    moduli_ = channel_constants(moduli, shape)
+    exact = (residues - encode(remainder)) % moduli_
+    return exact * channel_constants(inverses, shape) % moduli_
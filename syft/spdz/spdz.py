@@ -1,5 +1,10 @@
+import random
+import secrets
+import numpy as np
 import torch
 import syft as sy
+from syft.core.frameworks import encode as sy_encode
+from syft.spdz.triples import TriplePool
 
 BASE = 2
 KAPPA = 3  # ~29 bits
@@ -17,6 +22,17 @@ Q_MAXDEGREE = 1
 torch_max_value = torch.LongTensor([round(field / 2)])
 torch_field = torch.LongTensor([field])
 
+# Ring Z_2^64: shares are plain int64 values, and the reduction modulo 2^64
+# is the natural wraparound of int64 arithmetic, so no modulo is ever applied
+RING = 2 ** 64
+INT64_MIN = -(2 ** 63)
+INT64_MAX = 2 ** 63 - 1
+
+# When True, shares are sent as short seeds to all the workers but the last
+# one, which expand them locally: only the last share travels as real data
+# (see share_communication)
+PRG_SHARES = False
+
 
 def encode(rational, precision_fractional=PRECISION_FRACTIONAL, mod=field):
     upscaled = (rational * BASE ** precision_fractional).long()
@@ -45,12 +61,49 @@ def decode(field_element, precision_fractional=PRECISION_FRACTIONAL, mod=field):
 #     return result
 
 
+def reduce(tensor, mod=field):
+    """Reduces tensor modulo mod. In the ring (mod=RING), the int64
+    arithmetic already did it."""
+    if mod == RING:
+        return tensor
+    return tensor % mod
+
+
+def ser_field(mod):
+    """Serializes a field: RING does not fit in a msgpack integer."""
+    return str(mod) if mod > INT64_MAX else mod
+
+
+def deser_field(mod):
+    return int(mod)
+
+
+def random_tensor(shape, mod=field, rng=np.random):
+    """Returns a LongTensor of the given shape, with values uniformly drawn
+    in [0, mod), or over the whole int64 range in the ring."""
+    if mod == RING:
+        low, high = INT64_MIN, INT64_MAX
+    else:
+        low, high = 0, mod
+    array = rng.randint(low, high, size=tuple(shape), dtype=np.int64)
+    tensor = torch.LongTensor()
+    tensor.native_set_(torch.native_from_numpy(array))
+    return tensor
+
+
 def share(secret, n_workers, mod=field, random_type=torch.LongTensor):
 
-    random_shares = [random_type(secret.get_shape()) for i in range(n_workers - 1)]
+    if mod == RING:
+        random_shares = [
+            random_tensor(secret.get_shape(), mod) for i in range(n_workers - 1)
+        ]
+    else:
+        random_shares = [
+            random_type(secret.get_shape()) for i in range(n_workers - 1)
+        ]
 
-    for share in random_shares:
-        share.random_(mod)
+        for share in random_shares:
+            share.random_(mod)
 
     shares = []
     for i in range(n_workers):
@@ -65,8 +118,75 @@ def share(secret, n_workers, mod=field, random_type=torch.LongTensor):
     return shares
 
 
+def new_seed():
+    """Returns a fresh seed for expand_seed."""
+    return [secrets.randbits(32) for _ in range(4)]
+
+
+def expand_seed(seed, shape, mod=field):
+    """Expands a seed into a random LongTensor of the given shape (see
+    random_tensor). The same seed always gives the same tensor."""
+    return random_tensor(shape, mod, rng=np.random.RandomState(seed))
+
+
+def share_communication(secret, workers, mod=field):
+    """Shares a LongTensor between workers and sends them their share.
+
+    With PRG_SHARES, all the workers but the last one only receive a seed
+    ("prg_share" message) from which they expand their share, and the last
+    worker receives secret minus the sum of these shares.
+
+    :param secret: the LongTensor to share
+    :param workers: the workers (or their ids) receiving the shares
+    :param mod: the field of the shares
+    :return: a dict of the pointers (_PointerTensor) to the shares, keyed by worker
+    """
+    if not PRG_SHARES:
+        pointers = {}
+        for share_, worker in zip(share(secret, len(workers), mod), workers):
+            share_.send(worker)
+            pointers[worker] = share_.child
+        return pointers
+
+    owner = secret.owner
+    shape = list(secret.size())
+    last_share = secret * 1
+
+    pointers = {}
+    for worker in workers[:-1]:
+        seed = new_seed()
+        last_share -= expand_seed(seed, shape, mod)
+
+        location = owner.get_worker(worker)
+        id_at_location = int(10e10 * random.random())
+        owner.send_msg(
+            {
+                "seed": seed,
+                "shape": shape,
+                "mod": ser_field(mod),
+                "id": id_at_location,
+            },
+            message_type="prg_share",
+            recipient=location,
+        )
+        pointers[worker] = sy._PointerTensor(
+            child=None,
+            parent=None,
+            torch_type="syft.LongTensor",
+            location=location,
+            id_at_location=id_at_location,
+            owner=owner,
+            garbage_collect=True,
+        )
+        pointers[worker].wrap()
+
+    last_share.send(workers[-1])
+    pointers[workers[-1]] = last_share.child
+    return pointers
+
+
 def reconstruct(shares, mod=field):
-    return sum(shares) % mod
+    return reduce(sum(shares), mod)
 
 
 def swap_shares(shares):
@@ -96,34 +216,111 @@ def public_add(x, y, interface):
         return x
 
 
+def truncate_ring(shares, amount=PRECISION_FRACTIONAL, base=BASE):
+    """Divides shares of the ring by base ** amount, each worker locally: the
+    first worker divides its share, the others divide the opposite of their
+    share. With two workers, the result is off by at most 2 with high
+    probability (see SecureML, Mohassel & Zhang 2017): LongTensor divisions
+    round toward zero, so each share adds an error of up to 1.
+
+    :param shares: a wrapper of a _GeneralizedPointerTensor
+    :return: a wrapper of a _GeneralizedPointerTensor on the truncated shares
+    """
+    divisor = base ** amount
+    pointers = {}
+    for party, (worker, pointer) in enumerate(
+        shares.child.pointer_tensor_dict.items()
+    ):
+        share_ = pointer.wrap()
+        if party == 0:
+            pointers[worker] = (share_ / divisor).child
+        else:
+            pointers[worker] = (-((-share_) / divisor)).child
+
+    return sy._GeneralizedPointerTensor(pointers).on(sy.LongTensor([]))
+
+
 def spdz_add(a, b, mod=field):
     c = a + b
-    return c % mod
+    return reduce(c, mod)
 
 
 def spdz_neg(a, mod=field):
+    if mod == RING:
+        return -a
     return (mod - a) % mod
 
 
+def open_shares(tensors, workers, mod=field):
+    """Opens several shared tensors without running any command on the
+    workers: each worker sends back all its shares in a single req_objs
+    message (the workers are queried at the same time), the values are
+    reconstructed locally, and each worker receives a copy of all of them in
+    a single message (see send_all).
+
+    :param tensors: the shared tensors (wrappers of _GeneralizedPointerTensor)
+    :param workers: the workers holding the shares
+    :param mod: the field of the shares
+    :return: the list of the opened values, and the list of the shared
+    tensors (wrappers of _GeneralizedPointerTensor) on their copies on the
+    workers
+    """
+    owner = tensors[0].child.owner
+    workers = [owner.get_worker(worker) for worker in workers]
+    pointer_dicts = [tensor.child.pointer_tensor_dict for tensor in tensors]
+
+    for pointer_dict in pointer_dicts:
+        for pointer in pointer_dict.values():
+            pointer._before_get()
+    messages = []
+    for worker in workers:
+        ids = [pointer_dict[worker.id].id_at_location for pointer_dict in pointer_dicts]
+        messages.append((ids, "req_objs", worker))
+    responses = owner.send_msgs(messages)
+
+    values = [None] * len(tensors)
+    for worker, response in zip(workers, responses):
+        shares = sy_encode.decode(response, worker=owner)
+        for i, (pointer_dict, share_) in enumerate(zip(pointer_dicts, shares)):
+            share_ = pointer_dict[worker.id]._register_got(share_)
+            if values[i] is None:
+                values[i] = share_
+            elif len(share_.size()) > 0:
+                values[i] += share_
+    values = [reduce(value, mod) for value in values]
+
+    copies = [{} for _ in values]
+    for worker in workers:
+        sent = sy.send_all([value.clone() for value in values], worker)
+        for pointer_dict, copy in zip(copies, sent):
+            pointer_dict[worker] = copy.child
+    shared_values = [
+        sy._GeneralizedPointerTensor(pointer_dict).on(sy.LongTensor([]))
+        for pointer_dict in copies
+    ]
+
+    return values, shared_values
+
+
 def spdz_mul(x, y, workers, mod=field):
     if x.get_shape() != y.get_shape():
         raise ValueError("Shapes must be identical in order to multiply them")
-    shape = x.get_shape()
-    triple = generate_mul_triple_communication(shape, workers)
-    a, b, c = triple
+    shape = tuple(x.get_shape())
+    a, b, c = triple_pool.get("mul", (shape,), workers, mod)
 
-    d = (x - a) % mod
-    e = (y - b) % mod
+    d = reduce(x - a, mod)
+    e = reduce(y - b, mod)
 
-    delta = d.child.sum_get() % mod
-    epsilon = e.child.sum_get() % mod
+    # Communication: d and e are opened together
+    (delta, epsilon), (shared_delta, shared_epsilon) = open_shares(
+        [d, e], workers, mod
+    )
 
     epsilon_delta = epsilon * delta
 
-    delta = delta.broadcast(workers)
-    epsilon = epsilon.broadcast(workers)
-
-    z = (c + (delta * b) % mod + (epsilon * a) % mod) % mod
+    z = reduce(
+        c + reduce(shared_delta * b, mod) + reduce(shared_epsilon * a, mod), mod
+    )
 
     z.child.public_add_(epsilon_delta)
 
@@ -131,32 +328,28 @@ def spdz_mul(x, y, workers, mod=field):
 
 
 def spdz_matmul(x, y, workers, mod=field):
-    shapes = [x.get_shape(), y.get_shape()]
-    if len(x.get_shape()) != 1:
-        x_width = x.get_shape()[1]
+    shapes = (tuple(x.get_shape()), tuple(y.get_shape()))
+    if len(shapes[0]) != 1:
+        x_width = shapes[0][1]
     else:
         x_width = 1
 
-    y_height = y.get_shape()[0]
+    y_height = shapes[1][0]
 
     assert x_width == y_height, f"dimension mismatch: {x_width!r} != {y_height!r}"
-    a, b, c = generate_matmul_triple_communication(shapes, workers)
+    a, b, c = triple_pool.get("matmul", shapes, workers, mod)
 
-    r = (x - a) % mod
-    s = (y - b) % mod
+    r = reduce(x - a, mod)
+    s = reduce(y - b, mod)
 
-    # Communication
-    rho = r.child.sum_get() % mod
-    sigma = s.child.sum_get() % mod
-    rho_sigma = torch.mm(rho, sigma) % mod
+    # Communication: rho and sigma are opened together
+    (rho, sigma), (shared_rho, shared_sigma) = open_shares([r, s], workers, mod)
+    rho_sigma = reduce(torch.mm(rho, sigma), mod)
 
-    rho = rho.broadcast(workers)
-    sigma = sigma.broadcast(workers)
+    a_sigma = reduce(torch.mm(a, shared_sigma), mod)
+    rho_b = reduce(torch.mm(shared_rho, b), mod)
 
-    a_sigma = torch.mm(a, sigma) % mod
-    rho_b = torch.mm(rho, b) % mod
-
-    z = (a_sigma + rho_b + c) % mod
+    z = reduce(a_sigma + rho_b + c, mod)
     z.child.public_add_(rho_sigma)
 
     return z
@@ -216,35 +409,24 @@ def get_shape(mpct):
 
 
 def generate_mul_triple(shape, mod=field):
-    r = torch.LongTensor(shape).random_(mod)
-    s = torch.LongTensor(shape).random_(mod)
+    r = random_tensor(shape, mod)
+    s = random_tensor(shape, mod)
     t = r * s
     return r, s, t
 
 
-def generate_mul_triple_communication(shape, workers):
-    r, s, t = generate_mul_triple(shape)
-
-    n_workers = len(workers)
-    r_shares = share(r, n_workers)
-    s_shares = share(s, n_workers)
-    t_shares = share(t, n_workers)
+def generate_mul_triple_communication(shape, workers, mod=field):
+    r, s, t = generate_mul_triple(shape, mod)
 
     # For r, s, t as a shared var, send each share to its worker
-    for var_shares in [r_shares, s_shares, t_shares]:
-        for var_share, worker in zip(var_shares, workers):
-            var_share.send(worker)
-
-    # Build the pointer dict for r, s, t. Note that we remove the head of the pointer (via .child)
-    gp_r = sy._GeneralizedPointerTensor(
-        {share.location: share.child for share in r_shares}
-    ).on(r)
-    gp_s = sy._GeneralizedPointerTensor(
-        {share.location: share.child for share in s_shares}
-    ).on(s)
-    gp_t = sy._GeneralizedPointerTensor(
-        {share.location: share.child for share in t_shares}
-    ).on(t)
+    r_shares = share_communication(r, workers, mod)
+    s_shares = share_communication(s, workers, mod)
+    t_shares = share_communication(t, workers, mod)
+
+    # Build the pointer dict for r, s, t
+    gp_r = sy._GeneralizedPointerTensor(r_shares).on(r)
+    gp_s = sy._GeneralizedPointerTensor(s_shares).on(s)
+    gp_t = sy._GeneralizedPointerTensor(t_shares).on(t)
     triple = [gp_r, gp_s, gp_t]
     return triple
 
@@ -258,8 +440,8 @@ def generate_one_shares_communication(alice, bob, sizes):
 
 
 def generate_matmul_triple(shapes, mod=field):
-    r = torch.LongTensor(shapes[0]).random_(mod)
-    s = torch.LongTensor(shapes[1]).random_(mod)
+    r = random_tensor(shapes[0], mod)
+    s = random_tensor(shapes[1], mod)
     t = torch.mm(r, s)
     assert t.shape == (shapes[0][0], shapes[1][1]), (
         t.shape,
@@ -269,33 +451,32 @@ def generate_matmul_triple(shapes, mod=field):
     return r, s, t
 
 
-def generate_matmul_triple_communication(shapes, workers):
-    r, s, t = generate_matmul_triple(shapes)
-
-    n_workers = len(workers)
-    r_shares = share(r, n_workers)
-    s_shares = share(s, n_workers)
-    t_shares = share(t, n_workers)
+def generate_matmul_triple_communication(shapes, workers, mod=field):
+    r, s, t = generate_matmul_triple(shapes, mod)
 
     # For r, s, t as a shared var, send each share to its worker
-    for var_shares in [r_shares, s_shares, t_shares]:
-        for var_share, worker in zip(var_shares, workers):
-            var_share.send(worker)
-
-    # Build the pointer dict for r, s, t. Note that we remove the head of the pointer (via .child)
-    gp_r = sy._GeneralizedPointerTensor(
-        {share.location: share.child for share in r_shares}
-    ).on(r)
-    gp_s = sy._GeneralizedPointerTensor(
-        {share.location: share.child for share in s_shares}
-    ).on(s)
-    gp_t = sy._GeneralizedPointerTensor(
-        {share.location: share.child for share in t_shares}
-    ).on(t)
+    r_shares = share_communication(r, workers, mod)
+    s_shares = share_communication(s, workers, mod)
+    t_shares = share_communication(t, workers, mod)
+
+    # Build the pointer dict for r, s, t
+    gp_r = sy._GeneralizedPointerTensor(r_shares).on(r)
+    gp_s = sy._GeneralizedPointerTensor(s_shares).on(s)
+    gp_t = sy._GeneralizedPointerTensor(t_shares).on(t)
     triple = [gp_r, gp_s, gp_t]
     return triple
 
 
+# Beaver triples used by spdz_mul and spdz_matmul. Fill it ahead of time with
+# triple_pool.fill("mul", (shape,), workers, field, n_triples)
+triple_pool = TriplePool(
+    {
+        "mul": generate_mul_triple_communication,
+        "matmul": generate_matmul_triple_communication,
+    }
+)
+
+
 def generate_sigmoid_shares_communication(x, interface):
     if interface.get_party() == 0:
         W0 = encode(torch.FloatTensor(x.shape).one_() * 1 / 2)
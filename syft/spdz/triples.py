@@ -0,0 +1,135 @@
+"""Store of Beaver triples generated ahead of the multiplications.
+
+Generating a triple means sampling, sharing and sending three tensors, which
+used to happen inside every spdz_mul and spdz_matmul. The TriplePool keeps
+triples already shared among the workers, so that the online phase only
+takes one, and generates them in batches when it runs low.
+"""
+import threading
+from collections import deque
+
+import torch
+import syft as sy
+
+
+class TriplePool:
+    """A pool of Beaver triples, indexed by the kind of operation, the
+    shape(s) of the operands, the workers holding the shares and the field.
+
+    :Parameters:
+
+    * **generators (dict)** for each kind of triple ("mul", "matmul"), a
+      function generator(shapes, workers, mod) returning a new shared triple.
+
+    * **low_watermark (int, optional)** in background mode, a refill is
+      started when fewer triples than this are left for a key after taking one.
+
+    * **batch_size (int, optional)** the number of triples available for a key
+      after a refill.
+
+    * **background (bool, optional)** when True, the pool refills itself in a
+      background thread. This requires a transport which can carry several
+      messages to the same worker at once, like WebSocketWorker. Otherwise,
+      triples are generated ahead of time with fill(), and inline when the
+      pool runs dry.
+    """
+
+    def __init__(self, generators, low_watermark=2, batch_size=8, background=False):
+        self.generators = generators
+        self.low_watermark = low_watermark
+        self.batch_size = batch_size
+        self.background = background
+
+        self._triples = {}
+        self._refilling = set()
+        self._lock = threading.Lock()
+        self._stats = self._empty_stats()
+
+    @staticmethod
+    def _empty_stats():
+        return {"consumed": 0, "ran_dry": 0, "refills": 0, "generated": 0}
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats = self._empty_stats()
+
+    def stats(self):
+        """Returns the counters of the pool: triples consumed, times the pool
+        ran dry (and a triple had to be generated inline), refills, triples
+        generated, and the number of triples available per key."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["available"] = {key: len(q) for key, q in self._triples.items()}
+        return stats
+
+    def _key(self, kind, shapes, workers, mod):
+        workers = tuple(sy.local_worker.get_worker(worker) for worker in workers)
+        return kind, shapes, workers, mod
+
+    def get(self, kind, shapes, workers, mod):
+        """Takes a triple out of the pool, generating one if the pool ran dry.
+
+        :param kind: "mul" or "matmul"
+        :param shapes: a tuple with the shape of each operand
+        :param workers: the workers holding the shares
+        :param mod: the field of the shares
+        :return: the triple [a, b, c] of shared tensors
+        """
+        key = self._key(kind, shapes, workers, mod)
+        with self._lock:
+            queue = self._triples.setdefault(key, deque())
+            triple = queue.popleft() if queue else None
+            if triple is None:
+                self._stats["ran_dry"] += 1
+            self._stats["consumed"] += 1
+            refill = (
+                self.background
+                and len(queue) < self.low_watermark
+                and key not in self._refilling
+            )
+            if refill:
+                self._refilling.add(key)
+
+        if refill:
+            thread = threading.Thread(target=self._refill, args=(key,))
+            thread.daemon = True
+            thread.start()
+
+        if triple is None:
+            triple = self._generate(key)
+
+        return triple
+
+    def fill(self, kind, shapes, workers, mod, n_triples):
+        """Generates n_triples triples ahead of time (offline phase)."""
+        key = self._key(kind, shapes, workers, mod)
+        triples = [self._generate(key) for _ in range(n_triples)]
+        with self._lock:
+            self._triples.setdefault(key, deque()).extend(triples)
+
+    def clear(self):
+        """Drops all the triples of the pool."""
+        with self._lock:
+            self._triples.clear()
+
+    def _generate(self, key):
+        kind, shapes, workers, mod = key
+        shapes = [torch.Size(shape) for shape in shapes]
+        if kind == "mul":
+            shapes = shapes[0]
+        triple = self.generators[kind](shapes, list(workers), mod)
+        with self._lock:
+            self._stats["generated"] += 1
+        return triple
+
+    def _refill(self, key):
+        try:
+            with self._lock:
+                missing = self.batch_size - len(self._triples[key])
+            triples = [self._generate(key) for _ in range(missing)]
+            with self._lock:
+                self._triples[key].extend(triples)
+                self._stats["refills"] += 1
+        finally:
+            with self._lock:
+                self._refilling.discard(key)
@@ -1,5 +1,13 @@
+import asyncio
+import gc
+import socket
+import threading
+import time
+import torch
+import websockets
 from unittest import TestCase
 import syft as sy
+from syft.core.frameworks import encode
 
 
 class TestBaseWorker(TestCase):
@@ -19,4 +27,452 @@ class TestBaseWorker(TestCase):
         hook.local_worker.is_client_worker = True
 
         assert len(hook.local_worker.search("#boston_housing")) == 2
+        assert len(hook.local_worker.search("#boston")) == 2
         assert len(hook.local_worker.search(["#boston_housing", "#target"])) == 1
+
+    def test_search_tag_index(self):
+        hook = sy.TorchHook()
+        bob = sy.VirtualWorker(id="bob_search", hook=hook, is_client_worker=False)
+
+        x = sy.FloatTensor([1, 2, 3])
+        y = sy.FloatTensor([4, 5, 6])
+        bob.set_obj("#mnist #train #images", x)
+        bob.set_obj("#mnist #test #images", y)
+        bob.set_obj("#mnist_small #train", x)
+        bob.set_obj("model#v2 #weights", y)
+
+        # #tags are substrings of the ids, like any other constraint
+        assert bob.search("#mnist") == {
+            "#mnist #train #images",
+            "#mnist #test #images",
+            "#mnist_small #train",
+        }
+        assert bob.search(["#mnist", "#train"]) == {
+            "#mnist #train #images",
+            "#mnist_small #train",
+        }
+        assert bob.search(["#train", "small"]) == {"#mnist_small #train"}
+        assert bob.search("#v2") == {"model#v2 #weights"}
+        assert len(bob.search("#")) == 4
+        assert bob.search("#cifar") == set()
+
+        # or whole tokens only, on demand
+        assert bob.search("#mnist", exact=True) == {
+            "#mnist #train #images",
+            "#mnist #test #images",
+        }
+        assert bob.search(["#mnist", "#train"], exact=True) == {
+            "#mnist #train #images"
+        }
+        assert bob.search("#v2", exact=True) == set()
+
+        bob.rm_obj("#mnist #train #images")
+        assert bob.search(["#mnist", "#train"], exact=True) == set()
+        assert "#images" in bob._tags
+        bob.rm_obj("#mnist #test #images")
+        assert "#images" not in bob._tags
+        # the sorted keys are kept up to date, not rebuilt on each search
+        assert bob._sorted_tags == sorted(bob._tags)
+
+    def test_metrics_count_messages(self):
+        hook = sy.TorchHook()
+        me = hook.local_worker
+        bob = sy.VirtualWorker(id="bob_metrics", hook=hook, is_client_worker=False)
+        me.add_worker(bob)
+
+        me.metrics.reset()
+        bob.metrics.reset()
+
+        x = sy.FloatTensor([1, 2, 3]).send(bob)
+        (x + x).get()
+
+        sent = me.metrics.snapshot()["sent"]
+        assert sent["obj"]["count"] == 1
+        assert sent["torch_cmd"]["count"] == 1
+        assert sent["req_obj"]["count"] == 1
+        assert sent["obj"]["bytes_out"] > 0
+        assert sum(sent["torch_cmd"]["histogram"]) == 1
+
+        received = bob.metrics.snapshot()["received"]
+        assert received["obj"]["bytes_in"] == sent["obj"]["bytes_out"]
+
+    def test_memory_budget_spills_to_disk(self):
+        hook = sy.TorchHook()
+        me = hook.local_worker
+        # room for two tensors of 100 floats
+        bob = sy.VirtualWorker(
+            id="bob_memory", hook=hook, is_client_worker=False, memory_budget=1000
+        )
+        me.add_worker(bob)
+
+        x = sy.FloatTensor(100).fill_(1).send(bob)
+        y = sy.FloatTensor(100).fill_(2).send(bob)
+        z = sy.FloatTensor(100).fill_(3).send(bob)
+
+        stats = bob.memory.stats()
+        assert stats["resident_bytes"] == 800
+        assert stats["spilled_bytes"] == 400
+        assert stats["spills"] == 1
+
+        # x was spilled, it's read back from disk
+        assert torch.equal((x + z).get(), sy.FloatTensor(100).fill_(4))
+        assert bob.memory.stats()["misses"] == 1
+        assert bob.memory.stats()["resident_bytes"] <= 1000
+
+        assert torch.equal(y.get(), sy.FloatTensor(100).fill_(2))
+        assert torch.equal(x.get(), sy.FloatTensor(100).fill_(1))
+        assert bob.memory.stats()["misses"] == 3
+        bob.memory.clear()
+
+    def test_memory_budget_spills_variables(self):
+        hook = sy.TorchHook()
+        me = hook.local_worker
+        bob = sy.VirtualWorker(
+            id="bob_memory_var", hook=hook, is_client_worker=False, memory_budget=1000
+        )
+        me.add_worker(bob)
+
+        x = sy.Variable(sy.FloatTensor(100).fill_(1)).send(bob)
+        y = sy.Variable(sy.FloatTensor(100).fill_(2)).send(bob)
+        assert bob.memory.stats()["spills"] >= 1
+
+        # the data of x is registered under its own id and was spilled, it's
+        # read back when x is used
+        assert torch.equal((x * 2).get().data, sy.FloatTensor(100).fill_(2))
+        assert bob.memory.stats()["misses"] >= 1
+        assert torch.equal(y.get().data, sy.FloatTensor(100).fill_(2))
+        assert torch.equal(x.get().data, sy.FloatTensor(100).fill_(1))
+        bob.memory.clear()
+
+    def test_garbage_collect_remote_objects(self):
+        hook = sy.TorchHook()
+        me = hook.local_worker
+        bob = sy.VirtualWorker(id="bob_gc", hook=hook, is_client_worker=False)
+        me.add_worker(bob)
+
+        is_client_worker = me.is_client_worker
+        me.is_client_worker = True
+        try:
+            x = sy.FloatTensor([1, 2, 3]).send(bob)
+            y = x + x
+            z = y * 2
+            y_id = y.child.id_at_location
+            del y
+            gc.collect()
+
+            # y is deleted along with the next message sent to bob
+            assert y_id in bob._objects
+            assert torch.equal(z.get(), sy.FloatTensor([4, 8, 12]))
+            assert y_id not in bob._objects
+
+            x_id = x.child.id_at_location
+            del x
+            gc.collect()
+            me.flush_garbage()
+            assert x_id not in bob._objects
+        finally:
+            me.is_client_worker = is_client_worker
+
+    def test_garbage_collect_queued_inputs(self):
+        hook = sy.TorchHook()
+        me = hook.local_worker
+        bob = sy.VirtualWorker(id="bob_gc_async", hook=hook, is_client_worker=False)
+        me.add_worker(bob)
+
+        is_client_worker = me.is_client_worker
+        me.is_client_worker = True
+        me.async_mode = True
+        try:
+            x = sy.FloatTensor([1, 2, 3]).send(bob)
+            x_id = x.child.id_at_location
+            y = x + 1
+            del x
+            gc.collect()
+
+            # x is still used by the queued command
+            me._collect_released()
+            assert me._pop_garbage(bob.id) == []
+            assert torch.equal(y.get(), sy.FloatTensor([2, 3, 4]))
+            assert x_id not in bob._objects
+
+            # a result rebound before the commands are sent is not leaked
+            h = sy.FloatTensor([0]).send(bob)
+            for _ in range(3):
+                h = h + 1
+            gc.collect()
+            assert torch.equal(h.get(), sy.FloatTensor([3]))
+            gc.collect()
+            me.flush_garbage()
+            assert list(bob._objects) == []
+        finally:
+            me.async_mode = False
+            me.is_client_worker = is_client_worker
+
+    def test_garbage_collect_shares(self):
+        hook = sy.TorchHook()
+        me = hook.local_worker
+        bob = sy.VirtualWorker(id="bob_gc_shares", hook=hook, is_client_worker=False)
+        alice = sy.VirtualWorker(
+            id="alice_gc_shares", hook=hook, is_client_worker=False
+        )
+        me.add_workers([bob, alice])
+
+        is_client_worker = me.is_client_worker
+        me.is_client_worker = True
+        try:
+            # the shares fetched with .get() are not deleted again
+            x = sy.LongTensor([1, 2, 3]).share(bob, alice)
+            assert torch.equal(x.get(), sy.LongTensor([1, 2, 3]))
+            del x
+            gc.collect()
+            me._collect_released()
+            assert me._pop_garbage(bob.id) == []
+            assert me._pop_garbage(alice.id) == []
+
+            # the shares are deleted, including the one generated by bob
+            y = sy.LongTensor([4, 5]).share(bob, alice)
+            pointers = y.child.shares.child.pointer_tensor_dict.values()
+            ids = [(p.location, p.id_at_location) for p in pointers]
+            del y, pointers
+            gc.collect()
+            me.flush_garbage()
+            for location, id in ids:
+                assert id not in location._objects
+        finally:
+            me.is_client_worker = is_client_worker
+
+    def test_plan_retains_captured_tensors(self):
+        hook = sy.TorchHook()
+        me = hook.local_worker
+        bob = sy.VirtualWorker(id="bob_gc_plan", hook=hook, is_client_worker=False)
+        me.add_worker(bob)
+
+        is_client_worker = me.is_client_worker
+        me.is_client_worker = True
+        try:
+            x = sy.FloatTensor([1, 2]).send(bob)
+            b = sy.FloatTensor([10, 20]).send(bob)
+            b_id = b.child.id_at_location
+            plan = sy.make_plan(lambda x, b=b: x + b, x)
+            plan_id = plan.id
+            assert plan_id in bob._plans
+
+            # b is only pointed at by the plan
+            del b
+            gc.collect()
+            me.flush_garbage()
+            assert b_id in bob._objects
+            assert torch.equal(plan(x).get(), sy.FloatTensor([11, 22]))
+
+            del plan
+            gc.collect()
+            me.flush_garbage()
+            assert b_id not in bob._objects
+            assert plan_id not in bob._plans
+
+            v = sy.Variable(sy.FloatTensor([1, 2])).send(bob)
+            self.assertRaises(TypeError, sy.make_plan, lambda v: v * 2, v)
+        finally:
+            me.is_client_worker = is_client_worker
+
+    def test_send_msgs_keeps_order(self):
+        hook = sy.TorchHook()
+        me = hook.local_worker
+        bob = sy.VirtualWorker(id="bob_send_msgs", hook=hook, is_client_worker=False)
+        alice = sy.VirtualWorker(
+            id="alice_send_msgs", hook=hook, is_client_worker=False
+        )
+        me.add_workers([bob, alice])
+
+        for concurrent in (False, True):
+            bob.supports_concurrent_send = concurrent
+            alice.supports_concurrent_send = concurrent
+            x = sy.FloatTensor([1, 2]).send(bob)
+            y = sy.FloatTensor([3, 4]).send(alice)
+            responses = me.send_msgs(
+                [
+                    (x.child.id_at_location, "req_obj", bob),
+                    (y.child.id_at_location, "req_obj", alice),
+                ]
+            )
+            values = [encode.decode(r, worker=me).tolist() for r in responses]
+            assert values == [[1, 2], [3, 4]]
+
+    def test_send_msg_queue_threads(self):
+        hook = sy.TorchHook()
+        me = hook.local_worker
+        bob = sy.VirtualWorker(id="bob_queue", hook=hook, is_client_worker=False)
+        me.add_worker(bob)
+
+        ids = ["queued #{}".format(i) for i in range(6)]
+        for id in ids:
+            bob.set_obj(id, sy.FloatTensor([1]))
+
+        # the messages are grouped three by three, whatever thread sends them
+        queue_size = me.queue_size
+        me.queue_size = 2
+        try:
+            threads = [
+                threading.Thread(target=me.send_msg, args=([id], "delete", bob))
+                for id in ids
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            me.queue_size = queue_size
+
+        assert me.message_queue == []
+        for id in ids:
+            assert id not in bob._objects
+
+
+class TestSocketWorker(TestCase):
+    def test_framing_roundtrip_large_message(self):
+        left, right = socket.socketpair()
+        payload = bytes(range(256)) * 20_000
+
+        try:
+            sender = threading.Thread(
+                target=sy.SocketWorker._send_frame, args=(left, payload)
+            )
+            sender.start()
+            received = sy.SocketWorker._process_buffer(right)
+            sender.join()
+
+            assert bytes(received) == payload
+
+            left.close()
+            assert sy.SocketWorker._process_buffer(right) is None
+        finally:
+            left.close()
+            right.close()
+
+
+class TestWebSocketWorker(TestCase):
+    def _serve(self, handler):
+        """Runs a websocket server with handler on a free port, in a
+        background event loop. Returns the port."""
+        started = threading.Event()
+        state = {}
+
+        def run():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            server = loop.run_until_complete(
+                websockets.serve(handler, "localhost", 0, max_size=None)
+            )
+            state["loop"], state["server"] = loop, server
+            started.set()
+            loop.run_forever()
+
+        threading.Thread(target=run, daemon=True).start()
+        started.wait()
+
+        def stop():
+            state["loop"].call_soon_threadsafe(state["server"].close)
+            state["loop"].call_soon_threadsafe(state["loop"].stop)
+
+        self.addCleanup(stop)
+        return state["server"].sockets[0].getsockname()[1]
+
+    def _client(self, port, pool_size):
+        hook = sy.TorchHook()
+        worker = sy.WebSocketWorker(
+            hook=hook,
+            id="ws_pool_{}".format(port),
+            port=port,
+            is_pointer=True,
+            verbose=False,
+            pool_size=pool_size,
+        )
+        self.addCleanup(worker.close)
+        return worker
+
+    def test_pool_reuses_connections(self):
+        connections = []
+
+        async def echo(websocket, path=None):
+            connections.append(websocket)
+            async for message in websocket:
+                await websocket.send(message)
+
+        worker = self._client(self._serve(echo), pool_size=4)
+        for i in range(5):
+            message = "ping {}".format(i).encode()
+            assert worker._client_socket_listener(message) == message
+
+        # the messages are sent one after the other on the same connection
+        assert len(connections) == 1
+
+    def test_pool_reconnects_when_closed(self):
+        connections = []
+
+        async def echo_once(websocket, path=None):
+            connections.append(websocket)
+            await websocket.send(await websocket.recv())
+            await websocket.close()
+
+        worker = self._client(self._serve(echo_once), pool_size=1)
+        for i in range(3):
+            message = "ping {}".format(i).encode()
+            assert worker._client_socket_listener(message) == message
+            # let the client receive the closing handshake
+            time.sleep(0.1)
+
+        # the pooled connection closed by the server is opened again
+        assert len(connections) == 3
+
+    def test_pool_resends_on_connection_closed(self):
+        connections = []
+
+        async def echo(websocket, path=None):
+            connections.append(websocket)
+            async for message in websocket:
+                await websocket.send(message)
+
+        worker = self._client(self._serve(echo), pool_size=1)
+        acquire_connection = worker._acquire_connection
+
+        async def acquire_closed_connection():
+            # the connection is lost between the pool and the send
+            connection = await acquire_connection()
+            await connection.close()
+            return connection
+
+        worker._acquire_connection = acquire_closed_connection
+        assert worker._client_socket_listener(b"ping") == b"ping"
+        assert len(connections) == 2
+
+    def test_pool_bounds_connections_across_threads(self):
+        active = [0]
+        peak = [0]
+        connections = []
+
+        async def slow_echo(websocket, path=None):
+            connections.append(websocket)
+            async for message in websocket:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+                await asyncio.sleep(0.1)
+                active[0] -= 1
+                await websocket.send(message)
+
+        worker = self._client(self._serve(slow_echo), pool_size=2)
+        responses = {}
+
+        def send(i):
+            message = "ping {}".format(i).encode()
+            responses[i] = worker._client_socket_listener(message) == message
+
+        # each thread sends through the event loop of the pool
+        threads = [threading.Thread(target=send, args=(i,)) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert responses == {i: True for i in range(6)}
+        assert peak[0] == 2
+        assert len(connections) == 2
@@ -1,6 +1,7 @@
 import unittest
 import torch
 import syft as sy
+from syft.spdz import spdz
 from .test_utils import _generate_mpc_number_pair
 
 
@@ -53,6 +54,94 @@ class TestSPDZTensor(unittest.TestCase):
         self.mpc_mul(3, 5)
         self.mpc_mul(2 ** 12, 2 ** 12)
 
+    def test_mpc_prg_shares(self):
+        spdz.PRG_SHARES = True
+        try:
+            n_received = self.bob.metrics.snapshot()["received"].get("prg_share", {})
+            n_received = n_received.get("count", 0)
+
+            self.mpc_sum(3, 5)
+            self.mpc_mul(4, -2)
+
+            received = self.bob.metrics.snapshot()["received"]
+            assert received["prg_share"]["count"] > n_received
+        finally:
+            spdz.PRG_SHARES = False
+
+    def test_mpc_mul_with_triple_pool(self):
+        pool = spdz.triple_pool
+        pool.fill("mul", ((1,),), [self.bob.id, self.alice.id], spdz.field, 2)
+        pool.reset_stats()
+
+        for n1, n2 in [(3, 5), (4, -2), (7, 7)]:
+            self.mpc_mul(n1, n2)
+
+        stats = pool.stats()
+        assert stats["consumed"] == 3
+        assert stats["ran_dry"] == 1
+        assert stats["generated"] == 1
+
+    def test_mpc_ring(self):
+        for n1, n2 in [(3, 5), (5, -5), (-3, -4), (2 ** 20, 2 ** 20)]:
+            x_mpc, y_mpc = [
+                torch.LongTensor([n]).share(self.bob, self.alice, field=spdz.RING)
+                for n in (n1, n2)
+            ]
+            assert torch.eq((x_mpc + y_mpc).get(), torch.LongTensor([n1 + n2])).all()
+            assert torch.eq((x_mpc - y_mpc).get(), torch.LongTensor([n1 - n2])).all()
+            assert torch.eq((x_mpc * y_mpc).get(), torch.LongTensor([n1 * n2])).all()
+
+        # fixed precision products are truncated on each share
+        x = torch.FloatTensor([1.5, -2.25, 3])
+        y = torch.FloatTensor([2, 4, -0.5])
+        x_mpc, y_mpc = [
+            t.fix_precision(field=spdz.RING).share(
+                self.bob, self.alice, field=spdz.RING
+            )
+            for t in (x, y)
+        ]
+        z = (x_mpc * y_mpc).get().decode()
+        assert ((z - x * y).abs() < 0.0025).all()
+
+        # the field is forwarded to the tensor a pointer points at
+        x_ptr = torch.LongTensor([3, -5]).send(self.bob)
+        x_mpc = x_ptr.share(self.bob, self.alice, field=spdz.RING)
+        x_remote = self.bob.get_obj(x_mpc.child.id_at_location).parent
+        assert x_remote.child.field == spdz.RING
+
+    def test_crt(self):
+        x = torch.LongTensor([3, -5, 2 ** 30])
+        y = torch.LongTensor([7, 11, 2 ** 20])
+
+        # the products go up to 2^90 before being divided back
+        z = (x.crt() * 2 ** 20) * (y.crt() * 2 ** 20)
+        z = z / 2 ** 20 / 2 ** 20
+        assert torch.equal(z.decode(), x * y)
+
+        x_shared = x.crt().share(self.bob, self.alice)
+        w = (x_shared + y.crt()) * 3 - 1
+        assert torch.equal(w.get(), (x + y) * 3 - 1)
+
+        # products of shared residues, and their truncation
+        y_shared = y.crt().share(self.bob, self.alice)
+        assert torch.equal((x_shared * y_shared).get(), x * y)
+        a = torch.LongTensor([3, -5, 2 ** 10])
+        b = torch.LongTensor([7, 11, 2 ** 10])
+        a_shared = a.crt().share(self.bob, self.alice)
+        b_shared = b.crt().share(self.bob, self.alice)
+        # the product goes up to 2^60, below 2^crt.TRUNCATION_BITS
+        z = (a_shared * 2 ** 20) * (b_shared * 2 ** 20) / 2 ** 20
+        error = z.get() - a * b * 2 ** 20
+        assert ((error >= 0) * (error <= 1)).all()
+
+        # 2^90 is too large to be hidden by the mask
+        z = (x_shared * 2 ** 20) * (y_shared * 2 ** 20)
+        self.assertRaises(ValueError, lambda: z / 2 ** 20)
+
+        a = torch.FloatTensor([1.5, -2.25]).fix_precision().crt()
+        b = torch.FloatTensor([2, 4]).fix_precision().crt()
+        assert torch.equal((a * b).decode(), torch.FloatTensor([3, -9]))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,8 +1,12 @@
 import unittest
 from unittest import TestCase
+import msgpack
+import numpy as np
 import syft as sy
 import torch
 
+from syft.core.frameworks import binary
+
 # import random
 
 hook = sy.TorchHook()
@@ -234,6 +238,43 @@ class TestTensorPointerSerde(TestCase):
         # make sure pointer is no longer registered locally
         assert 1234 not in me._objects
 
+    def test_tensor_data_is_serialized_as_binary(self):
+        x = sy.FloatTensor([[1, 2, 3], [4, 5, 6]])
+
+        xs = x.ser(private=False)["__FloatTensor__"]
+        assert isinstance(xs["data"], msgpack.ExtType)
+
+        enc = msgpack.packb(xs["data"], use_bin_type=True)
+        data = msgpack.unpackb(enc, raw=False, ext_hook=binary.ext_hook)
+        assert isinstance(data, np.ndarray)
+        assert data.dtype == np.float32
+        assert data.shape == (2, 3)
+        assert data.tolist() == x.tolist()
+
+    def test_patch_id_placeholders(self):
+        placeholder = binary.id_placeholder()
+        template = msgpack.packb({"id": placeholder, "ids": [placeholder, 3]})
+
+        offsets = [binary.find_id_placeholder(template, placeholder)]
+        assert len(offsets[0]) == 2
+
+        for new_id in (0, 1234, 2 ** 40):
+            patched = binary.patch_ids(template, offsets, [new_id])
+            assert msgpack.unpackb(patched, raw=False) == {
+                "id": new_id,
+                "ids": [new_id, 3],
+            }
+
+    def test_send_and_get_large_tensor(self):
+        x = sy.LongTensor(256, 256).random_(1000)
+        expected = x.clone()
+
+        x.send(bob)
+        x2 = x.get()
+
+        assert isinstance(x2, sy.LongTensor)
+        assert torch.equal(x2, expected)
+
 
 if __name__ == "__main__":
     unittest.main()
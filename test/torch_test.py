@@ -4,6 +4,7 @@
 import unittest
 from unittest import TestCase
 
+import gc
 import random
 import syft as sy
 import numpy as np
@@ -352,6 +353,68 @@ class TestTorchTensor(TestCase):
         # because .get_() was called, x should no longer be in the remote worker's objects dict
         assert ptr_id not in bob._objects
 
+    def test_send_all_get_all(self):
+        x = torch.FloatTensor([1, 2, 3])
+        y = torch.LongTensor([4, 5])
+        z = sy.Variable(torch.FloatTensor([6, 7]))
+
+        me.metrics.reset()
+        sy.send_all([x, y, z], bob)
+        assert me.metrics.snapshot()["sent"]["obj"]["count"] == 1
+        for tensorvar in (x, y, z):
+            assert isinstance(tensorvar.child, sy._PointerTensor)
+            assert tensorvar.child.id_at_location in bob._objects
+
+        w = torch.FloatTensor([8]).send(alice)
+        x, y, z, w = sy.get_all([x, y, z, w])
+        assert me.metrics.snapshot()["sent"]["req_objs"]["count"] == 2
+        assert torch.equal(x, torch.FloatTensor([1, 2, 3]))
+        assert torch.equal(y, torch.LongTensor([4, 5]))
+        assert torch.equal(z.data, torch.FloatTensor([6, 7]))
+        assert torch.equal(w, torch.FloatTensor([8]))
+
+    def test_send_get_model_flat(self):
+        model = torch.nn.Linear(3, 2)
+        weight = model.weight.data.clone()
+        bias = model.bias.data.clone()
+
+        me.metrics.reset()
+        model.send(bob, flat=True)
+        assert me.metrics.snapshot()["sent"]["flat_obj"]["count"] == 1
+        for p in model.parameters():
+            assert isinstance(p.child, sy._PointerTensor)
+            assert p.child.id_at_location in bob._objects
+            assert p.data.child.id_at_location in bob._objects
+
+        remote_weight = bob._objects[model.weight.child.id_at_location].parent
+        assert torch.equal(remote_weight.data, weight)
+
+        model.get(flat=True)
+        assert me.metrics.snapshot()["sent"]["req_flat"]["count"] == 1
+        assert torch.equal(model.weight.data, weight)
+        assert torch.equal(model.bias.data, bias)
+
+    def test_move(self):
+        x = torch.FloatTensor([1, 2, 3]).send(bob)
+        x_id = x.child.id_at_location
+
+        me.metrics.reset()
+        x.move(alice)
+        sent = me.metrics.snapshot()["sent"]
+        # the data goes from bob to alice without going through the client
+        assert sent["move"]["count"] == 1
+        assert "obj" not in sent and "req_obj" not in sent
+        assert x.child.location == alice
+        assert x_id not in bob._objects
+        assert x.child.id_at_location in alice._objects
+        assert torch.equal(x.get(), torch.FloatTensor([1, 2, 3]))
+
+        y = sy.Variable(torch.FloatTensor([4, 5])).send(bob)
+        y.move(alice)
+        assert y.data.child.location == alice
+        assert y.data.child.id_at_location in alice._objects
+        assert torch.equal(y.get().data, torch.FloatTensor([4, 5]))
+
     def test_multiple_pointers_to_same_target(self):
         # There are two cases:
         #   - You're sending a var on a loc:id you're already pointing at -> should abort
@@ -647,6 +710,174 @@ class TestTorchTensor(TestCase):
         y = x.child + x.child
         assert (y.get() == x.get() * 2).all()
 
+    def test_composite_message(self):
+        x = sy.FloatTensor([1, 2, 3, 4]).send(bob)
+        y = sy.FloatTensor([2, 3, 4, 5]).send(bob)
+
+        # the id of x + y on bob is chosen here, so that the second command
+        # can refer to it in the same message
+        z_id = int(10e10 * random.random())
+        z = sy._PointerTensor(
+            child=None,
+            parent=None,
+            torch_type="syft.FloatTensor",
+            location=bob,
+            id_at_location=z_id,
+            owner=me,
+        ).wrap()
+
+        cmd1, _, _ = torch_utils.compile_command(
+            "__add__", [y], {}, has_self=True, self=x, return_ids=[z_id]
+        )
+        cmd2, _, _ = torch_utils.compile_command(
+            "__mul__", [z], {}, has_self=True, self=z
+        )
+        n_received = bob.metrics.snapshot()["received"].get("composite", {})
+        n_received = n_received.get("count", 0)
+
+        responses = me.send_composite([(cmd1, "torch_cmd"), (cmd2, "torch_cmd")], bob)
+
+        assert bob.metrics.snapshot()["received"]["composite"]["count"] == (
+            n_received + 1
+        )
+        assert len(responses) == 2
+        assert torch.equal(z.get(), torch.FloatTensor([3, 5, 7, 9]))
+        assert torch.equal(responses[1].get(), torch.FloatTensor([9, 25, 49, 81]))
+
+    def test_async_mode(self):
+        x = sy.FloatTensor([1, 2, 3, 4]).send(bob)
+        y = sy.FloatTensor([2, 3, 4, 5]).send(bob)
+
+        def n_received(message_type):
+            received = bob.metrics.snapshot()["received"]
+            return received.get(message_type, {}).get("count", 0)
+
+        n_torch_cmd = n_received("torch_cmd")
+        n_composite = n_received("composite")
+
+        me.async_mode = True
+        try:
+            z = x + y
+            w = z * z
+            w.add_(x)
+
+            # nothing was sent yet
+            assert isinstance(w.child, sy._PointerTensor)
+            assert n_received("torch_cmd") == n_torch_cmd
+            assert n_received("composite") == n_composite
+
+            # .get() sends the pending commands first
+            assert torch.equal(w.get(), torch.FloatTensor([10, 27, 52, 85]))
+            assert n_received("composite") == n_composite + 1
+            assert n_received("torch_cmd") == n_torch_cmd
+
+            # an explicit sync sends the commands without waiting for a get
+            u = x - y
+            me.sync()
+            assert n_received("composite") == n_composite + 2
+            assert torch.equal(u.get(), torch.FloatTensor([-1, -1, -1, -1]))
+        finally:
+            me.async_mode = False
+
+    def test_lazy_mode(self):
+        x = sy.FloatTensor([1, 2, 3, 4]).send(bob)
+        y = sy.FloatTensor([2, 3, 4, 5]).send(bob)
+
+        fuse_in_place = bob._fuse_in_place
+        fused = []
+
+        def spy(*args):
+            fused.append(fuse_in_place(*args))
+            return fused[-1]
+
+        bob._fuse_in_place = spy
+        is_client_worker = me.is_client_worker
+        me.is_client_worker = True
+        me.lazy_mode = True
+        # the temporary results are released without any collection
+        gc.disable()
+        try:
+            w = (x + y) * 2 - 1
+            v = w * x
+            assert torch.equal(w.get(), torch.FloatTensor([5, 9, 13, 17]))
+            # x + y is computed, then updated in place twice
+            assert fused == [False, True, True, False]
+            assert torch.equal(v.get(), torch.FloatTensor([5, 18, 39, 68]))
+        finally:
+            gc.enable()
+            me.lazy_mode = False
+            me.is_client_worker = is_client_worker
+            del bob._fuse_in_place
+
+    def test_lazy_mode_views(self):
+        x = sy.FloatTensor([[1, 2], [3, 4]]).send(bob)
+
+        is_client_worker = me.is_client_worker
+        me.is_client_worker = True
+        me.lazy_mode = True
+        try:
+            # the view shares the storage of x, it is not updated in place
+            y = (x.view(-1) * 2).get()
+            assert torch.equal(y, torch.FloatTensor([2, 4, 6, 8]))
+            z = (x.t().contiguous() + 1).get()
+            assert torch.equal(z, torch.FloatTensor([[2, 4], [3, 5]]))
+            assert torch.equal(x.get(), torch.FloatTensor([[1, 2], [3, 4]]))
+        finally:
+            me.lazy_mode = False
+            me.is_client_worker = is_client_worker
+
+    def test_plan(self):
+        x = sy.FloatTensor([[1, 2], [3, 4]]).send(bob)
+        w = sy.FloatTensor([[1], [0]]).send(bob)
+
+        def step(w, x):
+            grad = x.t().mm(x.mm(w))
+            return w - grad * 0.01, grad
+
+        plan = sy.make_plan(step, w, x)
+        intermediate_ids = bob._plans[plan.id]["intermediate_ids"]
+        assert len(intermediate_ids) == 3
+        # the operations were recorded, not executed
+        for id in intermediate_ids + plan.output_ids:
+            assert id not in bob._objects
+
+        me.metrics.reset()
+        w1, grad = plan(w, x)
+        assert me.metrics.snapshot()["sent"]["run_plan"]["count"] == 1
+        assert "torch_cmd" not in me.metrics.snapshot()["sent"]
+        # only the outputs are kept
+        for id in intermediate_ids:
+            assert id not in bob._objects
+        assert w1.child.id_at_location in bob._objects
+
+        w2, _ = plan(w1, x)
+        grad_value = torch.FloatTensor([[10], [14]])
+        assert torch.equal(grad.get(), grad_value)
+        assert torch.equal(w1.get(), torch.FloatTensor([[1], [0]]) - grad_value * 0.01)
+        assert w2.get().size() == torch.Size([2, 1])
+
+        try:
+            sy.make_plan(lambda w: w.sum(), w)
+            assert False
+        except NotImplementedError:
+            pass
+
+    def test_broadcast_encodes_once(self):
+        x = sy.FloatTensor([1, 2, 3, 4])
+        x_id = x.id
+
+        n_sent = me.metrics.snapshot()["sent"].get("obj", {}).get("count", 0)
+        gpt = x.broadcast([bob, alice])
+
+        sent = me.metrics.snapshot()["sent"]["obj"]
+        assert sent["count"] == n_sent + 2
+        assert x.id == x_id
+
+        pointers = gpt.child.pointer_tensor_dict
+        assert pointers[bob.id].id_at_location != pointers[alice.id].id_at_location
+        for result in gpt.get():
+            assert torch.equal(result, torch.FloatTensor([1, 2, 3, 4]))
+
 
 class TestTorchVariable(TestCase):
     def test_remote_backprop(self):
@@ -1247,6 +1478,36 @@ class TestSPDZTensor(TestCase):
         z = x - y
         assert (z.get() == torch.LongTensor([[-4, -8], [-10, -12]])).all()
 
+    def test_spdz_open_shares(self):
+        x = torch.LongTensor([1, 2, 3]).share(bob, alice)
+        y = torch.LongTensor([[4], [5]]).share(bob, alice)
+
+        me.metrics.reset()
+        values, shared_values = sy.spdz.spdz.open_shares(
+            [x.child.shares, y.child.shares], [bob, alice]
+        )
+        sent = me.metrics.snapshot()["sent"]
+        # one message per worker each way, and no command
+        assert sent["req_objs"]["count"] == 2
+        assert sent["obj"]["count"] == 2
+        assert "torch_cmd" not in sent
+
+        assert torch.equal(values[0], torch.LongTensor([1, 2, 3]))
+        assert torch.equal(values[1], torch.LongTensor([[4], [5]]))
+        # every worker holds a copy of the values
+        assert torch.equal(
+            shared_values[1].child.sum_get(), torch.LongTensor([[8], [10]])
+        )
+
+        # a shared multiplication opens its masked operands the same way
+        x = torch.LongTensor([3, -5]).share(bob, alice)
+        y = torch.LongTensor([7, 11]).share(bob, alice)
+        me.metrics.reset()
+        z = x * y
+        sent = me.metrics.snapshot()["sent"]
+        assert sent["req_objs"]["count"] == 2
+        assert torch.equal(z.get(), torch.LongTensor([21, -55]))
+
     def test_spdz_mul_3_workers(self):
         n1, n2 = (3, -5)
         x = torch.LongTensor([n1])